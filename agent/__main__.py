@@ -1,23 +1,253 @@
 import asyncio
 import logging
+import multiprocessing
+import time
 
 import click
 
 from agent.agent import HostAgent
 from agent.task_manager import HostAgentTaskManager
 from discovery import DiscoveryClient
+from mcp_connect import MCPConnector
 from models.agent import AgentCapabilities, AgentCard, AgentSkill
+from server.dispatcher import SessionDispatcher
 from server.server import A2AServer
+from server.durable_task_store import DurableTaskStore, backend_from_url
+from server.task_store import ShardedTaskStore
+from structured_logging import configure_logging
+from tracing import configure_tracing
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def build_agent_card(url: str) -> AgentCard:
+    """Card of the host agent, published at `url`."""
+    capabilities = AgentCapabilities(streaming=True)
+    skill = AgentSkill(
+        id="orchestrate_agents",
+        name="Orchestrate Agents and Tasks",
+        description=(
+            "Routes user requests to the appropriate child agent, "
+            "based on intent of the user query"
+        ),
+        tags=["routing", "orchestration"],
+        examples=[],
+    )
+    return AgentCard(
+        name="HostAgent",
+        description="Delegates tasks to discovered child agents",
+        url=url,
+        version="1.0.0",
+        defaultInputModes=HostAgent.SUPPORTED_CONTENT_TYPES,
+        defaultOutputModes=HostAgent.SUPPORTED_CONTENT_TYPES,
+        capabilities=capabilities,
+        skills=[skill],
+    )
+
+
+def create_server(
+    host: str,
+    port: int,
+    agent_card: AgentCard,
+    max_tasks: int | None = None,
+    max_history_bytes: int | None = None,
+    task_ttl: float | None = None,
+    task_db: str | None = None,
+    task_db_sync_commit: bool = False,
+    batch_concurrency: int = 8,
+    refresh_interval: float = 30.0,
+    max_in_flight: int = 0,
+    max_queue: int = 0,
+    queue_timeout: float = 10.0,
+) -> A2AServer:
+    """
+    App factory: an A2AServer for one host agent process.
+
+    The server listens right away and reports ready on /ready once the host
+    agent is initialized by its startup handler.
+    """
+    server = A2AServer(
+        host=host,
+        port=port,
+        agent_card=agent_card,
+        batch_concurrency=batch_concurrency,
+        max_in_flight=max_in_flight,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+    )
+    discovery = DiscoveryClient()
+    bounds = dict(
+        max_tasks=max_tasks, max_history_bytes=max_history_bytes, finished_ttl=task_ttl
+    )
+    resources = {}
+
+    def create_store():
+        if task_db:
+            return DurableTaskStore(
+                backend_from_url(task_db), sync_commit=task_db_sync_commit, **bounds
+            )
+        return ShardedTaskStore(**bounds)
+
+    async def initialize():
+        """
+        Fetch agent cards and credentials, discover MCP tools and open the task
+        store concurrently, then build the host agent, start its MCP sessions
+        and attach it to the server.
+        """
+
+        async def retry(name, load):
+            # Each dependency is retried on its own, so one that is down does not
+            # make the others load twice
+            while True:
+                try:
+                    return await load()
+                except Exception as e:
+                    logger.error(f"Error occurred while loading {name}, retrying in 5s. \n Reason: {e}")
+                    await asyncio.sleep(5)
+
+        started = time.perf_counter()
+        agent_cards, credentials, mcp, store = await asyncio.gather(
+            retry("agent cards", discovery.fetch_agent_cards),
+            retry("credentials", discovery.fetch_credentials),
+            retry("MCP tools", MCPConnector.create),
+            retry("task store", lambda: asyncio.to_thread(create_store)),
+        )
+
+        logger.info(f"Available agents are: \n {[(agent.name, agent.capabilities) for agent in agent_cards]}")
+        if not agent_cards:
+            logger.warning(
+                "No agents found in registry – the orchestrator will have nothing to call"
+            )
+        resources.update(store=store)
+
+        async def build():
+            # Fails on bad configuration, e.g. an unknown LLM_CACHE_MODE; retried
+            # like the dependencies so the error keeps showing in the logs
+            host_agent = HostAgent(agent_cards=agent_cards, credentials=credentials, mcp=mcp)
+            return host_agent, HostAgentTaskManager(agent=host_agent, store=store)
+
+        host_agent, task_manager = await retry("host agent", build)
+        resources.update(host_agent=host_agent)
+        await host_agent.start()
+        if refresh_interval > 0:
+            host_agent.start_refresh(discovery, refresh_interval)
+        server.set_task_manager(task_manager)
+        logger.info(f"Host agent initialized in {time.perf_counter() - started:.2f}s")
+
+    def initialized(task: asyncio.Task) -> None:
+        # Retrieve the exception, so a failure is logged now rather than lost
+        if not task.cancelled() and task.exception() is not None:
+            logger.critical(
+                f"Host agent failed to initialize, the server stays unready. \n Reason: {task.exception()!r}"
+            )
+
+    async def startup():
+        # Not awaited, so uvicorn starts accepting connections immediately
+        resources["initialize"] = asyncio.create_task(initialize())
+        resources["initialize"].add_done_callback(initialized)
+
+    async def shutdown():
+        resources["initialize"].cancel()
+        if "host_agent" in resources:
+            await resources["host_agent"].close()
+        if isinstance(resources.get("store"), DurableTaskStore):
+            await resources["store"].close()
+        await discovery.aclose()
+
+    server.app.add_event_handler("startup", startup)
+    server.app.add_event_handler("shutdown", shutdown)
+    return server
+
+
+def run_worker(host: str, port: int, agent_card: AgentCard, options: dict) -> None:
+    """Entry point of a worker process."""
+    configure_logging()
+    configure_tracing()
+    create_server(host, port, agent_card, **options).start()
+
+
 @click.command()
 @click.option(
     "--host", default="localhost", help="Host to bind the HostAgent server to"
 )
 @click.option("--port", default=10000, help="Port for the HostAgent server")
+@click.option(
+    "--max-tasks",
+    type=int,
+    default=None,
+    envvar="TASK_STORE_MAX_TASKS",
+    help="Maximum number of stored tasks before LRU eviction",
+)
+@click.option(
+    "--max-history-bytes",
+    type=int,
+    default=None,
+    envvar="TASK_STORE_MAX_HISTORY_BYTES",
+    help="Maximum total bytes of stored message text before LRU eviction",
+)
+@click.option(
+    "--task-ttl",
+    type=float,
+    default=None,
+    envvar="TASK_STORE_TTL",
+    help="Seconds to keep completed, failed or canceled tasks",
+)
+@click.option(
+    "--task-db",
+    default=None,
+    envvar="TASK_STORE_DB",
+    help="Persist tasks to this SQLite file, or to `odbc:<connection string>`",
+)
+@click.option(
+    "--task-db-sync-commit",
+    is_flag=True,
+    default=False,
+    envvar="TASK_STORE_SYNC_COMMIT",
+    help="Return from task writes only after their group commit",
+)
+@click.option(
+    "--batch-concurrency",
+    default=8,
+    envvar="A2A_BATCH_CONCURRENCY",
+    help="Maximum members of a JSON-RPC batch processed at once",
+)
+@click.option(
+    "--max-in-flight",
+    default=32,
+    envvar="A2A_MAX_IN_FLIGHT",
+    help="Maximum tasks processed at once per server process, 0 for no limit",
+)
+@click.option(
+    "--max-queue",
+    default=64,
+    envvar="A2A_MAX_QUEUE",
+    help="Maximum tasks waiting for a slot; more are rejected with a retry hint",
+)
+@click.option(
+    "--queue-timeout",
+    default=10.0,
+    envvar="A2A_QUEUE_TIMEOUT",
+    help="Seconds a task may wait for a slot before it is rejected",
+)
+@click.option(
+    "--refresh-interval",
+    default=30.0,
+    envvar="AGENT_CARDS_REFRESH_INTERVAL",
+    help="Seconds between agent card registry polls, 0 to disable",
+)
+@click.option(
+    "--workers",
+    default=1,
+    envvar="A2A_WORKERS",
+    help="Worker processes; above 1 a dispatcher routes each session to a fixed worker",
+)
+@click.option(
+    "--worker-port",
+    type=int,
+    default=None,
+    help="First internal port of the worker processes, defaults to --port + 1",
+)
 # @click.option(
 #     "--registry",
 #     default=None,
@@ -26,54 +256,60 @@ logger = logging.getLogger(__name__)
 #         "Defaults to registry.json"
 #     )
 # )
-def main(host: str, port: int):
+def main(
+    host: str,
+    port: int,
+    workers: int,
+    worker_port: int | None,
+    **options,
+):
     """
     Entry point to start the OrchestratorAgent A2A server.
 
     Steps performed:
-    1. Load child-agent URLs from the registry JSON file.
-    2. Fetch each agent's metadata via `/.well-known/agent.json`.
-    3. Instantiate an OrchestratorAgent with discovered AgentCards.
-    4. Wrap it in an OrchestratorTaskManager for JSON-RPC handling.
-    5. Launch the A2AServer to listen for incoming tasks.
+    1. Launch the A2AServer, which listens right away and reports ready on /ready.
+    2. Concurrently fetch the agent cards and credentials from the registry,
+       discover MCP tools and open the task store.
+    3. Instantiate a HostAgent with the discovered AgentCards.
+    4. Wrap it in a HostAgentTaskManager and attach it to the server.
+
+    With --workers N, N such servers run as separate processes on internal
+    ports and a SessionDispatcher on --port forwards every session to the same
+    worker, keeping its ADK session in that worker's memory. The dispatcher's
+    /metrics merges the metrics of all workers, labelled `worker="<index>"`.
     """
+    configure_logging()
+    configure_tracing()
     logger.info(" --- Host Agent Started --- ")
-    discovery = DiscoveryClient()
-    agent_cards = asyncio.run(discovery.fetch_agent_cards())
-
-    logger.info(f"Available agents are: \n {[(agent.name, agent.capabilities) for agent in agent_cards]}")
+    host_agent_card = build_agent_card(f"http://{host}:{port}/")
+    if workers <= 1:
+        create_server(host, port, host_agent_card, **options).start()
+        return
 
-    if not agent_cards:
-        logger.warning(
-            "No agents found in registry – the orchestrator will have nothing to call"
+    worker_port = worker_port or port + 1
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=("127.0.0.1", worker_port + index, host_agent_card, options),
+            name=f"host-agent-worker-{index}",
         )
-    capabilities = AgentCapabilities(streaming=False)
-    skill = AgentSkill(
-        id="orchestrate_agents",
-        name="Orchestrate Agents and Tasks",
-        description=(
-            "Routes user requests to the appropriate child agent, "
-            "based on intent of the user query"
-        ),
-        tags=["routing", "orchestration"],
-        examples=[],
-    )
-    host_agent_card = AgentCard(
-        name="HostAgent",
-        description="Delegates tasks to discovered child agents",
-        url=f"http://{host}:{port}/",  #
-        version="1.0.0",
-        defaultInputModes=HostAgent.SUPPORTED_CONTENT_TYPES,
-        defaultOutputModes=HostAgent.SUPPORTED_CONTENT_TYPES,
-        capabilities=capabilities,
-        skills=[skill],
-    )
-    host_agent = HostAgent(agent_cards=agent_cards)
-    task_manager = HostAgentTaskManager(agent=host_agent)
-    server = A2AServer(
-        host=host, port=port, agent_card=host_agent_card, task_manager=task_manager
-    )
-    server.start()
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        SessionDispatcher(
+            host,
+            port,
+            [f"http://127.0.0.1:{worker_port + index}" for index in range(workers)],
+            host_agent_card,
+        ).start()
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
 
 
 if __name__ == "__main__":
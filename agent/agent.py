@@ -1,90 +1,322 @@
+import asyncio
 import logging
 import os
+import time
 import uuid
-from typing import List
+from contextvars import ContextVar
+from typing import AsyncIterable, List
 
 import requests
 from dotenv import load_dotenv
+from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event, EventActions
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.openapi_tool.openapi_spec_parser.rest_api_tool import to_gemini_schema
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 
-from agent.agent_connector import AgentConnector
-from mcp_connect import MCPConnector
+from agent.agent_connector import (
+    AgentBusyError,
+    AgentConnector,
+    AgentUnavailableError,
+    client_options_from_env,
+)
+from agent.delegation_cache import DelegationCache
+from agent.llm_cache import CachingLlm, LlmResponseCache
+from agent.router import AgentRouter, RouteDecision
+from agent.sessions import BoundedSessionService, compact_contents, estimate_tokens
+from discovery import DiscoveryClient
+from mcp_connect import MCPConnector, MCPTool
+from metrics import (
+    LLM_TURN_SECONDS,
+    MCP_SESSIONS,
+    PROMPT_COMPACTIONS,
+    PROMPT_TOKENS,
+    ROUTER_DECISIONS,
+    SESSIONS,
+)
 from models.agent import AgentCard
+from structured_logging import register_secrets
+from tracing import tracer
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Start time of the model call in progress. Model callbacks run in the context
+# of the turn, so a call that raises before _after_model leaves nothing behind
+_llm_started: ContextVar[float | None] = ContextVar("llm_started", default=None)
+
+
+class MCPFunctionTool(FunctionTool):
+    """
+    FunctionTool calling an MCP tool with a single `args` object.
+
+    The declaration is built from the tool's current description and input
+    schema on every model request, so a revalidated tool is described to the
+    model from its next turn.
+    """
+
+    def __init__(self, tool: MCPTool) -> None:
+        async def wrapper(args: dict) -> str:
+            return await tool.run(args)
+
+        wrapper.__name__ = tool.name
+        super().__init__(wrapper)
+        self.tool = tool
+        # (description, input schema) -> declaration, rebuilt when the tool is refreshed
+        self._declared: tuple | None = None
+
+    def _get_declaration(self) -> types.FunctionDeclaration:
+        key = (self.tool.description, self.tool.input_schema)
+        if self._declared is None or self._declared[0] != key:
+            declaration = super()._get_declaration()
+            declaration.description = self.tool.description
+            try:
+                declaration.parameters.properties["args"] = to_gemini_schema(self.tool.input_schema)
+            except Exception as e:
+                logger.warning(f"Declaring MCP tool {self.tool.name} without its input schema. \n Reason: {e}")
+            self.description = self.tool.description
+            self._declared = (key, declaration)
+        return self._declared[1]
+
+
 class HostAgent:
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
 
-    def __init__(self, agent_cards: List[AgentCard]) -> None:
-        self.agent_connectors = {
-            card.name: AgentConnector(card.name, card.url) for card in agent_cards
-        }
+    def __init__(
+        self,
+        agent_cards: List[AgentCard],
+        credentials: dict[str, str] = None,
+        mcp: MCPConnector = None,
+        model: str | BaseLlm = None,
+    ) -> None:
+        """
+        Args:
+            agent_cards: Cards of the child agents
+            credentials: Environment variables to set, fetched from the registry when None
+            mcp: Connector with discovered MCP tools, created (blocking) when None
+            model: Model name or instance, HOST_AGENT_MODEL (behind the LLM cache) when None
+        """
+        self._client_options = client_options_from_env()
+        self._model = model
+        self.agent_connectors: dict[str, AgentConnector] = {}
+        self._refresh_task: asyncio.Task | None = None
+        self._retiring: set[asyncio.Task] = set()
 
-        self.agent_descriptions = {
-            card.name: f"{card.description + " " + ".\n ".join([skill.description for skill in card.skills])}" for card in agent_cards
-        }
-        server_domain = os.getenv("SERVER_DOMAIN") or "http://localhost"
-        logger.info(f"Server domain for calling credentials: {server_domain}")
-        self._credentials = requests.get(
-            f"{server_domain}:3100/credentials"
-        ).json()
-        for creds in self._credentials["data"]:
-            os.environ[creds] = self._credentials["data"].get(creds)
+        if credentials is None:
+            server_domain = os.getenv("SERVER_DOMAIN") or "http://localhost"
+            logger.info(f"Server domain for calling credentials: {server_domain}")
+            credentials = requests.get(
+                f"{server_domain}:3100/credentials"
+            ).json()["data"]
+        for creds in credentials:
+            os.environ[creds] = credentials.get(creds)
+        register_secrets(credentials.values())
 
-        load_dotenv()
-        self._mcp = MCPConnector()
-        mcp_tools = self._mcp.get_tools()
+        # Optional cache of child-agent answers, see delegation_cache.json
+        self.delegation_cache = DelegationCache.from_config()
+        # Optional cache or record/replay of model responses, see LLM_CACHE_MODE
+        self.llm_cache = LlmResponseCache.from_env()
 
-        self._mcp_wrappers = []
+        # Local router settings; without ROUTER_THRESHOLD it only logs its decisions
+        self._router_threshold = float(os.getenv("ROUTER_THRESHOLD", "0.35"))
+        self._router_margin = float(os.getenv("ROUTER_MARGIN", "0.2"))
+        self._fast_path = os.getenv("ROUTER_THRESHOLD") is not None
+        # Turns by router outcome, see _route_directly; kept across router rebuilds
+        self.route_counts = {"routed": 0, "shadow": 0, "declined": 0, "fallback": 0}
 
-        def make_wrapper(tool):
-            async def wrapper(args: dict) -> str:
-                return await tool.run(args)
+        # Overall deadline of a delegate_tasks fan-out
+        self._fanout_deadline = float(os.getenv("FANOUT_DEADLINE_SECONDS", "60"))
 
-            wrapper.__name__ = tool.name
-            return wrapper
+        # Conversations above this many estimated tokens are compacted before a
+        # model call, keeping the latest turns and a summary of the rest; 0 disables
+        self._token_budget = int(os.getenv("PROMPT_TOKEN_BUDGET", "16000"))
+        self._summary_tokens = int(os.getenv("PROMPT_SUMMARY_TOKENS", "500"))
 
-        for tool in mcp_tools:
-            fn = make_wrapper(tool)
-            self._mcp_wrappers.append(FunctionTool(fn))
+        load_dotenv()
+        self._mcp = mcp or MCPConnector()
+        MCP_SESSIONS.set_function(lambda: self._mcp.open_sessions)
+        mcp_tools = self._mcp.get_tools()
 
+        self._mcp_wrappers = [MCPFunctionTool(tool) for tool in mcp_tools]
+
+        self.set_agent_cards(agent_cards)
         self._agent = self._build_agent()
         self._user_id = "host_agent"
 
+        session_service = BoundedSessionService(
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "3600")),
+            max_sessions=int(os.getenv("SESSION_MAX", "10000")),
+        )
+        SESSIONS.set_function(lambda: session_service.count)
         self._runner = Runner(
             app_name=self._agent.name,
             agent=self._agent,
             artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
+            session_service=session_service,
             memory_service=InMemoryMemoryService(),
         )
 
+    async def start(self) -> None:
+        """
+        Prepare the MCP tools on the running loop: pre-spawn their server
+        sessions and revalidate tools that were registered from the cache.
+        """
+        await self._mcp.start()
+
+    async def close(self) -> None:
+        """Release pooled child-agent connections and MCP server sessions."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        for connector in self.agent_connectors.values():
+            await connector.close()
+        await self._mcp.close()
+
+    def set_agent_cards(self, agent_cards: List[AgentCard]) -> None:
+        """
+        Replace the set of child agents.
+
+        Connectors, descriptions, router and instruction are rebuilt first and
+        then published together, with no await in between, so a turn sees either
+        the old or the new agents, never a mix. Connectors of agents whose URL is
+        unchanged are reused; replaced connectors are closed once their in-flight
+        delegations finish.
+        """
+        previous = self.agent_connectors
+        connectors = {}
+        for card in agent_cards:
+            connector = previous.get(card.name)
+            if connector is None or connector.base_url != card.url:
+                connector = AgentConnector(card.name, card.url, **self._client_options)
+            connectors[card.name] = connector
+
+        descriptions = {
+            card.name: f"{card.description + " " + ".\n ".join([skill.description for skill in card.skills])}" for card in agent_cards
+        }
+        router = AgentRouter(
+            agent_cards, threshold=self._router_threshold, margin=self._router_margin
+        )
+
+        self.agent_connectors = connectors
+        self.agent_descriptions = descriptions
+        self.router = router
+        self._instruction_text = self._render_instruction()
+
+        for name, connector in previous.items():
+            if connectors.get(name) is not connector:
+                task = asyncio.get_running_loop().create_task(connector.close_when_idle())
+                self._retiring.add(task)
+                task.add_done_callback(self._retiring.discard)
+        if previous:
+            logger.info(
+                f"Agent cards changed: {sorted(previous)} -> {sorted(connectors)}"
+            )
+
+    async def refresh_agent_cards(self, discovery: DiscoveryClient) -> bool:
+        """Poll the registry once and swap the agents in if the cards changed."""
+        agent_cards = await discovery.poll_agent_cards()
+        if agent_cards is None:
+            return False
+        self.set_agent_cards(agent_cards)
+        return True
+
+    def start_refresh(self, discovery: DiscoveryClient, interval: float) -> None:
+        """Poll the registry every `interval` seconds in the background."""
+
+        async def refresh_loop() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.refresh_agent_cards(discovery)
+                except Exception as e:
+                    logger.error(f"Error occurred while refreshing agent cards. \n Reason: {e}")
+
+        self._refresh_task = asyncio.get_running_loop().create_task(refresh_loop())
+
+    def _build_model(self) -> str | BaseLlm:
+        if self._model is not None:
+            return self._model
+        # Any model name known to ADK's LLMRegistry, e.g. a local fake in benchmarks
+        model = os.getenv("HOST_AGENT_MODEL", "gemini-2.0-flash")
+        if self.llm_cache is None:
+            return model
+        return CachingLlm.wrap(
+            LLMRegistry.new_llm(model), self.llm_cache, os.getenv("LLM_CACHE_MODE")
+        )
+
     def _build_agent(self) -> LlmAgent:
         return LlmAgent(
-            model="gemini-2.0-flash",
+            model=self._build_model(),
             name="host_agent",
             description="""The host agent is responsible for coordinating the 
                            actions of the other agents based on user query intent.
                            """,
-            instruction=f"""
+            instruction=self._instruction,
+                        
+            tools=[
+                self._list_agents,
+                self._delegate_task,
+                self._delegate_tasks,
+                *self._mcp_wrappers,
+            ],
+            output_key="manager",
+            before_model_callback=self._before_model,
+            after_model_callback=self._after_model,
+        )
+
+    def _before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        _llm_started.set(time.perf_counter())
+        tokens = estimate_tokens(llm_request.contents)
+        PROMPT_TOKENS.observe(tokens, stage="before")
+        if self._token_budget and tokens > self._token_budget:
+            llm_request.contents = compact_contents(
+                llm_request.contents, self._token_budget, self._summary_tokens
+            )
+            PROMPT_COMPACTIONS.inc()
+            tokens = estimate_tokens(llm_request.contents)
+        PROMPT_TOKENS.observe(tokens, stage="after")
+
+    def _after_model(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> None:
+        # Streaming calls report every partial chunk; the turn ends with the last one
+        if llm_response.partial:
+            return
+        started = _llm_started.get()
+        if started is not None:
+            _llm_started.set(None)
+            model = self._agent.model
+            LLM_TURN_SECONDS.observe(
+                time.perf_counter() - started,
+                model=model if isinstance(model, str) else model.model,
+            )
+
+    def _render_instruction(self) -> str:
+        return f"""
                             ## Host Manager Agent Instructions
                             ### **Role & Purpose**
                             You are a **host manager agent** responsible for managing tasks and coordinating with other agents based on user intent.
                             ### **Tool Categories**
                             1. **A2A Agent Tools**:
-                            - `list_agents()`: Retrieve a list of available agents.
+                            - `list_agents()`: Retrieve the agents and their status. Do not delegate to an
+                              `unavailable` agent; tell the user it is temporarily down instead.
                             - `delegate_task(agent_name, message)`: Assign tasks to an agent.
+                            - `delegate_tasks(agent_names, messages)`: Assign tasks to several agents at once; `agent_names[i]` receives `messages[i]`.
+                              Prefer it over consecutive `delegate_task` calls when a query needs more than one agent.
 
                             2. **MCP Tools**:
                             - Function tools, including an **Airbnb MCP tool** Use this tool only and no other tools or agents for any hotel related query
@@ -102,19 +334,25 @@ class HostAgent:
                             - **Ask for clarification** when needed.
                             - **Provide structured, clear, and helpful responses**.
                             - **Communicate capabilities effectively** while assisting users.
-                        """,
-                        
-            tools=[self._list_agents, self._delegate_task, *self._mcp_wrappers],
-            output_key="manager"
-        )
+                        """
 
-    def _list_agents(self) -> List[str]:
+    def _instruction(self, context: ReadonlyContext) -> str:
+        # Read on every turn, so refreshed agent cards apply to the next LLM call
+        return self._instruction_text
+
+    def _list_agents(self) -> List[dict]:
         """
-        Tool function: returns the list of child-agent names currently registered.
+        Tool function: returns the child agents currently registered, each with
+        its status: "available", "unavailable" (failing, requests are refused)
+        or "recovering" (the next request checks whether it is back).
         Called by the LLM when it wants to discover available agents.
         """
-        print(f"List agents {list(self.agent_connectors.keys())}")
-        return list(self.agent_connectors.keys())
+        agents = [
+            {"name": name, "status": connector.status}
+            for name, connector in self.agent_connectors.items()
+        ]
+        logger.debug(f"List agents {agents}")
+        return agents
 
     async def _delegate_task(
         self, agent_name: str, message: str, tool_context: ToolContext
@@ -122,30 +360,85 @@ class HostAgent:
         """
         Tool function: Delegate a task to an agent.
         """
-        if agent_name not in self.agent_connectors:
-            raise ValueError(f"Unknown agent: {agent_name}")
-        connector = self.agent_connectors[agent_name]
-
         # Ensure session_id persists across tool calls via tool_context.state
+        state = tool_context.state
+        if "session_id" not in state:
+            state["session_id"] = str(uuid.uuid4())
+        try:
+            return await self._send_to_agent(agent_name, message, state["session_id"])
+        except (AgentBusyError, AgentUnavailableError) as e:
+            # Let the model tell the user instead of failing the whole turn
+            return f"Error: {e}"
+
+    async def _delegate_tasks(
+        self, agent_names: List[str], messages: List[str], tool_context: ToolContext
+    ) -> dict:
+        """
+        Tool function: Delegate several tasks to agents in parallel.
+        agent_names[i] receives messages[i]. Returns one result per agent, in order,
+        with status "ok" and the agent's response, or status "error" or "timeout".
+        """
+        if len(agent_names) != len(messages):
+            raise ValueError("agent_names and messages must have the same length")
+
         state = tool_context.state
         if "session_id" not in state:
             state["session_id"] = str(uuid.uuid4())
         session_id = state["session_id"]
 
-        # Delegate task asynchronously and await Task result
-        child_task = await connector.send_task(message, session_id)
+        # All children run concurrently; the slowest one bounds the wall time,
+        # and the deadline bounds the slowest one
+        jobs = [
+            asyncio.create_task(self._send_to_agent(agent_name, message, session_id))
+            for agent_name, message in zip(agent_names, messages)
+        ]
+        pending = set(jobs)
+        try:
+            done, pending = await asyncio.wait(jobs, timeout=self._fanout_deadline)
+        finally:
+            # Also when the tool call itself is cancelled, so no child job is orphaned
+            for job in pending:
+                job.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
 
-        # Extract text from the last history entry if available
-        if child_task.history and len(child_task.history) > 1:
-            return child_task.history[-1].parts[0].text
-        return ""
+        results = []
+        for agent_name, job in zip(agent_names, jobs):
+            if job in pending:
+                results.append({"agent": agent_name, "status": "timeout"})
+            elif job.cancelled():
+                # exception() would raise CancelledError and abort the whole tool call
+                results.append({"agent": agent_name, "status": "error", "error": "cancelled"})
+            elif job.exception() is not None:
+                results.append(
+                    {"agent": agent_name, "status": "error", "error": str(job.exception())}
+                )
+            else:
+                results.append({"agent": agent_name, "status": "ok", "response": job.result()})
+        logger.info(
+            f"Fan-out to {agent_names}: {[result['status'] for result in results]}"
+        )
+        return {"results": results}
 
-    def invoke(self, query: str, session_id: str) -> str:
-        """
-        Main entry: receives a user query + session_id,
-        sets up or retrieves a session, wraps the query for the LLM,
-        runs the Runner (with tools enabled), and returns the final text.
-        """
+    async def _send_to_agent(self, agent_name: str, message: str, session_id: str) -> str:
+        """Send a message to a child agent (through the delegation cache) and return its answer."""
+        if agent_name not in self.agent_connectors:
+            raise ValueError(f"Unknown agent: {agent_name}")
+        connector = self.agent_connectors[agent_name]
+
+        async def send() -> str:
+            # Delegate task asynchronously and await Task result
+            child_task = await connector.send_task(message, session_id)
+
+            # Extract text from the last history entry if available
+            if child_task.history and len(child_task.history) > 1:
+                return child_task.history[-1].parts[0].text
+            return ""
+
+        if self.delegation_cache is None:
+            return await send()
+        return await self.delegation_cache.get_or_fetch(agent_name, message, send)
+
+    def _get_or_create_session(self, session_id: str):
         # Attempt to reuse an existing session
         session = self._runner.session_service.get_session(
             app_name=self._agent.name, user_id=self._user_id, session_id=session_id
@@ -158,21 +451,188 @@ class HostAgent:
                 session_id=session_id,
                 state={},
             )
+        return session
 
-        # Wrap the user query in a types.Content message
-        content = types.Content(role="user", parts=[types.Part.from_text(text=query)])
+    def _can_route_directly(self, decision: RouteDecision) -> bool:
+        # An agent that is down or recovering is left to the model, which explains
+        # it to the user; a recovering agent's single probe slot may already be taken
+        return (
+            self._fast_path
+            and decision.confident
+            and self.agent_connectors[decision.agent_name].status == "available"
+        )
 
-        # Run the agent synchronously; collects a list of events
-        events = list(
-            self._runner.run(
-                user_id=self._user_id, session_id=session.id, new_message=content
-            )
+    async def _route_directly(
+        self, session, query: str, decision: RouteDecision = None
+    ) -> str | None:
+        """
+        Fast path: when the router is confident, delegate the query to the
+        matching child agent without calling the LLM.
+
+        The turn is appended to the session so later LLM turns still see it.
+        An agent that turns out busy or unavailable hands the turn back to the
+        LLM, counted as a fallback.
+
+        Returns:
+            The child agent's answer, or None when the LLM has to decide
+        """
+        decision = decision or self.router.route(query)
+        if not decision.confident:
+            outcome = "fallback"
+        elif not self._fast_path:
+            outcome = "shadow"
+        elif not self._can_route_directly(decision):
+            outcome = "declined"
+        else:
+            outcome = "routed"
+
+        answer = None
+        child_session_id = session.state.get("session_id") or str(uuid.uuid4())
+        if outcome == "routed":
+            try:
+                answer = await self._send_to_agent(decision.agent_name, query, child_session_id)
+            except (AgentBusyError, AgentUnavailableError) as e:
+                logger.warning(f"Fast path to {decision.agent_name} failed, asking the LLM. \n Reason: {e}")
+                outcome = "fallback"
+        self.route_counts[outcome] += 1
+        ROUTER_DECISIONS.inc(outcome=outcome)
+        logger.info(f"Router outcome: {outcome} {self.route_counts}")
+        if answer is None:
+            return None
+
+        session_service = self._runner.session_service
+        session_service.append_event(
+            session,
+            Event(
+                author="user",
+                content=types.Content(role="user", parts=[types.Part.from_text(text=query)]),
+            ),
+        )
+        session_service.append_event(
+            session,
+            Event(
+                author=self._agent.name,
+                content=types.Content(role="model", parts=[types.Part.from_text(text=answer)]),
+                actions=EventActions(
+                    state_delta={"session_id": child_session_id, self._agent.output_key: answer}
+                ),
+            ),
+        )
+        return answer
+
+    @staticmethod
+    def _turn_span(session_id: str):
+        """Span covering one user turn, from routing to the final answer."""
+        return tracer.start_as_current_span(
+            "host_agent.turn", attributes={"session.id": session_id}
         )
-        current_session = self._runner.session_service.get_session(app_name=self._agent.name, user_id=self._user_id, session_id=session_id)
-        stored_output = current_session.state.get(self._runner.agent.output_key)
 
+    @staticmethod
+    def _final_text(events) -> str:
         # If no content or parts, return empty fallback
         if not events or not events[-1].content or not events[-1].content.parts:
             return ""
         # Join all text parts into a single string reply
         return "\n".join(p.text for p in events[-1].content.parts if p.text)
+
+    def invoke(self, query: str, session_id: str) -> str:
+        """
+        Main entry: receives a user query + session_id,
+        sets up or retrieves a session, wraps the query for the LLM,
+        runs the Runner (with tools enabled), and returns the final text.
+
+        Blocks the calling thread for the whole run; use `invoke_async` from
+        inside an event loop.
+        """
+        session = self._get_or_create_session(session_id)
+
+        # Wrap the user query in a types.Content message
+        content = types.Content(role="user", parts=[types.Part.from_text(text=query)])
+
+        # Run the agent synchronously; collects a list of events
+        with self._turn_span(session_id):
+            events = list(
+                self._runner.run(
+                    user_id=self._user_id, session_id=session.id, new_message=content
+                )
+            )
+        return self._final_text(events)
+
+    async def invoke_async(self, query: str, session_id: str) -> str:
+        """
+        Async counterpart of `invoke`: consumes the runner's async event stream on
+        the caller's event loop, so other tasks keep running while the LLM and
+        any delegated agents are working.
+        """
+        session = self._get_or_create_session(session_id)
+
+        with self._turn_span(session_id) as span:
+            routed = await self._route_directly(session, query)
+            span.set_attribute("host_agent.fast_path", routed is not None)
+            if routed is not None:
+                return routed
+
+            content = types.Content(role="user", parts=[types.Part.from_text(text=query)])
+
+            events = [
+                event
+                async for event in self._runner.run_async(
+                    user_id=self._user_id, session_id=session.id, new_message=content
+                )
+            ]
+            return self._final_text(events)
+
+    async def stream(self, query: str, session_id: str) -> AsyncIterable[dict]:
+        """
+        Streaming variant of `invoke_async`: runs the agent with SSE streaming and
+        yields progress updates as the runner produces events.
+
+        Each update is a dict with a `kind` and a human-readable `text`:
+        - "delegation": a child agent was asked to handle the task
+        - "tool_call": an MCP or helper tool was called
+        - "tool_result": a tool or child agent returned
+        - "text": a partial chunk of the model's answer
+        - "final": the complete answer, always yielded last
+        """
+        session = self._get_or_create_session(session_id)
+
+        with self._turn_span(session_id) as span:
+            decision = self.router.route(query)
+            if self._can_route_directly(decision):
+                yield {"kind": "delegation", "text": f"Delegating to {decision.agent_name}"}
+            routed = await self._route_directly(session, query, decision)
+            span.set_attribute("host_agent.fast_path", routed is not None)
+            if routed is not None:
+                yield {"kind": "final", "text": routed}
+                return
+
+            content = types.Content(role="user", parts=[types.Part.from_text(text=query)])
+
+            final_events = []
+            async for event in self._runner.run_async(
+                user_id=self._user_id,
+                session_id=session.id,
+                new_message=content,
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+            ):
+                for call in event.get_function_calls():
+                    if call.name == self._delegate_task.__name__:
+                        agent_name = (call.args or {}).get("agent_name")
+                        yield {"kind": "delegation", "text": f"Delegating to {agent_name}"}
+                    elif call.name == self._delegate_tasks.__name__:
+                        agent_names = ", ".join((call.args or {}).get("agent_names", []))
+                        yield {"kind": "delegation", "text": f"Delegating to {agent_names}"}
+                    else:
+                        yield {"kind": "tool_call", "text": f"Calling tool {call.name}"}
+                for response in event.get_function_responses():
+                    yield {"kind": "tool_result", "text": f"{response.name} finished"}
+
+                if event.partial:
+                    if event.content and event.content.parts:
+                        text = "".join(p.text for p in event.content.parts if p.text)
+                        if text:
+                            yield {"kind": "text", "text": text}
+                else:
+                    final_events.append(event)
+
+            yield {"kind": "final", "text": self._final_text(final_events)}
@@ -1,24 +1,124 @@
+import asyncio
 import logging
+import math
+import os
+import time
 import uuid
 
+from agent.resilience import CircuitBreaker, LatencyTracker
 from client.client import A2AClient
+from metrics import (
+    AGENT_CIRCUIT_OPENED,
+    AGENT_FAST_FAILURES,
+    AGENT_HEDGED_REQUESTS,
+    AGENT_SLOTS_REJECTED,
+    DELEGATION_SECONDS,
+)
 from models.task import Task
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def client_options_from_env() -> dict:
+    """
+    Connection pool settings for child-agent clients, read from the environment:
+    A2A_MAX_CONNECTIONS, A2A_MAX_KEEPALIVE_CONNECTIONS, A2A_KEEPALIVE_EXPIRY,
+    A2A_CONNECT_TIMEOUT, A2A_READ_TIMEOUT and A2A_HTTP2, plus the per-agent
+    settings of AgentConnector:
+
+    - A2A_AGENT_MAX_CONCURRENCY, A2A_AGENT_QUEUE_TIMEOUT: concurrency cap
+    - A2A_TIMEOUT_MULTIPLIER, A2A_MIN_TIMEOUT: adaptive timeout
+    - A2A_BREAKER_FAILURES, A2A_BREAKER_RESET: circuit breaker
+    - A2A_HEDGE_AGENTS: comma-separated idempotent agents that may get hedged requests
+    - A2A_HEDGE_DELAY: fixed hedge delay in seconds instead of the observed p95
+    """
+    options = {}
+    for key, env, cast in (
+        ("max_concurrency", "A2A_AGENT_MAX_CONCURRENCY", int),
+        ("queue_timeout", "A2A_AGENT_QUEUE_TIMEOUT", float),
+        ("timeout_multiplier", "A2A_TIMEOUT_MULTIPLIER", float),
+        ("min_timeout", "A2A_MIN_TIMEOUT", float),
+        ("breaker_failures", "A2A_BREAKER_FAILURES", int),
+        ("breaker_reset", "A2A_BREAKER_RESET", float),
+        ("hedge_delay", "A2A_HEDGE_DELAY", float),
+        ("max_connections", "A2A_MAX_CONNECTIONS", int),
+        ("max_keepalive_connections", "A2A_MAX_KEEPALIVE_CONNECTIONS", int),
+        ("keepalive_expiry", "A2A_KEEPALIVE_EXPIRY", float),
+        ("connect_timeout", "A2A_CONNECT_TIMEOUT", float),
+        ("read_timeout", "A2A_READ_TIMEOUT", float),
+    ):
+        if os.getenv(env):
+            options[key] = cast(os.getenv(env))
+    if os.getenv("A2A_HTTP2"):
+        options["http2"] = os.getenv("A2A_HTTP2").lower() in ("1", "true", "yes")
+    if os.getenv("A2A_HEDGE_AGENTS"):
+        options["hedge_agents"] = frozenset(
+            name.strip() for name in os.getenv("A2A_HEDGE_AGENTS").split(",") if name.strip()
+        )
+    return options
+
+
+class AgentBusyError(RuntimeError):
+    """Raised when a child agent stays at its concurrency cap for the whole queue timeout."""
+
+
+class AgentUnavailableError(RuntimeError):
+    """Raised without contacting a child agent while its circuit breaker is open."""
+
+
 class AgentConnector:
     """
     Connects to a remote A2A agent and provides a uniform method to delgates the tasks
+
+    At most `max_concurrency` delegations to the agent run at once; others wait
+    up to `queue_timeout` seconds and then fail with AgentBusyError, so one slow
+    agent cannot tie up every turn of the host agent.
+
+    Every delegation is bounded by an adaptive timeout, `timeout_multiplier`
+    times the agent's observed p99 latency, between `min_timeout` and the
+    client's read timeout. Failures and timeouts feed a circuit breaker; while
+    it is open delegations fail right away with AgentUnavailableError.
+
+    Agents listed in `hedge_agents` must be idempotent: when a delegation to
+    them takes longer than `hedge_delay` (default the observed p95) a duplicate
+    is sent as a new task, and whichever answers first wins.
+
     Attributes:
         name (str): remote agent identifier name
         client (A2AClient): HTTP Cliet pointing to Agent's server URL
     """
 
-    def __init__(self, name: str, base_url: str) -> None:
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        max_concurrency: int = 16,
+        queue_timeout: float = 10.0,
+        timeout_multiplier: float = 3.0,
+        min_timeout: float = 5.0,
+        breaker_failures: int = 5,
+        breaker_reset: float = 30.0,
+        hedge_agents: frozenset[str] = frozenset(),
+        hedge_delay: float | None = None,
+        **client_options,
+    ) -> None:
         self.name = name
-        self.client = A2AClient(url=base_url)
+        self.base_url = base_url
+        self.client = A2AClient(url=base_url, **client_options)
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset)
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = client_options.get("read_timeout", 150.0)
+        self.hedged = name in hedge_agents
+        self.hedge_delay = hedge_delay
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
         logger.info(f"AgentConnector initialized for {name} at {base_url}")
 
     async def send_task(self, message: str, session_id: str) -> Task:
@@ -29,8 +129,116 @@ class AgentConnector:
             "sessionId": session_id,
             "message": {"role": "user", "parts": [{"type": "text", "text": message}]},
         }
-        task_result = await self.client.send_task(payload)
+        # Fail fast while open, without waiting for a slot
+        if self.breaker.state == CircuitBreaker.OPEN:
+            raise self._unavailable()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            AGENT_SLOTS_REJECTED.inc(agent=self.name)
+            raise AgentBusyError(
+                f"{self.name} is busy with {self.max_concurrency} tasks, try again later"
+            ) from None
+        # Only ask the breaker once the slot is held, so a probe it lets through
+        # always reaches the try below and reports its outcome
+        if not self.breaker.allow():
+            self._slots.release()
+            raise self._unavailable()
+        self._in_flight += 1
+        self._idle.clear()
+        started = time.perf_counter()
+        timeout = self.timeout()
+        try:
+            with DELEGATION_SECONDS.time(agent=self.name):
+                if self.hedged:
+                    task_result = await self._send_hedged(payload, timeout)
+                else:
+                    task_result = await asyncio.wait_for(self.client.send_task(payload), timeout)
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception as e:
+            if self.breaker.record_failure():
+                AGENT_CIRCUIT_OPENED.inc(agent=self.name)
+                logger.warning(f"Circuit opened for {self.name} \n Reason: {e!r}")
+            if isinstance(e, TimeoutError):
+                raise TimeoutError(f"{self.name} did not answer within {timeout:.1f}s") from None
+            raise
+        else:
+            self.breaker.record_success()
+            self.latency.observe(time.perf_counter() - started)
+        finally:
+            self._slots.release()
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.set()
         logger.info(
             f"AgentConnector: received response from {self.name} for task {task_id}"
         )
         return task_result
+
+    def _unavailable(self) -> AgentUnavailableError:
+        AGENT_FAST_FAILURES.inc(agent=self.name)
+        return AgentUnavailableError(
+            f"{self.name} is unavailable after repeated failures, "
+            f"retry in {math.ceil(self.breaker.retry_after())}s"
+        )
+
+    @property
+    def status(self) -> str:
+        """available, unavailable (breaker open) or recovering (next request is a probe)."""
+        return {
+            CircuitBreaker.CLOSED: "available",
+            CircuitBreaker.OPEN: "unavailable",
+            CircuitBreaker.HALF_OPEN: "recovering",
+        }[self.breaker.state]
+
+    def timeout(self) -> float:
+        """Seconds allowed for the next delegation, from the observed p99 latency."""
+        p99 = self.latency.percentile(99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    async def _send_hedged(self, payload: dict, timeout: float) -> Task:
+        """
+        Send the task and, if it has not answered after the hedge delay, a
+        duplicate under a new task id; return the first successful answer.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        primary = asyncio.create_task(self.client.send_task(payload))
+        jobs = {primary}
+        try:
+            hedge_delay = self.hedge_delay or self.latency.percentile(95)
+            if hedge_delay is not None and hedge_delay < timeout:
+                done, _ = await asyncio.wait(jobs, timeout=hedge_delay)
+                if not done:
+                    AGENT_HEDGED_REQUESTS.inc(agent=self.name)
+                    jobs.add(asyncio.create_task(
+                        self.client.send_task({**payload, "id": uuid.uuid4().hex})
+                    ))
+            error = None
+            while jobs:
+                done, jobs = await asyncio.wait(
+                    jobs, timeout=deadline - loop.time(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for job in done:
+                    if job.exception() is None:
+                        return job.result()
+                    error = job.exception()
+            raise error
+        finally:
+            for job in jobs | {primary}:
+                job.cancel()
+
+    async def close(self) -> None:
+        """Release the pooled HTTP connections to the remote agent."""
+        await self.client.aclose()
+
+    async def close_when_idle(self) -> None:
+        """Close the connector once the tasks it is currently delegating have finished."""
+        await self._idle.wait()
+        await self.close()
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from metrics import (
+    DELEGATION_CACHE_ENTRIES,
+    DELEGATION_CACHE_EVICTIONS,
+    DELEGATION_CACHE_REQUESTS,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class DelegationCache:
+    """
+    Caches child-agent answers by (agent name, normalized message).
+
+    - Entries live for the agent's TTL; an agent with a TTL of 0 is never cached.
+    - At most `max_entries` answers are kept, least recently used evicted first.
+    - Concurrent identical delegations share one in-flight request; when the
+      delegation leading it is cancelled, a waiting one fetches in its place.
+    - Failed delegations are not cached.
+
+    Configured from a JSON file (default `delegation_cache.json` next to this
+    repo's mcp_config.json, or the path in DELEGATION_CACHE_CONFIG):
+
+        {
+          "enabled": true,
+          "maxEntries": 1024,
+          "defaultTtl": 30,
+          "agents": {"weather_agent": {"ttl": 300}, "booking_agent": {"ttl": 0}}
+        }
+
+    The counters below are also exported as delegation_cache_requests_total
+    and delegation_cache_evictions_total.
+
+    Attributes:
+        hits (int): Answers served from the cache
+        misses (int): Delegations that reached the child agent
+        coalesced (int): Delegations that waited on an identical in-flight request
+        evictions (int): Entries dropped to stay within `max_entries`
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 30.0,
+        max_entries: int = 1024,
+        agent_ttls: dict[str, float] = None,
+    ) -> None:
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._agent_ttls = agent_ttls or {}
+        self._entries: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        DELEGATION_CACHE_ENTRIES.set_function(lambda: len(self._entries))
+
+    @classmethod
+    def from_config(cls, config_file: str = None) -> "DelegationCache | None":
+        """Build the cache from its JSON config, or return None when it is absent or disabled."""
+        config_file = (
+            config_file
+            or os.getenv("DELEGATION_CACHE_CONFIG")
+            or os.path.join(os.path.dirname(os.path.dirname(__file__)), "delegation_cache.json")
+        )
+        try:
+            with open(config_file, "r") as file:
+                config = json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f" Error occurred while reading delegation cache config. \n Reason: {e}")
+            return None
+
+        if not config.get("enabled", True):
+            return None
+        return cls(
+            default_ttl=config.get("defaultTtl", 30.0),
+            max_entries=config.get("maxEntries", 1024),
+            agent_ttls={
+                name: agent.get("ttl", config.get("defaultTtl", 30.0))
+                for name, agent in config.get("agents", {}).items()
+            },
+        )
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Case- and whitespace-insensitive form of a message."""
+        return " ".join(message.lower().split())
+
+    def ttl(self, agent_name: str) -> float:
+        return self._agent_ttls.get(agent_name, self._default_ttl)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
+
+    async def get_or_fetch(
+        self, agent_name: str, message: str, fetch: Callable[[], Awaitable[str]]
+    ) -> str:
+        """
+        Return the cached answer for this agent and message, joining an identical
+        in-flight delegation if there is one, or call `fetch` and cache its answer.
+        """
+        ttl = self.ttl(agent_name)
+        if ttl <= 0:
+            return await fetch()
+
+        key = (agent_name, self.normalize(message))
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, answer = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                DELEGATION_CACHE_REQUESTS.inc(agent=agent_name, result="hit")
+                logger.info(f"Delegation cache hit for {agent_name} {self.stats()}")
+                return answer
+            del self._entries[key]
+
+        while (in_flight := self._in_flight.get(key)) is not None:
+            self.coalesced += 1
+            DELEGATION_CACHE_REQUESTS.inc(agent=agent_name, result="coalesced")
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if not in_flight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # Only the leader was cancelled, e.g. by its turn's fan-out
+                # deadline; this turn still wants the answer, so fetch it anew
+
+        self.misses += 1
+        DELEGATION_CACHE_REQUESTS.inc(agent=agent_name, result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            answer = await fetch()
+        except Exception as e:
+            future.set_exception(e)
+            # Followers receive the exception; mark it retrieved for the leader-only case
+            future.exception()
+            raise
+        else:
+            future.set_result(answer)
+            self._entries[key] = (time.monotonic() + ttl, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                DELEGATION_CACHE_EVICTIONS.inc()
+            return answer
+        finally:
+            self._in_flight.pop(key, None)
+            if not future.done():
+                # The leader was cancelled; followers take over the fetch
+                future.cancel()
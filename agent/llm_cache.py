@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.base_llm_connection import BaseLlmConnection
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "cache", "record", "replay")
+
+
+def request_key(llm_request: LlmRequest, stream: bool) -> str:
+    """
+    Hash of everything that determines the model's answer: model, system
+    instruction, tool schemas, generation settings and the conversation
+    including the new message.
+
+    Function call ids are generated per run by ADK, so they are left out and
+    a replayed conversation with tool calls still hits its recording.
+    """
+    contents = [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents]
+    for content in contents:
+        for part in content.get("parts", []):
+            for field in ("function_call", "function_response"):
+                if field in part:
+                    part[field].pop("id", None)
+    config = (
+        llm_request.config.model_dump(mode="json", exclude_none=True)
+        if llm_request.config
+        else {}
+    )
+    config.pop("http_options", None)
+    spec = json.dumps(
+        {"model": llm_request.model, "stream": stream, "config": config, "contents": contents},
+        sort_keys=True,
+    )
+    return hashlib.sha256(spec.encode()).hexdigest()
+
+
+class LlmResponseCache:
+    """
+    Model responses by request key, kept in memory and optionally on disk.
+
+    - Entries live for `ttl` seconds; a TTL of 0 keeps them until evicted.
+    - At most `max_entries` entries are kept, least recently used evicted first.
+    - With a `directory`, every entry is also written to `<directory>/<key>.json`
+      and loaded back on startup, so recordings survive restarts and can be
+      checked in as fixtures.
+
+    Configured from the environment by `from_env`:
+
+    - LLM_CACHE_MODE: off (default), cache, record or replay, see CachingLlm
+    - LLM_CACHE_DIR: directory of the on-disk entries, memory only when unset
+    - LLM_CACHE_TTL: seconds an entry is served in cache mode (default 3600)
+    - LLM_CACHE_MAX_ENTRIES: maximum entries (default 1024)
+
+    Attributes:
+        hits (int): Requests answered from the cache
+        misses (int): Requests that reached the model
+        evictions (int): Entries dropped to stay within `max_entries`
+    """
+
+    def __init__(
+        self, directory: str = None, ttl: float = 3600.0, max_entries: int = 1024
+    ) -> None:
+        self.directory = directory
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # key -> (created at, serialized responses)
+        self._entries: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> "LlmResponseCache | None":
+        """Build the cache from the environment, or return None when LLM_CACHE_MODE is off."""
+        if os.getenv("LLM_CACHE_MODE", "off") == "off":
+            return None
+        return cls(
+            directory=os.getenv("LLM_CACHE_DIR") or None,
+            ttl=float(os.getenv("LLM_CACHE_TTL", "3600")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r") as file:
+                    entry = json.load(file)
+                entries.append((entry["createdAt"], entry["key"], entry["responses"]))
+            except Exception as e:
+                logger.warning(f" Ignoring unreadable LLM cache entry {name}. \n Reason: {e}")
+        for created_at, key, responses in sorted(entries):
+            self._entries[key] = (created_at, responses)
+        self._evict()
+        logger.info(f"Loaded {len(self._entries)} LLM cache entries from {self.directory}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
+
+    def get(self, key: str, ignore_ttl: bool = False) -> list[LlmResponse] | None:
+        """The recorded responses of a request, or None when absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, responses = entry
+        if not ignore_ttl and self._ttl > 0 and created_at + self._ttl < time.time():
+            return None
+        self._entries.move_to_end(key)
+        return [LlmResponse.model_validate(response) for response in responses]
+
+    async def put(self, key: str, responses: list[LlmResponse]) -> None:
+        """Store the responses of a request, writing the entry file off the event loop."""
+        created_at = time.time()
+        serialized = [response.model_dump(mode="json", exclude_none=True) for response in responses]
+        self._entries[key] = (created_at, serialized)
+        self._entries.move_to_end(key)
+        evicted = self._evict()
+        if self.directory:
+            entry = {"key": key, "createdAt": created_at, "responses": serialized}
+            await asyncio.to_thread(self._write, key, entry, evicted)
+
+    def _evict(self) -> list[str]:
+        evicted = []
+        while len(self._entries) > self._max_entries:
+            key, _ = self._entries.popitem(last=False)
+            evicted.append(key)
+            self.evictions += 1
+        return evicted
+
+    def _write(self, key: str, entry: dict, evicted: list[str]) -> None:
+        tmp_file = f"{self._path(key)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, "w") as file:
+                json.dump(entry, file)
+            os.replace(tmp_file, self._path(key))
+            for old_key in evicted:
+                try:
+                    os.remove(self._path(old_key))
+                except FileNotFoundError:
+                    pass
+        except Exception as e:
+            logger.warning(f" Error occurred while writing LLM cache entry. \n Reason: {e}")
+
+
+class CachingLlm(BaseLlm):
+    """
+    Model wrapper that answers repeated requests from an LlmResponseCache.
+
+    Modes:
+    - "cache": serve unexpired entries, call the model on a miss and store its answer
+    - "record": always call the model and store its answer, to capture fixtures
+    - "replay": serve entries regardless of age and never call the model; a
+      request without a recording fails, so replayed runs need no network
+
+    Responses with an error code are never stored.
+
+    Attributes:
+        inner: The wrapped model
+        cache: Where responses are kept
+        mode: One of "cache", "record" or "replay"
+    """
+
+    inner: BaseLlm
+    cache: LlmResponseCache
+    mode: str = "cache"
+
+    @classmethod
+    def wrap(cls, inner: BaseLlm, cache: LlmResponseCache, mode: str) -> "CachingLlm":
+        if mode not in MODES[1:]:
+            raise ValueError(f"Unknown LLM cache mode: {mode}")
+        return cls(model=inner.model, inner=inner, cache=cache, mode=mode)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key(llm_request, stream)
+        if self.mode != "record":
+            responses = self.cache.get(key, ignore_ttl=self.mode == "replay")
+            if responses is not None:
+                self.cache.hits += 1
+                for response in responses:
+                    yield response
+                return
+            if self.mode == "replay":
+                raise LookupError(f"No recorded LLM response for request {key}")
+
+        self.cache.misses += 1
+        responses = []
+        async for response in self.inner.generate_content_async(llm_request, stream):
+            responses.append(response)
+            yield response
+        if responses and not any(response.error_code for response in responses):
+            await self.cache.put(key, responses)
+
+    def connect(self, llm_request: LlmRequest) -> BaseLlmConnection:
+        # Live sessions are bidirectional and cannot be replayed
+        return self.inner.connect(llm_request)
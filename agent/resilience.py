@@ -0,0 +1,109 @@
+import logging
+import math
+import time
+from collections import deque
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """
+    Latencies of the most recent successful requests to one agent.
+
+    Args:
+        window: Number of recent samples kept
+        min_samples: Samples needed before percentiles are reported
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._min_samples = min_samples
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> float | None:
+        """Nearest-rank percentile of the window, or None with too few samples."""
+        if len(self._samples) < self._min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an agent is unhealthy.
+
+    - closed: requests go through; `failure_threshold` consecutive failures open it
+    - open: requests are refused until `reset_timeout` seconds have passed
+    - half_open: one probe request goes through; its success closes the
+      breaker and its failure opens it again
+
+    Args:
+        failure_threshold: Consecutive failures that open the breaker
+        reset_timeout: Seconds the breaker stays open before a probe is allowed
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until a probe request is allowed, 0 when not open."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a request may go out now; in half_open only the first caller gets to probe."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Circuit closed after a successful probe")
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """
+        Count a failed request.
+
+        Returns:
+            True when this failure opened the breaker
+        """
+        self._failures += 1
+        if self._probing or (
+            self._opened_at is None and self._failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._probing = False
+            return True
+        return False
+
+    def abandon(self) -> None:
+        """Forget a request that ended without a result, e.g. cancelled, so another can probe."""
+        self._probing = False
@@ -0,0 +1,127 @@
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from models.agent import AgentCard
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _features(text: str) -> Counter:
+    """Word unigrams, word bigrams and character trigrams of a lowercased text."""
+    words = _WORD.findall(text.lower())
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"#{word}#"
+        features.update(f"#3:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """
+    Outcome of scoring a query against every agent.
+
+    Attributes:
+        agent_name (str | None): Best matching agent, None when there are no agents
+        score (float): Cosine similarity of the best agent
+        runner_up (float): Cosine similarity of the second best agent
+        confident (bool): Whether the match clears both the threshold and the margin
+    """
+
+    agent_name: str | None
+    score: float
+    runner_up: float
+    confident: bool
+
+
+class AgentRouter:
+    """
+    Local TF-IDF index over the agent cards, used to route obvious queries
+    without asking the LLM.
+
+    Each agent is one document made of its card description and its skills'
+    names, descriptions, tags and examples. Queries are scored by cosine
+    similarity; a match is confident when it scores at least `threshold` and
+    beats the runner-up by at least `margin`.
+
+    Args:
+        agent_cards: Cards of the child agents
+        threshold: Minimum similarity for a confident match
+        margin: Minimum lead over the second best agent
+    """
+
+    def __init__(
+        self, agent_cards: List[AgentCard], threshold: float = 0.35, margin: float = 0.2
+    ) -> None:
+        self.threshold = threshold
+        self.margin = margin
+        self._names = [card.name for card in agent_cards]
+
+        documents = [_features(self._document(card)) for card in agent_cards]
+        self._vocabulary = {
+            feature: index
+            for index, feature in enumerate(sorted(set().union(*documents)))
+        }
+        document_frequency = Counter(
+            feature for document in documents for feature in document
+        )
+        self._idf = np.ones(len(self._vocabulary), dtype=np.float32)
+        for feature, index in self._vocabulary.items():
+            self._idf[index] = math.log((1 + len(documents)) / (1 + document_frequency[feature])) + 1
+
+        self._matrix = np.zeros((len(documents), len(self._vocabulary)), dtype=np.float32)
+        for row, document in enumerate(documents):
+            self._matrix[row] = self._vector(document)
+
+    @staticmethod
+    def _document(card: AgentCard) -> str:
+        parts = [card.name.replace("_", " "), card.description]
+        for skill in card.skills:
+            parts.append(skill.name)
+            parts.append(skill.description or "")
+            parts.extend(skill.tags or [])
+            parts.extend(skill.examples or [])
+        return " ".join(parts)
+
+    def _vector(self, features: Counter) -> np.ndarray:
+        vector = np.zeros(len(self._vocabulary), dtype=np.float32)
+        for feature, count in features.items():
+            index = self._vocabulary.get(feature)
+            if index is not None:
+                vector[index] = 1 + math.log(count)
+        vector *= self._idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def route(self, query: str) -> RouteDecision:
+        """Score a query against every agent and log the decision."""
+        if not self._names:
+            return RouteDecision(None, 0.0, 0.0, False)
+
+        scores = self._matrix @ self._vector(_features(query))
+        order = np.argsort(scores)[::-1]
+        best = float(scores[order[0]])
+        runner_up = float(scores[order[1]]) if len(order) > 1 else 0.0
+        decision = RouteDecision(
+            agent_name=self._names[order[0]],
+            score=best,
+            runner_up=runner_up,
+            confident=best >= self.threshold and best - runner_up >= self.margin,
+        )
+
+        # What was done with the decision is counted by the caller
+        logger.info(
+            f"Router decision: agent={decision.agent_name} score={best:.3f} "
+            f"runner_up={runner_up:.3f} confident={decision.confident}"
+        )
+        return decision
@@ -0,0 +1,194 @@
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from metrics import SESSIONS_EVICTED
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rough average for English text; no tokenizer is needed to keep prompts in budget
+CHARS_PER_TOKEN = 4
+
+SUMMARY_HEADER = "For context, a summary of the earlier conversation, whose full turns were compacted away:"
+
+
+class BoundedSessionService(InMemorySessionService):
+    """
+    InMemorySessionService that forgets sessions instead of growing forever.
+
+    - Sessions not read or written for `idle_ttl` seconds are evicted.
+    - Beyond `max_sessions`, the least recently used sessions are evicted.
+
+    Eviction runs as sessions are read or created, starting from the least
+    recently used one, so it costs nothing while no session is due. A user who
+    comes back after eviction starts a new conversation.
+
+    Args:
+        idle_ttl: Seconds of inactivity before a session is evicted, 0 to keep them
+        max_sessions: Maximum sessions kept, 0 for no limit
+    """
+
+    def __init__(self, idle_ttl: float = 3600.0, max_sessions: int = 10_000) -> None:
+        super().__init__()
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        # (app name, user id, session id) -> last access, least recently used first
+        self._last_access: OrderedDict[tuple[str, str, str], float] = OrderedDict()
+
+    @property
+    def count(self) -> int:
+        return len(self._last_access)
+
+    def _touch(self, key: tuple[str, str, str]) -> None:
+        self._last_access[key] = time.monotonic()
+        self._last_access.move_to_end(key)
+
+    def _remove(self, key: tuple[str, str, str]) -> None:
+        app_name, user_id, session_id = key
+        self._last_access.pop(key, None)
+        self.sessions.get(app_name, {}).get(user_id, {}).pop(session_id, None)
+
+    def evict(self) -> None:
+        """Drop idle sessions, then the least recently used ones above `max_sessions`."""
+        if self.idle_ttl > 0:
+            idle_since = time.monotonic() - self.idle_ttl
+            while self._last_access:
+                key, last_access = next(iter(self._last_access.items()))
+                if last_access > idle_since:
+                    break
+                self._remove(key)
+                SESSIONS_EVICTED.inc(reason="idle")
+        while self.max_sessions and len(self._last_access) > self.max_sessions:
+            self._remove(next(iter(self._last_access)))
+            SESSIONS_EVICTED.inc(reason="capacity")
+
+    def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        self._touch((app_name, user_id, session.id))
+        self.evict()
+        return session
+
+    def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Session:
+        self.evict()
+        session = super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            self._touch((app_name, user_id, session_id))
+        return session
+
+    def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._last_access.pop((app_name, user_id, session_id), None)
+
+    def append_event(self, session: Session, event: Event) -> Event:
+        key = (session.app_name, session.user_id, session.id)
+        if key in self._last_access:
+            self._touch(key)
+        return super().append_event(session=session, event=event)
+
+
+def _part_chars(part: types.Part) -> int:
+    if part.text:
+        return len(part.text)
+    if part.function_call:
+        return len(part.function_call.name or "") + len(
+            json.dumps(part.function_call.args or {}, default=str)
+        )
+    if part.function_response:
+        return len(json.dumps(part.function_response.response or {}, default=str))
+    return 0
+
+
+def estimate_tokens(contents: list[types.Content]) -> int:
+    """Approximate token count of a conversation, from its length in characters."""
+    chars = sum(_part_chars(part) for content in contents for part in content.parts or [])
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def _starts_turn(content: types.Content) -> bool:
+    # A user message, as opposed to the tool results ADK also sends as role "user"
+    parts = content.parts or []
+    return (
+        content.role == "user"
+        and any(part.text for part in parts)
+        and not any(part.function_response for part in parts)
+    )
+
+
+def _summary(contents: list[types.Content], max_tokens: int) -> types.Content:
+    """Extractive summary: the latest messages of the dropped turns, shortened, within `max_tokens`."""
+    budget = max_tokens * CHARS_PER_TOKEN - len(SUMMARY_HEADER)
+    lines: list[str] = []
+    for content in reversed(contents):
+        text = " ".join(part.text for part in content.parts or [] if part.text).strip()
+        if not text:
+            continue
+        speaker = "User" if content.role == "user" else "Assistant"
+        line = f"- {speaker}: {' '.join(text.split())[:200]}"
+        if len(line) + 1 > budget:
+            break
+        budget -= len(line) + 1
+        lines.append(line)
+    return types.Content(
+        role="user",
+        parts=[types.Part.from_text(text="\n".join([SUMMARY_HEADER, *reversed(lines)]))],
+    )
+
+
+def compact_contents(
+    contents: list[types.Content], token_budget: int, summary_tokens: int = 500
+) -> list[types.Content]:
+    """
+    Sliding window over a conversation: drop the oldest whole turns until the
+    rest, plus a short summary of what was dropped, fits in `token_budget`.
+
+    Turns are cut only where a user message starts, so a tool call is never
+    separated from its result. The current turn is always kept, even when it
+    alone exceeds the budget.
+
+    Returns:
+        The compacted contents, or `contents` itself when it already fits
+    """
+    sizes = [estimate_tokens([content]) for content in contents]
+    if sum(sizes) <= token_budget:
+        return contents
+
+    starts = [index for index, content in enumerate(contents) if index and _starts_turn(content)]
+    if not starts:
+        return contents
+    # Suffix sums, so each candidate cut is checked in O(1)
+    remaining = [0] * (len(contents) + 1)
+    for index in range(len(contents) - 1, -1, -1):
+        remaining[index] = remaining[index + 1] + sizes[index]
+
+    cut = next(
+        (start for start in starts if remaining[start] + summary_tokens <= token_budget),
+        starts[-1],
+    )
+    return [_summary(contents[:cut], summary_tokens), *contents[cut:]]
@@ -1,10 +1,23 @@
 import logging
+from typing import AsyncIterable
 
 from agent.agent import HostAgent
-from models.request import SendTaskRequest, SendTaskResponse
-from models.task import Message, TaskState, TaskStatus, TextPart
+from models.request import (
+    SendTaskRequest,
+    SendTaskResponse,
+    SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
+)
+from models.task import (
+    Message,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
 from server.task_manager import InMemoryTaskManager
-import json
+from server.task_store import ShardedTaskStore
+from structured_logging import log_payload
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,16 +25,16 @@ logger = logging.getLogger(__name__)
 
 class HostAgentTaskManager(InMemoryTaskManager):
     """
-    🪄 TaskManager wrapper: exposes HostAgent.invoke() over the
+    🪄 TaskManager wrapper: exposes HostAgent.invoke_async() over the
     A2A JSON-RPC `tasks/send` endpoint, handling in-memory storage and
     response formatting.
     """
 
-    def __init__(self, agent: HostAgent):
-        super().__init__()  # Initialize base in-memory storage
+    def __init__(self, agent: HostAgent, store: ShardedTaskStore = None):
+        super().__init__(store)  # Initialize base in-memory storage
         self.agent = agent  # Store our orchestrator logic
 
-    def _get_user_text(self, request: SendTaskRequest) -> str:
+    def _get_user_text(self, request: SendTaskRequest | SendTaskStreamingRequest) -> str:
         """
         Helper: extract the user's raw input text from the request object.
         """
@@ -33,7 +46,7 @@ class HostAgentTaskManager(InMemoryTaskManager):
         1. Store the incoming user message
         2. Invoke the HostAgent to get a response
         3. Append response to history, mark completed
-        4. Return a SendTaskResponse with the full Task
+        4. Return a SendTaskResponse with the Task (last `historyLength` messages)
         """
         logger.info(f"OrchestratorTaskManager received task {request.params.id}")
 
@@ -42,14 +55,71 @@ class HostAgentTaskManager(InMemoryTaskManager):
 
         # Step 2: run orchestration logic
         user_text = self._get_user_text(request)
-        response_text = self.agent.invoke(user_text, request.params.session_id)
+        try:
+            response_text = await self.agent.invoke_async(user_text, request.params.session_id)
+        except Exception:
+            # Record the failure so the task does not stay in flight forever
+            await self.update_task(task.id, TaskState.FAILED)
+            raise
 
         # Step 3: wrap the LLM output into a Message
         reply = Message(role="agent", parts=[TextPart(text=response_text)])
-        logger.info(f"\nOutgoing JSON Response:\n {json.dumps(reply.model_dump(), indent=2)}")
-        async with self.lock:
-            task.status = TaskStatus(state=TaskState.COMPLETED)
-            task.history.append(reply)
-            
-        # Step 4: return structured response
-        return SendTaskResponse(id=request.id, result=task)
+        log_payload(logger, "Outgoing reply", reply, task_id=task.id)
+        task = await self.update_task(task.id, TaskState.COMPLETED, reply)
+
+        # Step 4: return structured response, trimmed to the requested history length
+        return SendTaskResponse(
+            id=request.id,
+            result=self.task_view(task, request.params.historyLength),
+        )
+
+    async def on_send_task_subscribe(
+        self, request: SendTaskStreamingRequest
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """
+        Called by the A2A server for `tasks/sendSubscribe`:
+        1. Store the incoming user message and announce that work started
+        2. Stream HostAgent progress (tool calls, delegations, partial text)
+        3. Append the final answer to history and emit the final event
+        """
+        logger.info(f"OrchestratorTaskManager received streaming task {request.params.id}")
+
+        def update(state: TaskState, text: str, kind: str, final: bool = False):
+            status = TaskStatus(
+                state=state,
+                message=Message(role="agent", parts=[TextPart(text=text)]),
+            )
+            event = TaskStatusUpdateEvent(
+                id=request.params.id, status=status, final=final, metadata={"kind": kind}
+            )
+            return SendTaskStreamingResponse(id=request.id, result=event)
+
+        task = None
+        # Set once a final state is stored, whether or not the client saw it
+        finished = False
+        try:
+            task = await self.upsert_task(request.params)
+            yield update(TaskState.WORKING, "Working on it", "status")
+
+            async for progress in self.agent.stream(
+                self._get_user_text(request), request.params.session_id
+            ):
+                if progress["kind"] == "final":
+                    reply = Message(role="agent", parts=[TextPart(text=progress["text"])])
+                    await self.update_task(task.id, TaskState.COMPLETED, reply)
+                    finished = True
+                    yield update(TaskState.COMPLETED, progress["text"], "final", final=True)
+                else:
+                    yield update(TaskState.WORKING, progress["text"], progress["kind"])
+        except Exception as e:
+            logger.error(f"Streaming task {request.params.id} failed\n Reason: {e}")
+            if task is not None and not finished:
+                await self.update_task(task.id, TaskState.FAILED)
+                finished = True
+            yield update(TaskState.FAILED, str(e), "error", final=True)
+        finally:
+            # The client went away (the generator was closed or cancelled) before
+            # the task finished, so it must not stay in flight forever
+            if task is not None and not finished:
+                logger.info(f"Streaming task {task.id} canceled by the client")
+                await self.update_task(task.id, TaskState.CANCELED)
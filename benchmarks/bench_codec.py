@@ -0,0 +1,82 @@
+"""
+Cost of decoding a request and encoding a task response with 10, 100 and 1000
+history messages, comparing the previous dict-based path with the bytes path
+now used by A2AServer.
+
+- decode: `json.loads` + `A2ARequest.validate_python` vs `A2ARequest.validate_json`
+- encode: `jsonable_encoder(model_dump())` + JSONResponse vs `model_dump_json` + Response
+
+    python -m benchmarks.bench_codec --repeat 200
+"""
+
+import json
+import time
+
+import click
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from models.request import A2ARequest, SendTaskRequest, SendTaskResponse
+from models.task import Message, Task, TaskSendParams, TaskState, TaskStatus, TextPart
+
+
+def _message(index: int) -> Message:
+    role = "user" if index % 2 == 0 else "agent"
+    return Message(role=role, parts=[TextPart(text=f"message {index} " + "lorem ipsum " * 20)])
+
+
+def _request_body(history: int) -> bytes:
+    # Requests carry a single message; make it as large as the whole history
+    text = " ".join(part.text for index in range(history) for part in _message(index).parts)
+    request = SendTaskRequest(
+        params=TaskSendParams(
+            id="task", message=Message(role="user", parts=[TextPart(text=text)])
+        )
+    )
+    return request.model_dump_json().encode()
+
+
+def _response(history: int) -> SendTaskResponse:
+    log = [_message(index) for index in range(history)]
+    task = Task.model_construct(
+        id="task", status=TaskStatus(state=TaskState.COMPLETED), history=log
+    )
+    return SendTaskResponse(id="request", result=task)
+
+
+def _per_call_us(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+@click.command()
+@click.option("--repeat", default=200, help="Iterations per measurement")
+def main(repeat: int):
+    print(f"{'history':>8}{'step':>8}{'dict path us':>15}{'bytes path us':>15}{'speedup':>9}")
+    for history in (10, 100, 1000):
+        body = _request_body(history)
+        response = _response(history)
+
+        old_decode = _per_call_us(lambda: A2ARequest.validate_python(json.loads(body)), repeat)
+        new_decode = _per_call_us(lambda: A2ARequest.validate_json(body), repeat)
+        old_encode = _per_call_us(
+            lambda: JSONResponse(
+                content=jsonable_encoder(response.model_dump(exclude_none=True))
+            ).body,
+            repeat,
+        )
+        new_encode = _per_call_us(
+            lambda: Response(
+                content=response.model_dump_json(exclude_none=True),
+                media_type="application/json",
+            ).body,
+            repeat,
+        )
+        for step, old, new in (("decode", old_decode, new_decode), ("encode", old_encode, new_encode)):
+            print(f"{history:>8}{step:>8}{old:>15.1f}{new:>15.1f}{old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
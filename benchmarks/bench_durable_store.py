@@ -0,0 +1,82 @@
+"""
+Per-task cost of persistence: each operation is what one `tasks/send` does to
+the store (upsert the user message, then complete the task with the reply).
+
+Compares the in-memory ShardedTaskStore with DurableTaskStore on SQLite (WAL),
+both with write-behind group commit and with `sync_commit` waiting for the batch.
+
+    python -m benchmarks.bench_durable_store --tasks 20000 --concurrency 100
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+import click
+
+from models.task import Message, TaskSendParams, TaskState, TextPart
+from server.durable_task_store import DurableTaskStore, SQLiteBackend
+from server.task_store import ShardedTaskStore
+
+MESSAGE = Message(role="user", parts=[TextPart(text="What is the weather in Paris?")])
+REPLY = Message(role="agent", parts=[TextPart(text="Sunny, 24 degrees." * 4)])
+
+
+async def _run(store, tasks: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        task_id = uuid.uuid4().hex
+        async with semaphore:
+            start = time.perf_counter()
+            await store.upsert(TaskSendParams(id=task_id, message=MESSAGE))
+            await store.update(task_id, TaskState.COMPLETED, REPLY)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(tasks)))
+    if isinstance(store, DurableTaskStore):
+        await store.close()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (
+        tasks / elapsed,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    )
+
+
+@click.command()
+@click.option("--tasks", default=20000, help="Tasks to store")
+@click.option("--concurrency", default=100, help="Concurrent writers")
+def main(tasks: int, concurrency: int):
+    with tempfile.TemporaryDirectory() as directory:
+        stores = (
+            ("in-memory", lambda: ShardedTaskStore(max_tasks=10000)),
+            (
+                "sqlite",
+                lambda: DurableTaskStore(
+                    SQLiteBackend(os.path.join(directory, "async.db")), max_tasks=10000
+                ),
+            ),
+            (
+                "sqlite-sync",
+                lambda: DurableTaskStore(
+                    SQLiteBackend(os.path.join(directory, "sync.db")),
+                    sync_commit=True,
+                    max_tasks=10000,
+                ),
+            ),
+        )
+        print(f"{'store':<14}{'tasks/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, factory in stores:
+            throughput, p50, p99 = asyncio.run(_run(factory(), tasks, concurrency))
+            print(f"{name:<14}{throughput:>10.0f}{p50:>10.3f}{p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+End-to-end load test of the host agent, fully offline.
+
+Everything the host agent talks to is replaced by a local stand-in from
+benchmarks.fakes, each in its own process:
+
+- the registry on 127.0.0.1:3100 (the port DiscoveryClient uses), serving the
+  child agent cards and credentials
+- `--children` stub child agents, A2AServers answering after `--child-latency`
+- the stub stdio MCP server, started by the host agent from a generated config
+- ScriptedLlm as the model, selected with HOST_AGENT_MODEL=scripted-llm
+
+The host agent itself is the real server from `agent.__main__.create_server`,
+so startup, discovery, MCP sessions, delegation and the task store are all
+measured. For every concurrency level, that many clients run sessions of
+`--turns` consecutive `tasks/send` requests, each followed by a `tasks/get` of
+the task. A request delegates to a child agent, calls the MCP tool or is
+answered directly, following `--delegate-ratio` and `--tool-ratio`.
+
+Throughput and p50/p95/p99 latency are reported per method. `--output` saves
+them as JSON; `--baseline` compares against a saved run and exits with status
+1 when throughput drops or p95 latency grows by more than `--tolerance`.
+
+    python -m benchmarks.bench_e2e -c 1 -c 8 -c 32 --requests 300 --output e2e.json
+    python -m benchmarks.bench_e2e -c 1 -c 8 -c 32 --requests 300 --baseline e2e.json
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+import click
+import httpx
+import uvicorn
+
+REGISTRY_PORT = 3100
+
+
+def _serve_registry(child_urls: dict[str, str]) -> None:
+    from benchmarks.fakes import registry_app, stub_agent_card
+    from structured_logging import configure_logging
+
+    configure_logging()
+    cards = [stub_agent_card(name, url) for name, url in child_urls.items()]
+    app = registry_app(cards, {"BENCH_API_KEY": "bench-secret"})
+    uvicorn.run(app, host="127.0.0.1", port=REGISTRY_PORT, log_level="warning")
+
+
+def _serve_child(name: str, port: int, latency: float) -> None:
+    from benchmarks.fakes import stub_child_server
+    from structured_logging import configure_logging
+
+    configure_logging()
+    server = stub_child_server(name, "127.0.0.1", port, latency)
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _serve_host(port: int, admission: dict) -> None:
+    # Importing the fakes registers ScriptedLlm with ADK's model registry
+    import benchmarks.fakes  # noqa: F401
+    from agent.__main__ import build_agent_card, create_server
+    from structured_logging import configure_logging
+
+    configure_logging()
+    create_server(
+        "127.0.0.1", port, build_agent_card(f"http://127.0.0.1:{port}/"), **admission
+    ).start()
+
+
+async def _wait_ready(url: str, timeout: float = 120.0) -> None:
+    async with httpx.AsyncClient() as client:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready")
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return float("nan")
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+class LoadGenerator:
+    """
+    Closed-loop load: `concurrency` clients each run sessions back to back,
+    one request at a time, until `requests` tasks were sent in total.
+
+    Args:
+        url: Host agent URL
+        children: Names of the child agents to delegate to
+        delegate_ratio: Fraction of requests delegated to a child agent
+        tool_ratio: Fraction of requests calling the MCP tool
+        turns: Consecutive requests per session
+        seed: Seed of the request mix
+    """
+
+    def __init__(
+        self,
+        url: str,
+        children: list[str],
+        delegate_ratio: float,
+        tool_ratio: float,
+        turns: int,
+        seed: int = 0,
+    ) -> None:
+        self.url = url
+        self.children = children
+        self.delegate_ratio = delegate_ratio
+        self.tool_ratio = tool_ratio
+        self.turns = turns
+        self._random = random.Random(seed)
+
+    def _message(self) -> str:
+        draw = self._random.random()
+        if draw < self.delegate_ratio:
+            return f"delegate {self._random.choice(self.children)}: what is new?"
+        if draw < self.delegate_ratio + self.tool_ratio:
+            return "tool echo: ping"
+        return "hello"
+
+    @staticmethod
+    def _request(method: str, params: dict) -> dict:
+        return {"jsonrpc": "2.0", "id": uuid.uuid4().hex, "method": method, "params": params}
+
+    async def _call(self, client: httpx.AsyncClient, method: str, params: dict, samples: dict):
+        started = time.perf_counter()
+        try:
+            response = await client.post("/", json=self._request(method, params))
+            response.raise_for_status()
+            result = response.json()
+            ok = result.get("error") is None and (
+                method != "tasks/send" or result["result"]["status"]["state"] == "completed"
+            )
+        except (httpx.HTTPError, KeyError, ValueError):
+            ok = False
+        samples[method]["latencies"].append(time.perf_counter() - started)
+        if not ok:
+            samples[method]["errors"] += 1
+
+    async def run(self, concurrency: int, requests: int) -> dict:
+        """
+        Returns:
+            Per method: count, errors, throughput (requests/s) and p50/p95/p99 in ms
+        """
+        samples = {
+            method: {"latencies": [], "errors": 0} for method in ("tasks/send", "tasks/get")
+        }
+        remaining = iter(range(requests))
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(base_url=self.url, limits=limits, timeout=600) as client:
+
+            async def user() -> None:
+                while True:
+                    session_id = uuid.uuid4().hex
+                    for _ in range(self.turns):
+                        if next(remaining, None) is None:
+                            return
+                        task_id = uuid.uuid4().hex
+                        message = {"role": "user", "parts": [{"type": "text", "text": self._message()}]}
+                        await self._call(
+                            client,
+                            "tasks/send",
+                            {"id": task_id, "sessionId": session_id, "message": message},
+                            samples,
+                        )
+                        await self._call(
+                            client, "tasks/get", {"id": task_id, "historyLength": 1}, samples
+                        )
+
+            started = time.perf_counter()
+            await asyncio.gather(*(user() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+        report = {}
+        for method, sample in samples.items():
+            latencies = sorted(sample["latencies"])
+            report[method] = {
+                "count": len(latencies),
+                "errors": sample["errors"],
+                "throughput": len(latencies) / elapsed,
+                **{
+                    f"p{percent}_ms": _percentile(latencies, percent) * 1000
+                    for percent in (50, 95, 99)
+                },
+            }
+        return report
+
+
+def _regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    found = []
+    for level, methods in results.items():
+        for method, current in methods.items():
+            previous = baseline.get(level, {}).get(method)
+            if previous is None:
+                continue
+            if current["throughput"] < previous["throughput"] * (1 - tolerance):
+                found.append(
+                    f"{method} at concurrency {level}: throughput "
+                    f"{current['throughput']:.1f}/s < {previous['throughput']:.1f}/s"
+                )
+            if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                found.append(
+                    f"{method} at concurrency {level}: p95 "
+                    f"{current['p95_ms']:.1f}ms > {previous['p95_ms']:.1f}ms"
+                )
+    return found
+
+
+@click.command()
+@click.option("-c", "--concurrency", multiple=True, type=int, default=(1, 8, 32), help="Concurrency levels")
+@click.option("--requests", default=200, help="tasks/send requests per concurrency level")
+@click.option("--warmup", default=10, help="Unmeasured requests before the first level")
+@click.option("--turns", default=3, help="Consecutive requests per session")
+@click.option("--children", default=2, help="Stub child agents")
+@click.option("--delegate-ratio", default=0.5, help="Fraction of requests delegated to a child agent")
+@click.option("--tool-ratio", default=0.25, help="Fraction of requests calling the MCP tool")
+@click.option("--llm-latency", default=0.05, help="Seconds per fake model call")
+@click.option("--child-latency", default=0.05, help="Seconds per child agent task")
+@click.option("--tool-latency", default=0.01, help="Seconds per MCP tool call")
+@click.option("--max-in-flight", default=0, help="Host agent admission limit, 0 for none")
+@click.option("--max-queue", default=0, help="Host agent admission queue size")
+@click.option("--port", default=18100, help="Host agent port, child agents use the next ports")
+@click.option("--output", type=click.Path(), help="Write the results as JSON")
+@click.option("--baseline", type=click.Path(exists=True), help="Results JSON to compare against")
+@click.option("--tolerance", default=0.2, help="Allowed relative regression against the baseline")
+def main(
+    concurrency: tuple[int, ...],
+    requests: int,
+    warmup: int,
+    turns: int,
+    children: int,
+    delegate_ratio: float,
+    tool_ratio: float,
+    llm_latency: float,
+    child_latency: float,
+    tool_latency: float,
+    max_in_flight: int,
+    max_queue: int,
+    port: int,
+    output: str | None,
+    baseline: str | None,
+    tolerance: float,
+):
+    from benchmarks.fakes import stub_mcp_config
+
+    workdir = tempfile.mkdtemp(prefix="bench_e2e_")
+    child_urls = {
+        f"agent{index}": f"http://127.0.0.1:{port + 1 + index}/" for index in range(children)
+    }
+    # Spawned processes inherit this environment
+    os.environ.update(
+        SERVER_DOMAIN="http://127.0.0.1",
+        HOST_AGENT_MODEL="scripted-llm",
+        SCRIPTED_LLM_LATENCY=str(llm_latency),
+        MCP_CONFIG_FILE=stub_mcp_config(os.path.join(workdir, "mcp_config.json"), tool_latency),
+        MCP_TOOL_CACHE=os.path.join(workdir, "mcp_tool_cache.json"),
+    )
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_serve_registry, args=(child_urls,), daemon=True)]
+    processes += [
+        context.Process(target=_serve_child, args=(name, port + 1 + index, child_latency), daemon=True)
+        for index, name in enumerate(child_urls)
+    ]
+    admission = dict(max_in_flight=max_in_flight, max_queue=max_queue)
+    processes.append(context.Process(target=_serve_host, args=(port, admission), daemon=True))
+    for process in processes:
+        process.start()
+
+    url = f"http://127.0.0.1:{port}"
+    results = {}
+    try:
+        started = time.perf_counter()
+        asyncio.run(_wait_ready(url))
+        print(f"host agent ready in {time.perf_counter() - started:.2f}s, {multiprocessing.cpu_count()} CPUs")
+
+        load = LoadGenerator(url, list(child_urls), delegate_ratio, tool_ratio, turns)
+        if warmup:
+            asyncio.run(load.run(1, warmup))
+
+        print(f"{'concurrency':>11}  {'method':<10}{'count':>7}{'errors':>7}{'req/s':>9}"
+              f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for level in concurrency:
+            results[str(level)] = report = asyncio.run(load.run(level, requests))
+            for method, stats in report.items():
+                print(
+                    f"{level:>11}  {method:<10}{stats['count']:>7}{stats['errors']:>7}"
+                    f"{stats['throughput']:>9.1f}{stats['p50_ms']:>9.1f}"
+                    f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+                )
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+    if output:
+        with open(output, "w") as file:
+            json.dump(results, file, indent=2)
+    if baseline:
+        with open(baseline) as file:
+            regressions = _regressions(results, json.load(file), tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Throughput of `tasks/send` on one HostAgent server at 1, 10 and 100 concurrent
+requests, comparing the blocking `HostAgent.invoke` with `invoke_async`.
+
+The model is replaced by SleepyLlm, so the numbers show how many model round
+trips overlap on one event loop rather than real Gemini latency.
+
+    python -m benchmarks.bench_send_concurrency --latency 0.05
+"""
+
+import asyncio
+import time
+import uuid
+
+import click
+import httpx
+
+from agent.task_manager import HostAgentTaskManager
+from benchmarks.fakes import SleepyLlm, build_host_agent
+from models.agent import AgentCapabilities, AgentCard
+from models.request import SendTaskRequest, SendTaskResponse
+from models.task import Message, TaskState, TextPart
+from server.server import A2AServer
+
+
+class BlockingTaskManager(HostAgentTaskManager):
+    """The previous behaviour: the synchronous invoke runs on the event loop."""
+
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        task = await self.upsert_task(request.params)
+        response_text = self.agent.invoke(
+            self._get_user_text(request), request.params.session_id
+        )
+        reply = Message(role="agent", parts=[TextPart(text=response_text)])
+        task = await self.update_task(task.id, TaskState.COMPLETED, reply)
+        return SendTaskResponse(id=request.id, result=self.task_view(task))
+
+
+def _payload() -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": uuid.uuid4().hex,
+        "method": "tasks/send",
+        "params": {
+            "id": uuid.uuid4().hex,
+            "sessionId": uuid.uuid4().hex,
+            "message": {"role": "user", "parts": [{"type": "text", "text": "hello"}]},
+        },
+    }
+
+
+async def _run(task_manager, concurrency: int, total: int) -> float:
+    card = AgentCard(
+        name="bench", description="bench", url="http://bench/", version="0",
+        capabilities=AgentCapabilities(), skills=[],
+    )
+    server = A2AServer(host="bench", port=0, agent_card=card, task_manager=task_manager)
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=server.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one():
+            async with semaphore:
+                response = await client.post("/", json=_payload(), timeout=600)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - start)
+
+
+@click.command()
+@click.option("--latency", default=0.05, help="Simulated model latency in seconds")
+@click.option("--requests-per-level", default=100, help="Requests sent at each level")
+def main(latency: float, requests_per_level: int):
+    host_agent = build_host_agent(SleepyLlm(latency=latency))
+    print(f"{'mode':<10}{'concurrency':>12}{'tasks/s':>12}")
+    for mode, manager_cls in (("blocking", BlockingTaskManager), ("async", HostAgentTaskManager)):
+        for concurrency in (1, 10, 100):
+            throughput = asyncio.run(
+                _run(manager_cls(agent=host_agent), concurrency, requests_per_level)
+            )
+            print(f"{mode:<10}{concurrency:>12}{throughput:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
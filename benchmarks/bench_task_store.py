@@ -0,0 +1,104 @@
+"""
+Contention benchmark for the task store: many workers issue a mix of
+`tasks/send`-style writes (upsert + completion update) and `tasks/get` reads
+across thousands of task IDs.
+
+`global-lock` reproduces the previous InMemoryTaskManager: one asyncio.Lock
+around every read and write. `sharded` is ShardedTaskStore with lock-free
+snapshot reads. `--hold-ms` simulates work done while the write lock is held
+(e.g. persisting the task) — that is where a single lock serializes the server.
+
+    python -m benchmarks.bench_task_store --tasks 5000 --workers 500 --hold-ms 1
+"""
+
+import asyncio
+import random
+import statistics
+import time
+
+import click
+
+from models.task import Message, TaskSendParams, TaskState, TextPart
+from server.task_store import ShardedTaskStore
+
+
+class HoldingStore(ShardedTaskStore):
+    def __init__(self, shards: int, hold: float) -> None:
+        super().__init__(shards=shards)
+        self._hold = hold
+
+    async def _persist(self, previous, snapshot) -> None:
+        if self._hold:
+            await asyncio.sleep(self._hold)
+
+
+class GlobalLockStore(HoldingStore):
+    """One lock for every operation, reads included."""
+
+    def __init__(self, hold: float) -> None:
+        super().__init__(shards=1, hold=hold)
+        self._read_lock = self._shards[0].lock
+
+    async def aget(self, task_id: str):
+        async with self._read_lock:
+            return self.get(task_id)
+
+
+class ShardedStore(HoldingStore):
+    async def aget(self, task_id: str):
+        return self.get(task_id)
+
+
+MESSAGE = Message(role="user", parts=[TextPart(text="hello")])
+REPLY = Message(role="agent", parts=[TextPart(text="hi")])
+
+
+async def _run(store, tasks: int, workers: int, ops: int, read_ratio: float):
+    ids = [f"task-{i}" for i in range(tasks)]
+    for task_id in ids:
+        await store.upsert(TaskSendParams(id=task_id, message=MESSAGE))
+    latencies = []
+    rng = random.Random(7)
+
+    async def worker():
+        for _ in range(ops):
+            task_id = rng.choice(ids)
+            start = time.perf_counter()
+            if rng.random() < read_ratio:
+                await store.aget(task_id)
+            else:
+                await store.upsert(TaskSendParams(id=task_id, message=MESSAGE))
+                await store.update(task_id, TaskState.COMPLETED, REPLY)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (
+        len(latencies) / elapsed,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    )
+
+
+@click.command()
+@click.option("--tasks", default=5000, help="Distinct task IDs")
+@click.option("--workers", default=500, help="Concurrent clients")
+@click.option("--ops", default=20, help="Operations per client")
+@click.option("--read-ratio", default=0.7, help="Share of tasks/get operations")
+@click.option("--hold-ms", default=1.0, help="Simulated work while holding a write lock")
+@click.option("--shards", default=64, help="Lock stripes of the sharded store")
+def main(tasks: int, workers: int, ops: int, read_ratio: float, hold_ms: float, shards: int):
+    hold = hold_ms / 1000
+    print(f"{'store':<12}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, store in (
+        ("global-lock", GlobalLockStore(hold)),
+        ("sharded", ShardedStore(shards, hold)),
+    ):
+        throughput, p50, p99 = asyncio.run(_run(store, tasks, workers, ops, read_ratio))
+        print(f"{name:<12}{throughput:>12.0f}{p50:>10.2f}{p99:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
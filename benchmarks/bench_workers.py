@@ -0,0 +1,138 @@
+"""
+Throughput of `tasks/send` through the session dispatcher with 1 worker
+process versus N, plus a single process without the dispatcher as baseline.
+
+Each worker runs a HostAgent around SleepyLlm, so what scales with workers is
+the CPU spent per turn (runner, session copies, JSON) rather than model time.
+Every session sends `--turns` consecutive tasks, which the dispatcher keeps
+on one worker.
+
+    python -m benchmarks.bench_workers --workers 4 --concurrency 64
+"""
+
+import asyncio
+import multiprocessing
+import time
+import uuid
+
+import click
+import httpx
+import uvicorn
+
+from agent.__main__ import build_agent_card
+from agent.task_manager import HostAgentTaskManager
+from benchmarks.fakes import SleepyLlm, build_host_agent
+from server.dispatcher import SessionDispatcher
+from server.server import A2AServer
+
+
+def _serve_worker(port: int, latency: float) -> None:
+    server = A2AServer(
+        host="127.0.0.1",
+        port=port,
+        agent_card=build_agent_card(f"http://127.0.0.1:{port}/"),
+        task_manager=HostAgentTaskManager(agent=build_host_agent(SleepyLlm(latency=latency))),
+    )
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _serve_dispatcher(port: int, worker_ports: list[int]) -> None:
+    dispatcher = SessionDispatcher(
+        "127.0.0.1",
+        port,
+        [f"http://127.0.0.1:{worker_port}" for worker_port in worker_ports],
+        build_agent_card(f"http://127.0.0.1:{port}/"),
+    )
+    uvicorn.run(dispatcher.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def _wait_ready(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(600):
+            try:
+                if (await client.get(f"{url}/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready")
+
+
+async def _load(url: str, sessions: int, turns: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=600) as client:
+
+        async def session() -> None:
+            session_id = uuid.uuid4().hex
+            for turn in range(turns):
+                async with semaphore:
+                    response = await client.post(
+                        "/",
+                        json={
+                            "jsonrpc": "2.0",
+                            "id": uuid.uuid4().hex,
+                            "method": "tasks/send",
+                            "params": {
+                                "id": uuid.uuid4().hex,
+                                "session_id": session_id,
+                                "message": {
+                                    "role": "user",
+                                    "parts": [{"type": "text", "text": f"turn {turn}"}],
+                                },
+                            },
+                        },
+                    )
+                    response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(session() for _ in range(sessions)))
+        return sessions * turns / (time.perf_counter() - start)
+
+
+def _run(label: str, workers: int, dispatch: bool, args: dict) -> None:
+    context = multiprocessing.get_context("spawn")
+    base = args["port"]
+    worker_ports = [base + 1 + index for index in range(workers)]
+    processes = [
+        context.Process(target=_serve_worker, args=(port, args["latency"]), daemon=True)
+        for port in worker_ports
+    ]
+    if dispatch:
+        processes.append(
+            context.Process(target=_serve_dispatcher, args=(base, worker_ports), daemon=True)
+        )
+    url = f"http://127.0.0.1:{base if dispatch else worker_ports[0]}"
+    for process in processes:
+        process.start()
+    try:
+        asyncio.run(_wait_ready(url))
+        throughput = asyncio.run(
+            _load(url, args["sessions"], args["turns"], args["concurrency"])
+        )
+        print(f"{label:<24}{workers:>8}{throughput:>12.1f}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+
+@click.command()
+@click.option("--workers", default=4, help="Worker processes of the multi-worker run")
+@click.option("--latency", default=0.05, help="Simulated model latency in seconds")
+@click.option("--sessions", default=200, help="Concurrent sessions")
+@click.option("--turns", default=3, help="Consecutive tasks per session")
+@click.option("--concurrency", default=64, help="Requests in flight at once")
+@click.option("--port", default=18000, help="Dispatcher port, workers use the next ports")
+def main(workers: int, latency: float, sessions: int, turns: int, concurrency: int, port: int):
+    args = dict(latency=latency, sessions=sessions, turns=turns, concurrency=concurrency, port=port)
+    print(f"{multiprocessing.cpu_count()} CPUs")
+    print(f"{'mode':<24}{'workers':>8}{'tasks/s':>12}")
+    _run("single process", 1, False, args)
+    _run("dispatcher", 1, True, args)
+    _run("dispatcher", workers, True, args)
+
+
+if __name__ == "__main__":
+    main()
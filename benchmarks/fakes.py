@@ -0,0 +1,203 @@
+"""
+Offline stand-ins used by the benchmarks:
+
+- SleepyLlm and ScriptedLlm, fake models for the HostAgent
+- a HostAgent built without the credentials registry or MCP servers
+- the registry app serving `/agent_cards` and `/credentials`
+- stub child agents, A2AServers answering after a fixed latency
+- benchmarks/stub_mcp_server.py, a stdio MCP server with an `echo` tool
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import AsyncGenerator, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+from agent.agent import HostAgent
+from mcp_connect import MCPConnector
+from models.agent import AgentCapabilities, AgentCard, AgentSkill
+from models.request import SendTaskRequest, SendTaskResponse
+from models.task import Message, TaskState, TextPart
+from server.server import A2AServer
+from server.task_manager import InMemoryTaskManager
+
+STUB_MCP_SERVER = os.path.join(os.path.dirname(__file__), "stub_mcp_server.py")
+
+
+class SleepyLlm(BaseLlm):
+    """Answers every request with a fixed text after a simulated model latency."""
+
+    model: str = "sleepy-llm"
+    latency: float = 0.05
+    reply: str = "ok"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.latency)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part.from_text(text=self.reply)])
+        )
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Fake model that follows a script written into the user message, so a load
+    generator decides what every turn does:
+
+    - "delegate <agent>: <text>" calls the delegate tool for that child agent
+    - "tool <name>: <text>" calls an MCP tool with `{"text": <text>}`
+    - anything else is answered directly
+
+    Once the tool result is in the conversation the model answers with it.
+    Every call sleeps SCRIPTED_LLM_LATENCY seconds (default 0.05) first.
+
+    Registered with ADK's LLMRegistry, so HOST_AGENT_MODEL=scripted-llm selects
+    it in any process that imported this module.
+    """
+
+    model: str = "scripted-llm"
+    latency: float = float(os.getenv("SCRIPTED_LLM_LATENCY", "0.05"))
+
+    _DELEGATE = re.compile(r"delegate (\S+): (.*)", re.DOTALL)
+    _TOOL = re.compile(r"tool (\S+): (.*)", re.DOTALL)
+
+    @staticmethod
+    def supported_models() -> list[str]:
+        return [r"scripted-llm"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.latency)
+        parts = (llm_request.contents[-1].parts or []) if llm_request.contents else []
+        result = next((part.function_response for part in parts if part.function_response), None)
+        if result is not None:
+            yield self._text(f"{result.name} answered: {json.dumps(result.response, default=str)}")
+            return
+
+        text = "".join(part.text or "" for part in parts)
+        if match := self._DELEGATE.match(text):
+            yield self._call(
+                HostAgent._delegate_task.__name__,
+                {"agent_name": match[1], "message": match[2]},
+            )
+        elif match := self._TOOL.match(text):
+            yield self._call(match[1], {"args": {"text": match[2]}})
+        else:
+            yield self._text(f"echo: {text}")
+
+    @staticmethod
+    def _text(text: str) -> LlmResponse:
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part.from_text(text=text)]))
+
+    @staticmethod
+    def _call(name: str, args: dict) -> LlmResponse:
+        return LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+            )
+        )
+
+
+LLMRegistry.register(ScriptedLlm)
+
+
+def build_host_agent(model: BaseLlm, agent_cards: List[AgentCard] = None) -> HostAgent:
+    """Build a HostAgent around `model` without fetching credentials or MCP tools."""
+    return HostAgent(
+        agent_cards=agent_cards or [],
+        credentials={},
+        mcp=MCPConnector(load=False),
+        model=model,
+    )
+
+
+def stub_agent_card(name: str, url: str) -> AgentCard:
+    """Card of a stub child agent with a single skill named after it."""
+    return AgentCard(
+        name=name,
+        description=f"Answers every question about {name}",
+        url=url,
+        version="1.0.0",
+        capabilities=AgentCapabilities(),
+        skills=[AgentSkill(id=name, name=name, description=f"Questions about {name}")],
+    )
+
+
+def registry_app(agent_cards: List[AgentCard], credentials: dict[str, str]) -> FastAPI:
+    """
+    The agent registry: `/agent_cards` and `/credentials`, with an ETag so
+    conditional polls of an unchanged registry get a 304.
+    """
+    app = FastAPI()
+    body = json.dumps(
+        {"data": [card.model_dump(exclude_none=True) for card in agent_cards]}
+    ).encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()}"'
+
+    @app.get("/agent_cards")
+    async def get_agent_cards(request: Request):
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    @app.get("/credentials")
+    async def get_credentials():
+        return JSONResponse({"data": credentials})
+
+    return app
+
+
+class StubTaskManager(InMemoryTaskManager):
+    """Child agent task manager completing every task after `latency` seconds."""
+
+    def __init__(self, name: str, latency: float) -> None:
+        super().__init__()
+        self.name = name
+        self.latency = latency
+
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        task = await self.upsert_task(request.params)
+        await asyncio.sleep(self.latency)
+        text = request.params.message.parts[0].text
+        reply = Message(role="agent", parts=[TextPart(text=f"{self.name}: {text}")])
+        task = await self.update_task(task.id, TaskState.COMPLETED, reply)
+        return SendTaskResponse(id=request.id, result=self.task_view(task))
+
+
+def stub_child_server(name: str, host: str, port: int, latency: float) -> A2AServer:
+    """An A2AServer for a stub child agent listening on host:port."""
+    return A2AServer(
+        host=host,
+        port=port,
+        agent_card=stub_agent_card(name, f"http://{host}:{port}/"),
+        task_manager=StubTaskManager(name, latency),
+    )
+
+
+def stub_mcp_config(path: str, latency: float) -> str:
+    """Write an MCP config that starts the stub MCP server, and return its path."""
+    config = {
+        "mcpServers": {
+            "stub": {
+                "command": sys.executable,
+                "args": [STUB_MCP_SERVER, "--latency", str(latency)],
+            }
+        }
+    }
+    with open(path, "w") as file:
+        json.dump(config, file)
+    return path
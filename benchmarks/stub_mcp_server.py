@@ -0,0 +1,32 @@
+"""
+Stdio MCP server with a single `echo` tool, standing in for the npx servers
+of mcp_config.json. Started by the host agent through stub_mcp_config().
+
+    python benchmarks/stub_mcp_server.py --latency 0.01
+"""
+
+import asyncio
+
+import click
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("stub", log_level="WARNING")
+settings = {"latency": 0.0}
+
+
+@server.tool()
+async def echo(text: str) -> str:
+    """Return the text unchanged after the configured latency."""
+    await asyncio.sleep(settings["latency"])
+    return text
+
+
+@click.command()
+@click.option("--latency", default=0.0, help="Seconds every tool call takes")
+def main(latency: float):
+    settings["latency"] = latency
+    server.run("stdio")
+
+
+if __name__ == "__main__":
+    main()
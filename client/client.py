@@ -1,13 +1,25 @@
 
+import asyncio
 import json
-from typing import Any
+from typing import Any, AsyncIterable
 from uuid import uuid4
 
 import httpx
+from httpx_sse import aconnect_sse
+from opentelemetry.propagate import inject
+from opentelemetry.trace import SpanKind
 from models.agent import AgentCard
-from models.json_rpc import JSONRPCRequest
-from models.request import SendTaskRequest
+from models.json_rpc import JSONRPCRequest, JSONRPCResponse
+from models.request import (
+    GetTaskRequest,
+    GetTaskResponse,
+    SendTaskRequest,
+    SendTaskResponse,
+    SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
+)
 from models.task import Task, TaskSendParams
+from tracing import tracer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,7 +33,34 @@ class A2AClientJSONError(Exception):
     pass
 
 class A2AClient:
-    def __init__(self, agent_card: AgentCard = None, url: str = None):
+    """
+    JSON-RPC client for a remote A2A agent.
+
+    A single pooled httpx.AsyncClient is kept per A2AClient, so consecutive
+    requests reuse TCP/TLS connections instead of handshaking every time.
+
+    Args:
+        agent_card: Card of the remote agent (its url is used)
+        url: Remote agent URL, used when no agent card is given
+        max_connections: Maximum open connections to the agent
+        max_keepalive_connections: Maximum idle connections kept for reuse
+        keepalive_expiry: Seconds an idle connection is kept open
+        connect_timeout: Seconds to wait while establishing a connection
+        read_timeout: Seconds to wait for the agent to answer
+        http2: Negotiate HTTP/2 when the optional `h2` package is installed
+    """
+
+    def __init__(
+        self,
+        agent_card: AgentCard = None,
+        url: str = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 150.0,
+        http2: bool = False,
+    ):
         if agent_card:
             self.url = agent_card.url
         elif url:
@@ -29,6 +68,43 @@ class A2AClient:
         else:
             raise ValueError("Either agent card or url must be provided")
 
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._http2 = http2 and self._h2_available()
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+
+    @staticmethod
+    def _h2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+            return False
+        return True
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The pooled client, created on first use for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # Pooled connections belong to the loop that opened them
+            self._client = httpx.AsyncClient(
+                limits=self._limits, timeout=self._timeout, http2=self._http2
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
     async def send_task(self, payload: dict[str, Any]):
         request = SendTaskRequest(
             id = uuid4().hex,
@@ -41,15 +117,78 @@ class A2AClient:
         response = await self._send_request(request)
         return Task(**response["result"])
     
-    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            logger.info(f"Client URL {self.url}")
+    async def send_task_streaming(
+        self, payload: dict[str, Any]
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Send a task with `tasks/sendSubscribe` and yield its status updates as they arrive."""
+        request = SendTaskStreamingRequest(
+            id=uuid4().hex, params=TaskSendParams(**payload)
+        )
+        with tracer.start_as_current_span(
+            "a2a.client tasks/sendSubscribe",
+            kind=SpanKind.CLIENT,
+            attributes={"server.url": self.url, "a2a.task_id": request.params.id},
+        ):
+            headers = {}
+            inject(headers)
+            try:
+                async with aconnect_sse(
+                    self.http_client, "POST", self.url, json=request.model_dump(), headers=headers
+                ) as event_source:
+                    event_source.response.raise_for_status()
+                    async for sse in event_source.aiter_sse():
+                        yield SendTaskStreamingResponse.model_validate_json(sse.data)
+
+            except httpx.HTTPStatusError as e:
+                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+
+    async def send_batch(
+        self, requests: list[SendTaskRequest | GetTaskRequest]
+    ) -> list[JSONRPCResponse]:
+        """
+        Send several requests in one JSON-RPC batch.
+
+        Returns:
+            One response per request, in request order: SendTaskResponse or
+            GetTaskResponse, carrying either a result or a per-request error
+
+        Raises:
+            A2AClientJSONError: The server rejected the batch as a whole, e.g.
+                an empty or invalid batch, with a single error response
+        """
+        response_types = {
+            request.id: SendTaskResponse if isinstance(request, SendTaskRequest) else GetTaskResponse
+            for request in requests
+        }
+        responses = await self._send_request(requests)
+        if not isinstance(responses, list):
+            error = responses.get("error") if isinstance(responses, dict) else None
+            raise A2AClientJSONError(f"Batch rejected: {error or responses}")
+        by_id = {
+            response.get("id"): response_types.get(response.get("id"), JSONRPCResponse)(**response)
+            for response in responses
+        }
+        return [by_id.get(request.id) for request in requests]
+
+    async def _send_request(
+        self, request: JSONRPCRequest | list[JSONRPCRequest]
+    ) -> dict[str, Any] | list[dict[str, Any]]:
+        logger.info(f"Client URL {self.url}")
+        method = "batch" if isinstance(request, list) else request.method
+        with tracer.start_as_current_span(
+            f"a2a.client {method}",
+            kind=SpanKind.CLIENT,
+            attributes={"server.url": self.url, "rpc.method": method},
+        ):
+            # Carry the trace context to the remote agent as a traceparent header
+            headers = {}
+            inject(headers)
             try:
-                response = await client.post(
-                    self.url,
-                    json=request.model_dump(),
-                    timeout=150
-                )
+                if isinstance(request, list):
+                    body = [item.model_dump() for item in request]
+                else:
+                    body = request.model_dump()
+                response = await self.http_client.post(self.url, json=body, headers=headers)
                 response.raise_for_status()
                 return response.json()
 
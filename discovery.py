@@ -1,9 +1,10 @@
-import ast
+import asyncio
+import hashlib
 import logging
 import os
 from typing import List
 
-import requests
+import httpx
 
 from models.agent import AgentCard
 from dotenv import load_dotenv
@@ -19,11 +20,24 @@ class DiscoveryClient:
     Discover A2A agents by reading a registry file of agent server URLs and querying
     each one's /.well-known/agent.json endpoint to retrieve an AgentCard.
 
+    The registry is read with conditional requests: the ETag and Last-Modified
+    validators of the last response are sent back, so polling an unchanged
+    registry costs a 304 with no body. Registries without validators are
+    compared by a hash of the body instead.
+
     Attributes:
         registry_path (str): The path to the registry file containing a list of agent server URLs.
         base_urls (list[str]): A list of agent server URLs to query.
     """
 
+    def __init__(self, timeout: float = 10.0) -> None:
+        self._timeout = httpx.Timeout(timeout)
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._fingerprint: str | None = None
+
     # def __init__(self, registry_path: str):
     #     if registry_path:
     #         self.registry_path = registry_path
@@ -32,6 +46,25 @@ class DiscoveryClient:
     #             os.path.dirname(__file__), "registry.json"
     #         )
 
+    @property
+    def registry_url(self) -> str:
+        server_domain = os.getenv("SERVER_DOMAIN") or "http://localhost"
+        return f"{server_domain}:3100/agent_cards"
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Keep-alive client for the running event loop, so polls reuse one connection."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self._timeout)
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
     async def fetch_agent_cards(self) -> List[AgentCard]:
         """
         Asynchronously fetch the discovery endpoint from each registered URL
@@ -40,17 +73,63 @@ class DiscoveryClient:
         Returns:
             List[AgentCard]: Successfully retrieved agent cards.
         """
-        agent_cards: List[AgentCard] = []
+        logger.info(f"Fetching agent cards from {self.registry_url}")
+        response = await self.http_client.get(self.registry_url)
+        response.raise_for_status()
+        return self._accept(response)
+
+    async def fetch_credentials(self) -> dict[str, str]:
+        """
+        Fetch the credentials published next to the agent cards.
+
+        Returns:
+            dict[str, str]: Environment variable names and values.
+        """
         server_domain = os.getenv("SERVER_DOMAIN") or "http://localhost"
-        logger.info(f"Server domain for calling agent cards: {server_domain}")
-        responses = requests.get(
-            f"{server_domain}:3100/agent_cards"
-        ).json()
+        logger.info(f"Server domain for calling credentials: {server_domain}")
+        response = await self.http_client.get(f"{server_domain}:3100/credentials")
+        response.raise_for_status()
+        return response.json()["data"]
+
+    async def poll_agent_cards(self) -> List[AgentCard] | None:
+        """
+        Conditionally re-fetch the registry.
+
+        Returns:
+            List[AgentCard] | None: The new agent cards, or None when the registry
+            is unchanged or unreachable.
+        """
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+        try:
+            response = await self.http_client.get(self.registry_url, headers=headers)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Error occurred while polling agent cards. \n Reason: {e}")
+            return None
+
+        fingerprint = hashlib.sha256(response.content).hexdigest()
+        if fingerprint == self._fingerprint:
+            self._remember(response, fingerprint)
+            return None
+        return self._accept(response)
 
-        for response in responses["data"]:
+    def _remember(self, response: httpx.Response, fingerprint: str) -> None:
+        self._etag = response.headers.get("ETag")
+        self._last_modified = response.headers.get("Last-Modified")
+        self._fingerprint = fingerprint
+
+    def _accept(self, response: httpx.Response) -> List[AgentCard]:
+        self._remember(response, hashlib.sha256(response.content).hexdigest())
+        agent_cards: List[AgentCard] = []
+        for card in response.json()["data"]:
             try:
-                card = AgentCard.model_validate(response)
-                agent_cards.append(card)
+                agent_cards.append(AgentCard.model_validate(card))
             except Exception as e:
                 logger.info(f"Error occurred while fetching well known url {e}")
 
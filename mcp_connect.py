@@ -1,73 +1,428 @@
 import asyncio
+import itertools
 import logging
+import os
+from datetime import timedelta
 
+import anyio
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from opentelemetry.trace import SpanKind
 
-from mcp_discover import MCPToolDiscovery
+from mcp_discover import MCPToolCache, MCPToolDiscovery
+from metrics import MCP_TOOL_SECONDS
+from tracing import tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Raised when the server subprocess exited or its pipes closed, so the session
+# is dead and worth restarting for one retry. Tool errors (McpError) and
+# timeouts are raised as is: the server is fine and the tool may have run.
+TRANSPORT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+)
 
-class MCPTool:
+
+class MCPServerSession:
+    """
+    A single long-lived, initialized ClientSession bound to one MCP server subprocess.
+
+    The stdio transport and the ClientSession are entered and exited inside one
+    dedicated owner task, because anyio requires a cancel scope to be left from the
+    same task that entered it. Callers only ever see the initialized session.
+
+    Attributes:
+        session (ClientSession | None): The initialized session while the subprocess is alive.
+    """
+
+    def __init__(self, params: StdioServerParameters, call_timeout: float) -> None:
+        self._params = params
+        self._call_timeout = call_timeout
+        self._closed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.session: ClientSession | None = None
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self.session is not None and self._task is not None and not self._task.done()
+        )
+
+    async def start(self) -> ClientSession:
+        """Spawn the server subprocess and wait until the session is initialized."""
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._serve(ready))
+        return await ready
+
+    async def _serve(self, ready: asyncio.Future) -> None:
+        try:
+            async with stdio_client(self._params) as (read_stream, write_stream):
+                async with ClientSession(
+                    read_stream,
+                    write_stream,
+                    read_timeout_seconds=timedelta(seconds=self._call_timeout),
+                ) as session:
+                    await session.initialize()
+                    self.session = session
+                    ready.set_result(session)
+                    await self._closed.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP session for {self._params.command} ended: {e}")
+        finally:
+            self.session = None
+
+    async def close(self) -> None:
+        self._closed.set()
+        if self._task is not None and not self._task.done():
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except Exception:
+                self._task.cancel()
+
+
+class MCPSessionPool:
+    """
+    Keeps a fixed number of initialized sessions to a single MCP server and
+    multiplexes tool calls over them.
+
+    - Sessions are started lazily on first use and reused afterwards.
+    - ClientSession correlates responses by request id, so one session can carry
+      several concurrent calls; `max_concurrency` caps the total per server.
+    - A call that fails at the transport level (see TRANSPORT_ERRORS) restarts
+      its session and is retried once; any other error is raised as is.
+
+    Attributes:
+        name (str): The server name from mcp_config.json.
+    """
 
     def __init__(
-        self, name, description, input_schema, server_cmd, server_args
+        self,
+        name: str,
+        params: StdioServerParameters,
+        size: int = 1,
+        max_concurrency: int = 8,
+        call_timeout: float = 60.0,
     ) -> None:
+        self.name = name
+        self._params = params
+        self._size = max(1, size)
+        self._max_concurrency = max(1, max_concurrency)
+        self._call_timeout = call_timeout
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: list[MCPServerSession | None] = []
+        self._slot_locks: list[asyncio.Lock] = []
+        self._semaphore: asyncio.Semaphore | None = None
+        self._next_slot = itertools.count()
+
+    def _bind_loop(self) -> None:
+        # Sessions, locks and the semaphore belong to the loop that created them.
+        # If the caller runs on a different loop, the old sessions are unusable.
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self._slots = [None] * self._size
+        self._slot_locks = [asyncio.Lock() for _ in range(self._size)]
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+    @property
+    def open_sessions(self) -> int:
+        return sum(1 for slot in self._slots if slot is not None and slot.alive)
+
+    async def _acquire(self, index: int) -> ClientSession:
+        slot = self._slots[index]
+        if slot is not None and slot.alive:
+            return slot.session
+
+        async with self._slot_locks[index]:
+            slot = self._slots[index]
+            if slot is not None and slot.alive:
+                return slot.session
+            if slot is not None:
+                logger.warning(f"Restarting MCP session {index} for server '{self.name}'")
+                await slot.close()
+            slot = MCPServerSession(self._params, self._call_timeout)
+            self._slots[index] = slot
+            return await slot.start()
+
+    async def _discard(self, index: int, session: ClientSession) -> None:
+        async with self._slot_locks[index]:
+            slot = self._slots[index]
+            # Another caller may already have replaced the broken session
+            if slot is not None and slot.session is session:
+                self._slots[index] = None
+                await slot.close()
+
+    async def start(self) -> None:
+        """Spawn every session of the pool up front instead of on first use."""
+        self._bind_loop()
+        await asyncio.gather(*(self._acquire(index) for index in range(self._size)))
+
+    async def call_tool(self, tool_name: str, args: dict):
+        """
+        Call a tool on one of the pooled sessions, restarting the session and
+        retrying once if the transport fails.
+        """
+        self._bind_loop()
+        async with self._semaphore:
+            index = next(self._next_slot) % self._size
+            session = await self._acquire(index)
+            try:
+                return await session.call_tool(tool_name, args)
+            except TRANSPORT_ERRORS as e:
+                logger.warning(
+                    f"MCP call '{tool_name}' on server '{self.name}' failed, restarting session\n Reason: {e!r}"
+                )
+                await self._discard(index, session)
+                session = await self._acquire(index)
+                return await session.call_tool(tool_name, args)
+
+    async def close(self) -> None:
+        slots, self._slots = self._slots, [None] * self._size
+        for slot in slots:
+            if slot is not None:
+                await slot.close()
+
+
+class MCPTool:
+
+    def __init__(self, name, description, input_schema, pool: MCPSessionPool) -> None:
         self.name = name
         self._description = description
         self._input_schema = input_schema
-        self._params = StdioServerParameters(command=server_cmd, args=server_args)
+        self._pool = pool
+
+    @property
+    def description(self) -> str | None:
+        return self._description
+
+    @property
+    def input_schema(self) -> dict:
+        return self._input_schema
 
     async def run(self, args: dict):
-        async with stdio_client(self._params) as (read_stream, write_stream):
-            async with ClientSession(read_stream, write_stream) as session:
-                await session.initialize()
-                response = await session.call_tool(self.name, args)
-                return getattr(response, "content", str(response))
+        with tracer.start_as_current_span(
+            "mcp.tool", kind=SpanKind.CLIENT, attributes={"mcp.tool": self.name}
+        ), MCP_TOOL_SECONDS.time(tool=self.name):
+            response = await self._pool.call_tool(self.name, args)
+        return getattr(response, "content", str(response))
 
 
 class MCPConnector:
+    """
+    Registers the tools of every MCP server in mcp_config.json.
+
+    Tools are discovered on construction, in a private event loop. Inside a
+    running loop use `await MCPConnector.create()` instead. Either way, call
+    `start` once on the loop serving the tools.
+
+    Args:
+        config_file: Path to the MCP config, mcp_config.json by default
+        load: Discover the tools right away
+    """
 
-    def __init__(self, config_file: str = None) -> None:
+    def __init__(self, config_file: str = None, load: bool = True) -> None:
         self._discovery = MCPToolDiscovery(config_file)
+        self._cache = MCPToolCache()
         self._tools: list[MCPTool] = []
-        self._load_all_tools()
+        self._pools: dict[str, MCPSessionPool] = {}
+        self._revalidation: asyncio.Task | None = None
+        # Servers registered from the cache, revalidated once a loop is running
+        self._unvalidated: dict[str, dict] = {}
+        self._discovery_timeout = float(os.getenv("MCP_DISCOVERY_TIMEOUT", "30"))
+        if load:
+            self._load_all_tools()
+
+    @classmethod
+    async def create(cls, config_file: str = None) -> "MCPConnector":
+        """Build a connector and discover its tools on the running loop."""
+        connector = cls(config_file, load=False)
+        await connector.load()
+        return connector
+
+    def _create_pool(self, name: str, info: dict) -> MCPSessionPool:
+        """
+        Build the session pool for a server entry of mcp_config.json.
+
+        Optional keys next to `command`/`args`:
+            sessions: number of server subprocesses to keep alive (default 1)
+            maxConcurrency: maximum in-flight tool calls for the server (default 8)
+            callTimeout: seconds to wait for a single tool call (default 60)
+        """
+        params = StdioServerParameters(
+            command=info.get("command"), args=info.get("args", [])
+        )
+        return MCPSessionPool(
+            name,
+            params,
+            size=info.get("sessions", 1),
+            max_concurrency=info.get("maxConcurrency", 8),
+            call_timeout=info.get("callTimeout", 60.0),
+        )
+
+    async def _list_server_tools(self, name: str, info: dict) -> list[dict]:
+        """Start a server once and return its tools as plain, cacheable dicts."""
+        params = StdioServerParameters(
+            command=info.get("command"), args=info.get("args", [])
+        )
+        async with stdio_client(params) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                tools = (await session.list_tools()).tools
+
+        return [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "inputSchema": tool.inputSchema,
+            }
+            for tool in tools
+        ]
+
+    async def _discover(self, servers: dict[str, dict]) -> dict[str, list[dict]]:
+        """List the tools of all given servers concurrently and refresh the cache."""
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    self._list_server_tools(name, info), self._discovery_timeout
+                )
+                for name, info in servers.items()
+            ),
+            return_exceptions=True,
+        )
+        discovered = {}
+        for (name, info), result in zip(servers.items(), results):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"Error occurred while loading MCP tools from {name}\n Reason: {result!r}"
+                )
+                continue
+            self._cache.put(name, info, result)
+            discovered[name] = result
+        return discovered
+
+    def _register(self, name: str, tools: list[dict]) -> None:
+        pool = self._pools[name]
+        for tool in tools:
+            self._tools.append(
+                MCPTool(
+                    name=tool["name"],
+                    description=tool["description"],
+                    input_schema=tool["inputSchema"],
+                    pool=pool,
+                )
+            )
+
+    def _register_cached(self) -> tuple[dict[str, dict], dict[str, dict]]:
+        """Create every server's pool and register the cached tools; return (cached, uncached) servers."""
+        mcp_servers = self._discovery.list_servers()
+        cached, uncached = {}, {}
+
+        for name, info in mcp_servers.items():
+            self._pools[name] = self._create_pool(name, info)
+            tools = self._cache.get(info)
+            if tools is None:
+                uncached[name] = info
+            else:
+                logger.info(f"Loaded {len(tools)} MCP tools for {name} from cache")
+                cached[name] = info
+                self._register(name, tools)
+        return cached, uncached
+
+    def _register_discovered(
+        self, servers: dict[str, dict], discovered: dict[str, list[dict]]
+    ) -> None:
+        for name in servers:
+            if name in discovered:
+                self._register(name, discovered[name])
+            else:
+                self._pools.pop(name)
 
     def _load_all_tools(self):
+        """
+        Register the tools of every configured server.
+
+        Servers whose command and args match a cache entry are registered from the
+        cache immediately and revalidated by `start`, on the loop serving the
+        tools; the rest are started concurrently to list their tools.
+        """
+        cached, uncached = self._register_cached()
+
+        if uncached:
+            self._register_discovered(uncached, asyncio.run(self._discover(uncached)))
+
+        self._unvalidated = cached
+
+    async def load(self) -> None:
+        """`_load_all_tools` for a running loop: discovery and revalidation run on that loop."""
+        cached, uncached = self._register_cached()
 
-        async def _fetch():
-            mcp_servers = self._discovery.list_servers()
-
-            for name, info in mcp_servers.items():
-                command = info.get("command")
-                args = info.get("args", [])
-                params = StdioServerParameters(command=command, args=args)
-
-                try:
-                    async with stdio_client(params) as (read_stream, write_stream):
-                        async with ClientSession(read_stream, write_stream) as session:
-                            await session.initialize()
-
-                            tools = (await session.list_tools()).tools
-
-                            for tool in tools:
-                                self._tools.append(
-                                    MCPTool(
-                                        name=tool.name,
-                                        description=tool.description,
-                                        input_schema=tool.inputSchema,
-                                        server_args=args,
-                                        server_cmd=command,
-                                    )
-                                )
-                except Exception as e:
-                    logger.error(
-                        f"Error occurred while loading MCP tools\n Reason: {e}"
-                    )
-
-        asyncio.run(_fetch())
+        if uncached:
+            self._register_discovered(uncached, await self._discover(uncached))
+
+        if cached:
+            self._revalidation = asyncio.create_task(self._revalidate(cached))
+
+    async def _revalidate(self, servers: dict[str, dict]) -> None:
+        """
+        Re-list the tools of servers registered from the cache.
+
+        Runs on the loop serving the tools. Descriptions and schemas of known
+        tools are updated in place and declared to the LLM from its next turn;
+        added or removed tools only reach the LLM after a restart, which reads
+        the refreshed cache.
+        """
+        discovered = await self._discover(servers)
+        for name, tools in discovered.items():
+            fresh = {tool["name"]: tool for tool in tools}
+            known = {tool.name: tool for tool in self._tools if tool._pool is self._pools[name]}
+            for tool_name, tool in known.items():
+                if tool_name in fresh:
+                    tool._description = fresh[tool_name]["description"]
+                    tool._input_schema = fresh[tool_name]["inputSchema"]
+            if fresh.keys() != known.keys():
+                logger.warning(
+                    f"MCP tools of {name} changed since they were cached; "
+                    f"added {sorted(fresh.keys() - known.keys())}, "
+                    f"removed {sorted(known.keys() - fresh.keys())}. Restart to apply."
+                )
 
     def get_tools(self):
         return self._tools.copy()
+
+    @property
+    def open_sessions(self) -> int:
+        return sum(pool.open_sessions for pool in self._pools.values())
+
+    async def start(self) -> None:
+        """
+        Pre-spawn the pooled sessions of every server on the running loop, and
+        revalidate the tools a blocking construction registered from the cache.
+        """
+        if self._unvalidated:
+            servers, self._unvalidated = self._unvalidated, {}
+            self._revalidation = asyncio.create_task(self._revalidate(servers))
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(pool.start(), self._discovery_timeout)
+                for pool in self._pools.values()
+            ),
+            return_exceptions=True,
+        )
+        for name, result in zip(self._pools, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error occurred while starting MCP server {name}\n Reason: {result!r}")
+
+    async def close(self) -> None:
+        """Terminate every pooled MCP server subprocess."""
+        if self._revalidation is not None:
+            self._revalidation.cancel()
+        for pool in self._pools.values():
+            await pool.close()
@@ -1,6 +1,8 @@
+import hashlib
 import json
 import logging
 import os
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,6 +14,8 @@ class MCPToolDiscovery:
 
         if config_file:
             self._config_file = config_file
+        elif os.getenv("MCP_CONFIG_FILE"):
+            self._config_file = os.getenv("MCP_CONFIG_FILE")
         else:
             self._config_file = os.path.join(
                 os.path.dirname(__file__), "mcp_config.json"
@@ -29,3 +33,59 @@ class MCPToolDiscovery:
     def list_servers(self):
         logger.info(f" MCOP Servers{self._config.get("mcpServers", {})}")
         return self._config.get("mcpServers", {})
+
+
+class MCPToolCache:
+    """
+    On-disk cache of the tools advertised by each MCP server.
+
+    Entries are keyed by a hash of the server's command and args, so editing a
+    server entry in mcp_config.json invalidates only that server's tools.
+
+    Attributes:
+        cache_file (str): Path of the JSON cache file.
+    """
+
+    def __init__(self, cache_file: str = None) -> None:
+        self.cache_file = (
+            cache_file
+            or os.getenv("MCP_TOOL_CACHE")
+            or os.path.join(os.path.dirname(__file__), ".mcp_tool_cache.json")
+        )
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    @staticmethod
+    def key(info: dict) -> str:
+        spec = json.dumps(
+            {"command": info.get("command"), "args": info.get("args", [])},
+            sort_keys=True,
+        )
+        return hashlib.sha256(spec.encode()).hexdigest()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.cache_file, "r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f" Ignoring unreadable MCP tool cache. \n Reason: {e}")
+            return {}
+
+    def get(self, info: dict) -> list[dict] | None:
+        entry = self._entries.get(self.key(info))
+        return entry["tools"] if entry else None
+
+    def put(self, name: str, info: dict, tools: list[dict]) -> None:
+        """Store the tools of a server and rewrite the cache file atomically."""
+        with self._lock:
+            self._entries[self.key(info)] = {"server": name, "tools": tools}
+            # Per-process temp file: worker processes may write the cache concurrently
+            tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_file, "w") as file:
+                    json.dump(self._entries, file)
+                os.replace(tmp_file, self.cache_file)
+            except Exception as e:
+                logger.warning(f" Error occurred while writing MCP tool cache. \n Reason: {e}")
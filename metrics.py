@@ -0,0 +1,298 @@
+import bisect
+import os
+import time
+from typing import Callable, Iterable
+
+# Set METRICS_ENABLED=0 to turn every observation into a no-op
+ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Seconds, from sub-millisecond parsing up to multi-minute delegations
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# Estimated tokens, from a one-line prompt to a very long conversation
+TOKEN_BUCKETS = (
+    256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072, 262144, 524288,
+)
+
+
+class _Timer:
+    """Observes the elapsed time of a `with` block, labelling failures with status="error"."""
+
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: "Histogram", labels: dict) -> None:
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if "status" in self._histogram.labelnames:
+            self._labels["status"] = "ok" if exc_type is None else "error"
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class Histogram:
+    """
+    Cumulative histogram per label combination, rendered in Prometheus format.
+
+    Observations only touch a few list slots, so they are meant to be called
+    from the event loop thread without locking.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        labelnames: Names of the labels every observation must provide
+        buckets: Upper bounds of the buckets, in increasing order
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._missing = ("",) * len(self.labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        if not ENABLED:
+            return
+        key = tuple(map(labels.get, self.labelnames, self._missing))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, **labels) -> _Timer:
+        """Context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for key, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            count = cumulative + series[len(self.buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {series[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {count}"
+
+
+class Counter:
+    """
+    Monotonic count per label combination, rendered in Prometheus format.
+
+    Args:
+        name: Metric name, conventionally ending in _total
+        documentation: HELP text
+        labelnames: Names of the labels every increment must provide
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._missing = ("",) * len(self.labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not ENABLED:
+            return
+        key = tuple(map(labels.get, self.labelnames, self._missing))
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in list(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {value}"
+
+
+class Gauge:
+    """
+    Single-value gauge, either set directly or computed by a callback at scrape time.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+    """
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def inc(self, amount: float = 1) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the value with `function` whenever the metrics are scraped."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function is not None else self._value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.value}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Histogram | Counter | Gauge] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_PHASE_SECONDS = REGISTRY.register(
+    Histogram(
+        "a2a_request_phase_seconds",
+        "Time spent per request phase: read (body), validate (JSON decoding and validation), encode (response)",
+        ["phase"],
+    )
+)
+TASK_STORE_LOCK_WAIT_SECONDS = REGISTRY.register(
+    Histogram("task_store_lock_wait_seconds", "Time spent waiting for a task store shard lock")
+)
+LLM_TURN_SECONDS = REGISTRY.register(
+    Histogram("llm_turn_seconds", "Duration of one model call of the host agent", ["model"])
+)
+MCP_TOOL_SECONDS = REGISTRY.register(
+    Histogram("mcp_tool_seconds", "Duration of MCP tool calls", ["tool", "status"])
+)
+DELEGATION_SECONDS = REGISTRY.register(
+    Histogram("delegation_seconds", "Duration of tasks delegated to child agents", ["agent", "status"])
+)
+TASKS_IN_FLIGHT = REGISTRY.register(
+    Gauge("a2a_tasks_in_flight", "Tasks currently being processed")
+)
+STORED_TASKS = REGISTRY.register(Gauge("task_store_tasks", "Tasks held in memory by the task store"))
+STORED_HISTORY_BYTES = REGISTRY.register(
+    Gauge("task_store_history_bytes", "Bytes of message text held in memory by the task store")
+)
+TASK_STORE_EVICTIONS = REGISTRY.register(
+    Counter(
+        "task_store_evictions_total",
+        "Finished tasks dropped from memory: max_tasks, max_history_bytes or ttl",
+        ["reason"],
+    )
+)
+MCP_SESSIONS = REGISTRY.register(Gauge("mcp_sessions_open", "Open MCP server sessions"))
+ADMISSION_WAIT_SECONDS = REGISTRY.register(
+    Histogram("a2a_admission_wait_seconds", "Time requests waited in the admission queue")
+)
+ADMISSION_REJECTED = REGISTRY.register(
+    Counter(
+        "a2a_admission_rejected_total",
+        "Requests rejected by admission control: queue_full or timeout",
+        ["reason"],
+    )
+)
+ADMISSION_QUEUED = REGISTRY.register(
+    Gauge("a2a_admission_queued", "Requests waiting for an admission slot")
+)
+AGENT_SLOTS_REJECTED = REGISTRY.register(
+    Counter(
+        "agent_concurrency_rejected_total",
+        "Delegations rejected because the child agent was at its concurrency cap",
+        ["agent"],
+    )
+)
+AGENT_CIRCUIT_OPENED = REGISTRY.register(
+    Counter("agent_circuit_opened_total", "Times a child agent's circuit breaker opened", ["agent"])
+)
+AGENT_FAST_FAILURES = REGISTRY.register(
+    Counter(
+        "agent_fast_failures_total",
+        "Delegations refused without a request because the agent's breaker was open",
+        ["agent"],
+    )
+)
+AGENT_HEDGED_REQUESTS = REGISTRY.register(
+    Counter("agent_hedged_requests_total", "Duplicate requests sent to slow idempotent agents", ["agent"])
+)
+DELEGATION_CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "delegation_cache_requests_total",
+        "Cacheable delegations by result: hit (cached answer), miss (sent to the agent) "
+        "or coalesced (joined an identical in-flight delegation)",
+        ["agent", "result"],
+    )
+)
+DELEGATION_CACHE_EVICTIONS = REGISTRY.register(
+    Counter("delegation_cache_evictions_total", "Cached answers dropped to stay within maxEntries")
+)
+DELEGATION_CACHE_ENTRIES = REGISTRY.register(
+    Gauge("delegation_cache_entries", "Child-agent answers held by the delegation cache")
+)
+PROMPT_TOKENS = REGISTRY.register(
+    Histogram(
+        "llm_prompt_tokens",
+        "Estimated tokens of the conversation sent to the model, before and after compaction",
+        ["stage"],
+        buckets=TOKEN_BUCKETS,
+    )
+)
+ROUTER_DECISIONS = REGISTRY.register(
+    Counter(
+        "host_agent_router_decisions_total",
+        "Router decisions by outcome: routed (fast path taken), shadow (confident, fast path off), "
+        "declined (confident, agent unavailable or recovering) or fallback (not confident, "
+        "or the agent was busy or unavailable)",
+        ["outcome"],
+    )
+)
+PROMPT_COMPACTIONS = REGISTRY.register(
+    Counter("llm_prompt_compactions_total", "Model calls whose conversation was compacted")
+)
+SESSIONS = REGISTRY.register(Gauge("host_agent_sessions", "Sessions held in memory by the host agent"))
+SESSIONS_EVICTED = REGISTRY.register(
+    Counter("host_agent_sessions_evicted_total", "Sessions evicted: idle or capacity", ["reason"])
+)
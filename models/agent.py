@@ -16,6 +16,7 @@ class AgentSkill(BaseModel):
     id: str
     name: str
     description: str | None = None
+    tags: List[str] | None = None
     examples: List[str] | None = None
     inputModes: List[str] | None = None
     outputModes: List[str] | None = None
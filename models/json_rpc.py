@@ -30,3 +30,16 @@ class InternalError(JSONRPCError):
     code: int = -32603
     message: str = "Internal error"
     data: Any | None = None
+
+
+class TaskNotFoundError(JSONRPCError):
+    code: int = -32001
+    message: str = "Task not found"
+    data: Any | None = None
+
+
+class ServerBusyError(JSONRPCError):
+    # Implementation-defined server error range; mirrors HTTP 429
+    code: int = -32029
+    message: str = "Server is overloaded"
+    data: Any | None = None
@@ -4,7 +4,12 @@ from pydantic import Field
 from pydantic.type_adapter import TypeAdapter
 
 from models.json_rpc import JSONRPCRequest, JSONRPCResponse
-from models.task import Task, TaskQueryParams, TaskSendParams
+from models.task import (
+    Task,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskStatusUpdateEvent,
+)
 
 
 class SendTaskRequest(JSONRPCRequest):
@@ -12,6 +17,11 @@ class SendTaskRequest(JSONRPCRequest):
     params: TaskSendParams
 
 
+class SendTaskStreamingRequest(JSONRPCRequest):
+    method: Literal["tasks/sendSubscribe"] = "tasks/sendSubscribe"
+    params: TaskSendParams
+
+
 class GetTaskRequest(JSONRPCRequest):
     method: Literal["tasks/get"] = "tasks/get"
     params: TaskQueryParams
@@ -21,6 +31,7 @@ A2ARequest = TypeAdapter(
     Annotated[
         Union[
             SendTaskRequest,
+            SendTaskStreamingRequest,
             GetTaskRequest,
         ],
         Field(discriminator="method"),
@@ -34,3 +45,7 @@ class SendTaskResponse(JSONRPCResponse):
 
 class GetTaskResponse(JSONRPCResponse):
     result: Task | None = None
+
+
+class SendTaskStreamingResponse(JSONRPCResponse):
+    result: TaskStatusUpdateEvent | None = None
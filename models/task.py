@@ -25,6 +25,7 @@ class Message(BaseModel):
 # Describes the state of a task at a given moment
 class TaskStatus(BaseModel):
     state: str
+    message: Message | None = None
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
@@ -35,6 +36,15 @@ class Task(BaseModel):
     history: List[Message]
 
 
+# Sent over a tasks/sendSubscribe stream whenever the task makes progress
+# `final` is set on the last event of the stream
+class TaskStatusUpdateEvent(BaseModel):
+    id: str
+    status: TaskStatus
+    final: bool = False
+    metadata: dict[str, Any] | None = None
+
+
 # Used to identify a task, e.g., when canceling or querying
 class TaskIdParams(BaseModel):
     id: str
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+
+from metrics import ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request is not admitted.
+
+    Attributes:
+        retry_after (int): Suggested seconds before the client retries
+    """
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Caps the requests processed at once and queues a bounded number of others.
+
+    - At most `max_in_flight` requests hold a slot; 0 disables the limit.
+    - Up to `max_queue` more wait for a slot in arrival order, each for at most
+      `queue_timeout` seconds.
+    - Anything beyond that is rejected right away with `Overloaded`, so a burst
+      fails fast instead of slowing down every request already admitted.
+
+    The retry hint is the time the queue ahead would take to drain, estimated
+    from a moving average of recent service times.
+
+    Args:
+        max_in_flight: Maximum requests processed at once, 0 for no limit
+        max_queue: Maximum requests waiting for a slot
+        queue_timeout: Seconds a request may wait for a slot
+    """
+
+    def __init__(self, max_in_flight: int = 0, max_queue: int = 0, queue_timeout: float = 10.0) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        # Moving average of the seconds a slot is held
+        self._service_time = 1.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until the requests ahead are likely done, at least 1."""
+        if not self.max_in_flight:
+            return 1
+        backlog = self.queued + 1
+        return max(1, math.ceil(self._service_time * backlog / self.max_in_flight))
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot; every successful call must be paired with `release`.
+
+        Returns:
+            The time the slot was granted, to pass to `release`
+
+        Raises:
+            Overloaded: The queue is full or the wait exceeded `queue_timeout`
+        """
+        if not self.max_in_flight or (self.in_flight < self.max_in_flight and not self._waiters):
+            self.in_flight += 1
+            return time.perf_counter()
+
+        if len(self._waiters) >= self.max_queue:
+            ADMISSION_REJECTED.inc(reason="queue_full")
+            raise Overloaded("Server is overloaded, try again later", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self._release_slot()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            ADMISSION_REJECTED.inc(reason="timeout")
+            raise Overloaded(
+                f"No capacity within {self.queue_timeout:g}s, try again later", self.retry_after()
+            ) from None
+        finally:
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started)
+        # The releasing request handed its slot over, in_flight is unchanged
+        return time.perf_counter()
+
+    def release(self, granted_at: float) -> None:
+        """Give back a slot acquired at `granted_at`."""
+        self._service_time += 0.1 * (time.perf_counter() - granted_at - self._service_time)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        # Hand the slot straight to the oldest waiter, so a new arrival cannot
+        # take it first
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
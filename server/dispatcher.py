@@ -0,0 +1,315 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from opentelemetry.propagate import extract, inject
+from opentelemetry.trace import SpanKind
+from starlette.background import BackgroundTask
+
+from models.agent import AgentCard
+from models.json_rpc import InternalError, JSONRPCResponse
+from tracing import tracer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class HashRing:
+    """
+    Consistent hash ring: each node owns many virtual points on the ring and a
+    key belongs to the first point at or after its hash, so adding or removing
+    a node only moves the keys of that node.
+
+    Args:
+        nodes: Node identifiers
+        replicas: Virtual points per node, more points spread keys more evenly
+    """
+
+    def __init__(self, nodes: list[str], replicas: int = 128) -> None:
+        if not nodes:
+            raise ValueError("A hash ring needs at least one node")
+        ring = sorted(
+            (self._hash(f"{node}#{replica}"), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        self._points = [point for point, _ in ring]
+        self._nodes = [node for _, node in ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def node(self, key: str) -> str:
+        index = bisect.bisect_left(self._points, self._hash(key)) % len(self._points)
+        return self._nodes[index]
+
+
+# A sample line of the Prometheus text format: name, optional {labels}, value
+_SAMPLE = re.compile(r"([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s(.*)")
+
+
+def merge_metrics(outputs: list[tuple[str, str]]) -> str:
+    """
+    Merge the /metrics output of several workers into one exposition, adding
+    a `worker` label to every sample and keeping each metric's HELP and TYPE
+    lines once, ahead of its samples from all workers.
+
+    Args:
+        outputs: (worker label, Prometheus text) per worker
+    """
+    families: dict[str, tuple[list[str], list[str]]] = {}
+    headers, samples = [], []
+    for worker, text in outputs:
+        for line in text.splitlines():
+            if line.startswith("# HELP ") or line.startswith("# TYPE "):
+                headers, samples = families.setdefault(line.split(" ", 3)[2], ([], []))
+                if line not in headers:
+                    headers.append(line)
+            elif match := _SAMPLE.fullmatch(line):
+                name, labels, value = match.groups()
+                label = f'worker="{worker}"' + (f",{labels}" if labels else "")
+                samples.append(f"{name}{{{label}}} {value}")
+    lines = []
+    for headers, samples in families.values():
+        lines.extend(headers)
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+class SessionDispatcher:
+    """
+    Front server of a multi-worker host agent: forwards every JSON-RPC request
+    to one of the worker servers, keeping all tasks of a session on the same
+    worker so its in-memory ADK session stays hot there.
+
+    - `tasks/send` and `tasks/sendSubscribe` are routed by session id (by task
+      id when the request has none); SSE streams are relayed as they arrive.
+    - `tasks/get` goes to the worker that ran the task, remembered for the
+      last `max_tracked_tasks` tasks; older tasks are looked up on every worker.
+    - Batches are split per worker and reassembled in request order.
+    - `/metrics` serves the metrics of every worker, whose ports are internal,
+      with a `worker` label holding the worker's index in `worker_urls`.
+
+    Args:
+        host: IP address to bind the dispatcher to
+        port: Public port of the host agent
+        worker_urls: Base URLs of the worker servers
+        agent_card: Card served on /.well-known/agent.json
+        max_tracked_tasks: Task-to-worker assignments kept for `tasks/get`
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        worker_urls: list[str],
+        agent_card: AgentCard,
+        max_tracked_tasks: int = 100_000,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.worker_urls = worker_urls
+        self.agent_card = agent_card
+        self._ring = HashRing(worker_urls)
+        self._task_workers: OrderedDict[str, str] = OrderedDict()
+        self._max_tracked_tasks = max_tracked_tasks
+        self._client: httpx.AsyncClient | None = None
+        self.app = FastAPI()
+        self.app.add_event_handler("shutdown", self.aclose)
+
+        @self.app.get("/.well-known/agent.json")
+        async def get_agent_card():
+            return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+
+        @self.app.get("/ready")
+        async def ready():
+            """Ready once every worker is ready"""
+            responses = await asyncio.gather(
+                *(self.http_client.get(f"{url}/ready") for url in self.worker_urls),
+                return_exceptions=True,
+            )
+            workers = {
+                url: not isinstance(response, Exception) and response.status_code == 200
+                for url, response in zip(self.worker_urls, responses)
+            }
+            return JSONResponse(
+                {"ready": all(workers.values()), "workers": workers},
+                status_code=200 if all(workers.values()) else 503,
+            )
+
+        @self.app.get("/metrics")
+        async def metrics():
+            """Metrics of every worker in the Prometheus text format, labelled by worker"""
+            responses = await asyncio.gather(
+                *(self.http_client.get(f"{url}/metrics") for url in self.worker_urls),
+                return_exceptions=True,
+            )
+            outputs = []
+            for index, (url, response) in enumerate(zip(self.worker_urls, responses)):
+                if isinstance(response, Exception) or response.status_code != 200:
+                    logger.warning(f"Skipping metrics of worker {url} \n Reason: {response!r}")
+                    continue
+                outputs.append((str(index), response.text))
+            return PlainTextResponse(
+                merge_metrics(outputs), media_type="text/plain; version=0.0.4"
+            )
+
+        @self.app.post("/")
+        async def handle_request(request: Request):
+            with tracer.start_as_current_span(
+                "dispatcher.request", context=extract(request.headers), kind=SpanKind.SERVER
+            ):
+                try:
+                    body = json.loads(await request.body())
+                    if isinstance(body, list):
+                        return await self.forward_batch(body)
+                    if not isinstance(body, dict):
+                        raise ValueError("Invalid JSON-RPC request")
+                    if body.get("method") == "tasks/sendSubscribe":
+                        return await self.forward_stream(body)
+                    return await self.forward(body)
+                except Exception as e:
+                    logger.error(f" Error occurred while dispatching request: \n Reason: {e}")
+                    return JSONResponse(
+                        JSONRPCResponse(
+                            id=None, error=InternalError(message=str(e))
+                        ).model_dump(),
+                        status_code=400,
+                    )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            # Workers are local, a large pool lets every in-flight task keep a connection
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=1000, max_keepalive_connections=200),
+                timeout=httpx.Timeout(600.0, connect=5.0),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+    def _worker_for(self, item: dict) -> str | None:
+        """Worker of a request, or None for a `tasks/get` of an untracked task."""
+        params = item.get("params") or {}
+        task_id = params.get("id")
+        if item.get("method") == "tasks/get":
+            worker = self._task_workers.get(task_id)
+            if worker is not None:
+                self._task_workers.move_to_end(task_id)
+            return worker
+
+        session_id = params.get("session_id") or params.get("sessionId")
+        worker = self._ring.node(str(session_id or task_id))
+        if task_id is not None:
+            self._task_workers[task_id] = worker
+            self._task_workers.move_to_end(task_id)
+            while len(self._task_workers) > self._max_tracked_tasks:
+                self._task_workers.popitem(last=False)
+        return worker
+
+    @staticmethod
+    def _trace_headers() -> dict:
+        headers = {}
+        inject(headers)
+        return headers
+
+    async def _post(self, worker: str, payload) -> httpx.Response:
+        return await self.http_client.post(
+            f"{worker}/", json=payload, headers=self._trace_headers()
+        )
+
+    async def _find_task(self, item: dict):
+        """Ask every worker for an untracked task and keep the first answer that has it."""
+        responses = await asyncio.gather(
+            *(self._post(worker, item) for worker in self.worker_urls)
+        )
+        results = [response.json() for response in responses]
+        for worker, result in zip(self.worker_urls, results):
+            if result.get("result") is not None:
+                self._task_workers[item["params"]["id"]] = worker
+                return result
+        return results[0]
+
+    async def forward(self, item: dict) -> Response:
+        worker = self._worker_for(item)
+        if worker is None:
+            return JSONResponse(await self._find_task(item))
+        response = await self._post(worker, item)
+        # Keep the retry hint of a worker that rejected the request
+        retry_after = response.headers.get("retry-after")
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type"),
+            headers={"Retry-After": retry_after} if retry_after else None,
+        )
+
+    async def forward_stream(self, item: dict) -> StreamingResponse:
+        worker = self._worker_for(item)
+        upstream = await self.http_client.send(
+            self.http_client.build_request(
+                "POST", f"{worker}/", json=item, headers=self._trace_headers()
+            ),
+            stream=True,
+        )
+        return StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            media_type=upstream.headers.get("content-type"),
+            headers={"Retry-After": upstream.headers["retry-after"]}
+            if "retry-after" in upstream.headers
+            else None,
+            background=BackgroundTask(upstream.aclose),
+        )
+
+    async def forward_batch(self, body: list) -> JSONResponse:
+        if not body:
+            raise ValueError("Empty JSON-RPC batch")
+        results: list = [None] * len(body)
+        groups: dict[str, list[int]] = {}
+        lookups: list[int] = []
+        for index, item in enumerate(body):
+            worker = self._worker_for(item) if isinstance(item, dict) else self.worker_urls[0]
+            if worker is None:
+                lookups.append(index)
+            else:
+                groups.setdefault(worker, []).append(index)
+
+        async def run_group(worker: str, indexes: list[int]) -> None:
+            response = (await self._post(worker, [body[index] for index in indexes])).json()
+            if not isinstance(response, list):
+                # The worker rejected the whole batch with a single error
+                response = [response] * len(indexes)
+            for index, result in zip(indexes, response):
+                results[index] = result
+
+        async def run_lookup(index: int) -> None:
+            results[index] = await self._find_task(body[index])
+
+        await asyncio.gather(
+            *(run_group(worker, indexes) for worker, indexes in groups.items()),
+            *(run_lookup(index) for index in lookups),
+        )
+        return JSONResponse(content=results)
+
+    def start(self):
+        """Starts the dispatcher using uvicorn."""
+        uvicorn.run(
+            self.app,
+            host=self.host,
+            port=self.port,
+            timeout_keep_alive=150,
+            log_config=None,
+        )
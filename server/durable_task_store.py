@@ -0,0 +1,348 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from models.task import Message, TaskStatus
+from server.task_store import TERMINAL_STATES, ShardedTaskStore, TaskSnapshot, message_size
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Portable schema: one row per task plus an append-only message log
+SCHEMA = (
+    """
+    CREATE TABLE tasks (
+        id VARCHAR(255) PRIMARY KEY,
+        state VARCHAR(32) NOT NULL,
+        status_time VARCHAR(64) NOT NULL,
+        length INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE task_messages (
+        task_id VARCHAR(255) NOT NULL,
+        seq INTEGER NOT NULL,
+        message TEXT NOT NULL,
+        PRIMARY KEY (task_id, seq)
+    )
+    """,
+)
+
+
+class SQLiteBackend:
+    """
+    SQLite database in WAL mode, so readers never block the writer.
+
+    Args:
+        path: Database file path
+    """
+
+    # Primary-key lookups on a local file take microseconds, less than a thread hop
+    inline_reads = True
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only syncs at checkpoints; a crash may lose the last commits
+        # but never corrupts the database
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            connection.execute(statement.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS"))
+        connection.commit()
+        return connection
+
+
+class ODBCBackend:
+    """
+    Any database reachable through an ODBC driver, via the optional `pyodbc` package.
+
+    The tables from `SCHEMA` must already exist.
+
+    Args:
+        connection_string: ODBC connection string, e.g. "DRIVER={ODBC Driver 18 for SQL Server};SERVER=...;"
+    """
+
+    # Reads go over the network, so they run on a worker thread
+    inline_reads = False
+
+    def __init__(self, connection_string: str) -> None:
+        self.connection_string = connection_string
+
+    def connect(self):
+        try:
+            import pyodbc
+        except ImportError as e:
+            raise RuntimeError("The ODBC task store requires the 'pyodbc' package") from e
+        return pyodbc.connect(self.connection_string, autocommit=False)
+
+
+def backend_from_url(url: str) -> SQLiteBackend | ODBCBackend:
+    """`odbc:<connection string>` selects ODBC, anything else is a SQLite file path."""
+    if url.startswith("odbc:"):
+        return ODBCBackend(url.removeprefix("odbc:"))
+    return SQLiteBackend(url)
+
+
+class DurableTaskStore(ShardedTaskStore):
+    """
+    Task store that persists every task to a database and keeps recent tasks in memory.
+
+    - The in-memory ShardedTaskStore (with its bounds) acts as the cache of
+      recent tasks; tasks missing from memory are loaded from the database.
+    - History is stored as an append-only log: each write only inserts the
+      messages added since the previous snapshot and updates the task row.
+    - Writes are queued and group-committed by a single writer: everything
+      queued while a commit runs goes into the next transaction.
+    - With `sync_commit=False` (default) writers only enqueue, so persistence
+      adds microseconds to a request; a crash may lose the last batch.
+      With `sync_commit=True` a write returns once its batch is committed.
+    - A failed batch is retried, ahead of newer writes, with exponential
+      backoff; after `retry_attempts` failures in a row it is dropped and logged.
+    - A task with a write still queued stays in memory whatever the bounds,
+      so it is never reloaded from a database that lacks the write.
+    - `finished_ttl` applies to the database too: expired finished tasks are
+      not loaded back, and are deleted from the database at most every
+      PURGE_INTERVAL seconds.
+
+    Args:
+        backend: SQLiteBackend or ODBCBackend
+        sync_commit: Wait for the group commit before returning from a write
+        retry_attempts: Consecutive failed commits before a batch is dropped
+        **bounds: max_tasks, max_history_bytes, finished_ttl and shards for the cache
+    """
+
+    RETRY_DELAY = 0.1
+    RETRY_MAX_DELAY = 30.0
+    PURGE_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        backend: SQLiteBackend | ODBCBackend,
+        sync_commit: bool = False,
+        retry_attempts: int = 10,
+        **bounds,
+    ) -> None:
+        super().__init__(**bounds)
+        self._backend = backend
+        self._sync_commit = sync_commit
+        self._retry_attempts = retry_attempts
+        # Task id -> queued writes not committed yet; these tasks are pinned in memory
+        self._unpersisted: dict[str, int] = {}
+        self._next_purge = 0.0
+        self._write_connection = backend.connect()
+        self._read_connection = backend.connect()
+        self._read_lock = threading.Lock()
+        self._pending: list[tuple[tuple, list[tuple], asyncio.Future]] = []
+        self._committing: list[tuple[tuple, list[tuple], asyncio.Future]] = []
+        self._wakeup: asyncio.Event | None = None
+        self._writer: asyncio.Task | None = None
+
+    async def _persist(
+        self, previous: TaskSnapshot | None, snapshot: TaskSnapshot
+    ) -> None:
+        start = previous.length if previous is not None else 0
+        # Rows are built here so the writer thread spends its time in SQLite,
+        # which releases the GIL, rather than in pydantic serialization
+        task_row = (
+            snapshot.status.state,
+            snapshot.status.timestamp.isoformat(),
+            snapshot.length,
+            snapshot.id,
+        )
+        message_rows = [
+            (snapshot.id, start + offset, message.model_dump_json())
+            for offset, message in enumerate(snapshot.log[start : snapshot.length])
+        ]
+        committed = asyncio.get_running_loop().create_future()
+        self._pending.append((task_row, message_rows, committed))
+        self._unpersisted[snapshot.id] = self._unpersisted.get(snapshot.id, 0) + 1
+        self._ensure_writer()
+        self._wakeup.set()
+        if self._sync_commit:
+            await committed
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or self._writer.done():
+            self._wakeup = asyncio.Event()
+            self._writer = asyncio.create_task(self._write_loop())
+
+    def _evictable(self, snapshot: TaskSnapshot) -> bool:
+        return super()._evictable(snapshot) and snapshot.id not in self._unpersisted
+
+    def _written(self, batch) -> None:
+        """Unpin the tasks of a committed or dropped batch, dropping those that expired meanwhile."""
+        now = time.monotonic()
+        for (*_, task_id), _, _ in batch:
+            remaining = self._unpersisted.pop(task_id, 1) - 1
+            if remaining:
+                self._unpersisted[task_id] = remaining
+                continue
+            shard = self._shard(task_id)
+            snapshot = shard.tasks.get(task_id)
+            if snapshot is not None and snapshot.expires_at is not None and snapshot.expires_at <= now:
+                self._remove(shard, task_id, "ttl")
+        if batch and self._over_budget():
+            # Tasks only kept for their writes may go now
+            self._evict(self._shard(batch[-1][0][-1]))
+
+    async def _write_loop(self) -> None:
+        failures = 0
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            batch, self._pending = self._pending, []
+            if not batch:
+                continue
+            self._committing = batch
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                failures += 1
+                if failures < self._retry_attempts:
+                    delay = min(self.RETRY_MAX_DELAY, self.RETRY_DELAY * 2 ** (failures - 1))
+                    logger.error(
+                        f"Error occurred while persisting {len(batch)} task writes, "
+                        f"retrying in {delay:g}s\n Reason: {e}"
+                    )
+                    # Ahead of newer writes, which must not commit before it
+                    self._pending = batch + self._pending
+                    self._committing = []
+                    await asyncio.sleep(delay)
+                    self._wakeup.set()
+                    continue
+                logger.error(
+                    f"Error occurred while persisting {len(batch)} task writes, "
+                    f"dropping them after {failures} attempts\n Reason: {e}"
+                )
+                failures = 0
+                for *_, committed in batch:
+                    if not committed.done():
+                        committed.set_exception(e)
+                        # Only sync_commit writers await it; mark it retrieved for the others
+                        committed.exception()
+            else:
+                failures = 0
+                for *_, committed in batch:
+                    if not committed.done():
+                        committed.set_result(None)
+            self._committing = []
+            self._written(batch)
+            if self._finished_ttl is not None and time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + self.PURGE_INTERVAL
+                try:
+                    await asyncio.to_thread(self._purge_expired)
+                except Exception as e:
+                    logger.error(f"Error occurred while purging expired tasks\n Reason: {e}")
+
+    def _purge_expired(self) -> None:
+        """Delete the finished tasks whose status is older than `finished_ttl`."""
+        cutoff = (datetime.now() - timedelta(seconds=self._finished_ttl)).isoformat()
+        params = (*(state.value for state in TERMINAL_STATES), cutoff)
+        # status_time is an ISO timestamp, so string order is time order
+        where = "state IN (?, ?, ?) AND status_time < ?"
+        cursor = self._write_connection.cursor()
+        try:
+            cursor.execute(
+                f"DELETE FROM task_messages WHERE task_id IN (SELECT id FROM tasks WHERE {where})",
+                params,
+            )
+            cursor.execute(f"DELETE FROM tasks WHERE {where}", params)
+            self._write_connection.commit()
+        except Exception:
+            self._write_connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _write_batch(self, batch) -> None:
+        cursor = self._write_connection.cursor()
+        try:
+            for task_row, message_rows, _ in batch:
+                cursor.execute(
+                    "UPDATE tasks SET state = ?, status_time = ?, length = ? WHERE id = ?",
+                    task_row,
+                )
+                if cursor.rowcount == 0:
+                    state, status_time, length, task_id = task_row
+                    cursor.execute(
+                        "INSERT INTO tasks (id, state, status_time, length) VALUES (?, ?, ?, ?)",
+                        (task_id, state, status_time, length),
+                    )
+                if message_rows:
+                    cursor.executemany(
+                        "INSERT INTO task_messages (task_id, seq, message) VALUES (?, ?, ?)",
+                        message_rows,
+                    )
+            self._write_connection.commit()
+        except Exception:
+            self._write_connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    async def _load(self, task_id: str) -> TaskSnapshot | None:
+        if self._backend.inline_reads:
+            return self._read_task(task_id)
+        return await asyncio.to_thread(self._read_task, task_id)
+
+    def _read_task(self, task_id: str) -> TaskSnapshot | None:
+        with self._read_lock:
+            cursor = self._read_connection.cursor()
+            try:
+                cursor.execute(
+                    "SELECT state, status_time, length FROM tasks WHERE id = ?", (task_id,)
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                state, status_time, length = row
+                cursor.execute(
+                    "SELECT message FROM task_messages WHERE task_id = ? AND seq < ? ORDER BY seq",
+                    (task_id, length),
+                )
+                log = [Message.model_validate_json(message) for (message,) in cursor.fetchall()]
+            finally:
+                cursor.close()
+            # End the implicit read transaction so the next read sees new commits
+            self._read_connection.commit()
+
+        timestamp = datetime.fromisoformat(status_time)
+        expires_at = None
+        if self._finished_ttl is not None and state in TERMINAL_STATES:
+            remaining = self._finished_ttl - (
+                datetime.now(timestamp.tzinfo) - timestamp
+            ).total_seconds()
+            if remaining <= 0:
+                return None
+            expires_at = time.monotonic() + remaining
+        return TaskSnapshot(
+            id=task_id,
+            status=TaskStatus(state=state, timestamp=timestamp),
+            log=log,
+            length=len(log),
+            size=sum(message_size(message) for message in log),
+            expires_at=expires_at,
+        )
+
+    async def flush(self) -> None:
+        """Wait until every queued write, including the batch being committed, is done."""
+        futures = [committed for *_, committed in self._committing + self._pending]
+        if self._pending:
+            self._ensure_writer()
+            self._wakeup.set()
+        await asyncio.gather(*futures, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Commit queued writes, stop the writer and close the database connections."""
+        await self.flush()
+        if self._writer is not None:
+            self._writer.cancel()
+        self._write_connection.close()
+        self._read_connection.close()
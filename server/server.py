@@ -1,15 +1,31 @@
+import asyncio
 import json
 import logging
+from functools import partial
+from typing import Callable
 
 import uvicorn
 from fastapi import FastAPI, Request
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from sse_starlette.sse import EventSourceResponse
 
+from opentelemetry import context
+from opentelemetry.propagate import extract
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from metrics import ADMISSION_QUEUED, REGISTRY, REQUEST_PHASE_SECONDS
 from models.agent import AgentCard
-from models.json_rpc import InternalError, JSONRPCResponse
-from models.request import A2ARequest, SendTaskRequest
+from models.json_rpc import InternalError, JSONRPCResponse, ServerBusyError
+from models.request import (
+    A2ARequest,
+    GetTaskRequest,
+    SendTaskRequest,
+    SendTaskStreamingRequest,
+)
+from server.admission import AdmissionController, Overloaded
 from server.task_manager import TaskManager
+from structured_logging import log_payload
+from tracing import tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,6 +38,10 @@ class A2AServer:
         port: int,
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        batch_concurrency: int = 8,
+        max_in_flight: int = 0,
+        max_queue: int = 0,
+        queue_timeout: float = 10.0,
     ):
         """
         Constructor for A2AServer using FastAPI
@@ -30,12 +50,21 @@ class A2AServer:
             host: IP address to bind the server to (default is all interfaces)
             port: Port number to listen on (default is 5000)
             agent_card: Metadata that describes our agent (name, skills, capabilities)
-            task_manager: Logic to handle the task (using Gemini agent here)
+            task_manager: Logic to handle the task (using Gemini agent here); may be
+                attached later with `set_task_manager`, the server is not ready until then
+            batch_concurrency: Maximum members of a JSON-RPC batch processed at once
+            max_in_flight: Maximum `tasks/send` and `tasks/sendSubscribe` requests
+                processed at once, 0 for no limit; `tasks/get` is never limited
+            max_queue: Maximum requests waiting for a slot, more are rejected right away
+            queue_timeout: Seconds a request may wait for a slot before it is rejected
         """
         self.host = host
         self.port = port
         self.agent_card = agent_card
         self.task_manager = task_manager
+        self.batch_concurrency = batch_concurrency
+        self.admission = AdmissionController(max_in_flight, max_queue, queue_timeout)
+        ADMISSION_QUEUED.set_function(lambda: self.admission.queued)
         self.app = FastAPI()
 
         @self.app.get("/.well-known/agent.json")
@@ -43,61 +72,247 @@ class A2AServer:
             """Returns the agent's metadata (GET /.well-known/agent.json)"""
             return JSONResponse(self.agent_card.model_dump(exclude_none=True))
 
+        @self.app.get("/ready")
+        async def ready():
+            """Readiness probe: 200 once a task manager is attached, 503 before"""
+            if self.task_manager is None:
+                return JSONResponse({"ready": False}, status_code=503)
+            return JSONResponse({"ready": True})
+
+        @self.app.get("/metrics")
+        async def metrics():
+            """Latency histograms and gauges in the Prometheus text format"""
+            return PlainTextResponse(
+                REGISTRY.render(), media_type="text/plain; version=0.0.4"
+            )
+
         @self.app.post("/")
         async def handle_request(request: Request):
             """
             handles task requests sent to the root path ("/").
 
-            - 1. Parses incoming JSON
-            - 2. Validates the JSON-RPC message
+            - 1. Reads the raw body
+            - 2. Parses and validates the JSON-RPC message in one pass from the bytes
             - 3. For supported task types, delegates to the task manager
-            - 4. Returns a response or error
+            - 4. Returns a response or error, or an SSE stream for `tasks/sendSubscribe`
+
+            A JSON array body is handled as a JSON-RPC 2.0 batch.
             """
+            if self.task_manager is None:
+                return JSONResponse(
+                    JSONRPCResponse(
+                        id=None, error=InternalError(message="Server is starting")
+                    ).model_dump(),
+                    status_code=503,
+                )
+            # Continue the caller's trace when it sent a traceparent header
+            with tracer.start_as_current_span(
+                "a2a.request", context=extract(request.headers), kind=SpanKind.SERVER
+            ) as span:
+                try:
+                    # Step 1: Read the raw JSON body
+                    with REQUEST_PHASE_SECONDS.time(phase="read"):
+                        body = await request.body()
+                    log_payload(logger, "Incoming JSON-RPC request", body)
+
+                    if body.lstrip()[:1] == b"[":
+                        with REQUEST_PHASE_SECONDS.time(phase="validate"):
+                            batch = json.loads(body)
+                        return await self.handle_batch(batch)
+
+                    # Step 2: Parse and validate request using discriminated union,
+                    # straight from the bytes without building an intermediate dict
+                    with REQUEST_PHASE_SECONDS.time(phase="validate"):
+                        json_rpc = A2ARequest.validate_json(body)
+                    span.set_attribute("rpc.method", json_rpc.method)
+                    span.set_attribute("a2a.task_id", json_rpc.params.id)
+
+                    # Step 3: Dispatch supported A2A methods to the task manager
+                    if isinstance(json_rpc, SendTaskStreamingRequest):
+                        # The slot is held until the stream ends
+                        granted_at = await self.admission.acquire()
+                        return self.create_stream_response(
+                            self.task_manager.on_send_task_subscribe(json_rpc),
+                            on_close=partial(self.admission.release, granted_at),
+                        )
+                    result = await self.dispatch(json_rpc)
+
+                    # Step 4: Convert the result into a proper JSON response
+                    return self.create_response(result)
+
+                except Overloaded as e:
+                    logger.warning(f"Rejected {json_rpc.method} request {json_rpc.id}: {e}")
+                    span.set_status(Status(StatusCode.ERROR, str(e)))
+                    return self.overloaded_response(json_rpc.id, e)
+
+                except Exception as e:
+                    logger.error(f" Error occurred while delegating task: \n Reason: {e}")
+                    span.record_exception(e)
+                    span.set_status(Status(StatusCode.ERROR, str(e)))
+                    return JSONResponse(
+                        JSONRPCResponse(
+                            id=None, error=InternalError(message=str(e))
+                        ).model_dump(),
+                        status_code=400,
+                    )
+
+    async def dispatch(self, json_rpc) -> JSONRPCResponse:
+        """
+        Runs a validated, non-streaming A2A request through the task manager.
+
+        Args:
+            json_rpc: A request parsed by A2ARequest
+
+        Returns:
+            JSONRPCResponse: The task manager's response
+        """
+        if isinstance(json_rpc, SendTaskRequest):
+            # Starting an agent run waits for an admission slot
+            granted_at = await self.admission.acquire()
             try:
-                # Step 1: Parse incoming JSON body
-                body = await request.json()
-                logger.info(f"\nIncoming JSON:\n  {json.dumps(body, indent=2)}")
+                return await self.task_manager.on_send_task(json_rpc)
+            finally:
+                self.admission.release(granted_at)
+        elif isinstance(json_rpc, GetTaskRequest):
+            return await self.task_manager.on_get_task(json_rpc)
+        raise ValueError(f"Unsupported A2A method: {type(json_rpc)}")
 
-                # Step 2: Parse and validate request using discriminated union
-                json_rpc = A2ARequest.validate_python(body)
+    async def handle_batch(self, body: list):
+        """
+        Handles a JSON-RPC 2.0 batch: members run concurrently, at most
+        `batch_concurrency` at a time, and each failure becomes an error
+        response carrying the member's id.
 
-                # Step 3: If it’s a send-task request, call the task manager to handle it
-                if isinstance(json_rpc, SendTaskRequest):
-                    result = await self.task_manager.on_send_task(json_rpc)
-                else:
-                    raise ValueError(f"Unsupported A2A method: {type(json_rpc)}")
+        Args:
+            body: The parsed JSON array
 
-                # Step 4: Convert the result into a proper JSON response
-                return self.create_response(result)
+        Returns:
+            JSONResponse: Array of responses in request order
+        """
+        if not body:
+            raise ValueError("Empty JSON-RPC batch")
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
 
-            except Exception as e:
-                logger.error(f" Error occurred while delegating task: \n Reason: {e}")
-                return JSONResponse(
-                    JSONRPCResponse(
-                        id=None, error=InternalError(message=str(e))
-                    ).model_dump(),
-                    status_code=400,
-                )
+        async def run(item) -> JSONRPCResponse:
+            request_id = item.get("id") if isinstance(item, dict) else None
+            async with semaphore:
+                try:
+                    json_rpc = A2ARequest.validate_python(item)
+                    if isinstance(json_rpc, SendTaskStreamingRequest):
+                        raise ValueError("tasks/sendSubscribe cannot be part of a batch")
+                    return await self.dispatch(json_rpc)
+                except Overloaded as e:
+                    return JSONRPCResponse(
+                        id=request_id,
+                        error=ServerBusyError(message=str(e), data={"retryAfter": e.retry_after}),
+                    )
+                except Exception as e:
+                    logger.error(f" Error occurred in batch request {request_id}: \n Reason: {e}")
+                    return JSONRPCResponse(
+                        id=request_id, error=InternalError(message=str(e))
+                    )
+
+        results = await asyncio.gather(*(run(item) for item in body))
+        return Response(
+            content=b"[" + b",".join(self.encode(result) for result in results) + b"]",
+            media_type="application/json",
+        )
+
+    @staticmethod
+    def encode(result: JSONRPCResponse) -> bytes:
+        """
+        Serialize a response without its unset fields, except `id`: JSON-RPC 2.0
+        requires `"id": null` when the request id could not be determined.
+        """
+        if result.id is None:
+            return json.dumps(
+                {**result.model_dump(mode="json", exclude_none=True), "id": None}
+            ).encode()
+        return result.model_dump_json(exclude_none=True).encode()
 
     def create_response(self, result):
         """
         Converts a JSONRPCResponse object into a JSON HTTP response.
 
+        The model is serialized to bytes in a single pass by pydantic-core,
+        without an intermediate dict.
+
         Args:
             result: The response object (must be a JSONRPCResponse)
 
         Returns:
-            JSONResponse: Starlette-compatible HTTP response with JSON body
+            Response: Starlette-compatible HTTP response with JSON body
         """
         if isinstance(result, JSONRPCResponse):
-            return JSONResponse(
-                content=jsonable_encoder(result.model_dump(exclude_none=True))
-            )
+            with REQUEST_PHASE_SECONDS.time(phase="encode"):
+                content = self.encode(result)
+            return Response(content=content, media_type="application/json")
         else:
             raise ValueError("Invalid response type")
 
+    @staticmethod
+    def overloaded_response(request_id, error: Overloaded) -> JSONResponse:
+        """
+        503 with a ServerBusyError and a Retry-After header, for a request
+        that was not admitted.
+        """
+        return JSONResponse(
+            JSONRPCResponse(
+                id=request_id,
+                error=ServerBusyError(message=str(error), data={"retryAfter": error.retry_after}),
+            ).model_dump(),
+            status_code=503,
+            headers={"Retry-After": str(error.retry_after)},
+        )
+
+    def create_stream_response(self, results, on_close: Callable[[], None] = None):
+        """
+        Converts an async iterable of JSONRPCResponse objects into a
+        Server-Sent Events response, one `data:` frame per response.
+
+        Args:
+            results: Async iterable yielding JSONRPCResponse objects
+            on_close: Called exactly once when the stream ends, fails or the client is gone
+
+        Returns:
+            EventSourceResponse: Streaming HTTP response with `text/event-stream` body
+        """
+
+        # The request span ends when the handler returns, so the stream gets its own
+        # span, parented to the request span
+        parent = context.get_current()
+
+        async def event_generator():
+            # Not a BackgroundTask: sse_starlette skips those when the stream fails
+            try:
+                with tracer.start_as_current_span("a2a.stream", context=parent):
+                    async for result in results:
+                        yield {"data": result.model_dump_json(exclude_none=True)}
+            finally:
+                if on_close is not None:
+                    on_close()
+
+        return EventSourceResponse(event_generator())
+
+    def set_task_manager(self, task_manager: TaskManager) -> None:
+        """Attach the task manager once it is initialized; the server then reports ready."""
+        self.task_manager = task_manager
+        logger.info("A2A server is ready")
+
     def start(self):
-        """Starts the A2A server using uvicorn."""
-        if not self.agent_card or not self.task_manager:
-            raise ValueError("Agent card and task manager are required")
-        uvicorn.run(self.app, host=self.host, port=self.port, timeout_keep_alive=150)
+        """
+        Starts the A2A server using uvicorn.
+
+        Without a task manager the server listens right away but answers 503
+        until `set_task_manager` is called, e.g. from a startup handler.
+        """
+        if not self.agent_card:
+            raise ValueError("Agent card is required")
+        # log_config=None keeps uvicorn on the application's logging setup
+        uvicorn.run(
+            self.app,
+            host=self.host,
+            port=self.port,
+            timeout_keep_alive=150,
+            log_config=None,
+        )
@@ -1,12 +1,15 @@
-import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import AsyncIterable
 
+from metrics import STORED_HISTORY_BYTES, STORED_TASKS, TASKS_IN_FLIGHT
+from models.json_rpc import TaskNotFoundError
 from models.request import (
     GetTaskRequest,
     GetTaskResponse,
     SendTaskRequest,
     SendTaskResponse,
+    SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
 )
 from models.task import (
     Message,
@@ -14,16 +17,17 @@ from models.task import (
     TaskQueryParams,
     TaskSendParams,
     TaskState,
-    TaskStatus,
 )
+from server.task_store import TERMINAL_STATES, ShardedTaskStore, TaskSnapshot
 
 
 class TaskManager(ABC):
     """
     This is a base interface class.
 
-    All Task Managers must implement these two async methods:
+    All Task Managers must implement these async methods:
     - on_send_task(): to receive and process new tasks
+    - on_send_task_subscribe(): to process a new task while streaming its progress
     - on_get_task(): to fetch the current status or conversation history of a task
 
     """
@@ -33,6 +37,13 @@ class TaskManager(ABC):
         """This method will handle new incoming tasks."""
         pass
 
+    @abstractmethod
+    def on_send_task_subscribe(
+        self, request: SendTaskStreamingRequest
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """This method will handle a new task and yield its status updates."""
+        pass
+
     @abstractmethod
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         """This method will return task details by task ID."""
@@ -51,14 +62,18 @@ class InMemoryTaskManager(TaskManager):
     Not for production: Data is lost when the app stops or restarts.
     """
 
-    def __init__(self):
-        self.tasks: Dict[str, Task] = {}
-        self.lock = (
-            asyncio.Lock()
-        )  # Async lock to ensure two requests don't modify data at the same time
+    def __init__(self, store: ShardedTaskStore = None):
+        # Lock-striped store: writers lock one shard, readers take immutable snapshots
+        # An empty store is falsy, so test for None rather than truthiness
+        self.store = store if store is not None else ShardedTaskStore()
+        # IDs of tasks received but not yet completed, failed or canceled
+        self._in_flight: set[str] = set()
+        TASKS_IN_FLIGHT.set_function(lambda: len(self._in_flight))
+        STORED_TASKS.set_function(lambda: len(self.store))
+        STORED_HISTORY_BYTES.set_function(lambda: self.store.history_bytes)
 
     # Create or update a task in memory
-    async def upsert_task(self, params: TaskSendParams) -> Task:
+    async def upsert_task(self, params: TaskSendParams) -> TaskSnapshot:
         """
         Create a new task if it doesn’t exist, or update the history if it does.
 
@@ -66,24 +81,30 @@ class InMemoryTaskManager(TaskManager):
             params: TaskSendParams – includes task ID, session ID, and message
 
         Returns:
-            Task – the newly created or updated task
+            TaskSnapshot – the newly created or updated task
         """
-        async with self.lock:
-            task = self.tasks.get(params.id)
-
-            if task is None:
-                # If task doesn't exist, create it with a "submitted" status
-                task = Task(
-                    id=params.id,
-                    status=TaskStatus(state=TaskState.SUBMITTED),
-                    history=[params.message],
-                )
-                self.tasks[params.id] = task
-            else:
-                # If task exists, add the new message to its history
-                task.history.append(params.message)
-
-            return task
+        snapshot = await self.store.upsert(params)
+        self._in_flight.add(snapshot.id)
+        return snapshot
+
+    async def update_task(
+        self, task_id: str, state: TaskState, message: Message | None = None
+    ) -> TaskSnapshot:
+        """
+        Move a task to a new state, optionally appending a message to its history.
+
+        Args:
+            task_id: ID of an existing task
+            state: The new task state
+            message: Message to append, e.g. the agent's reply
+
+        Returns:
+            TaskSnapshot – the updated task
+        """
+        snapshot = await self.store.update(task_id, state, message)
+        if state in TERMINAL_STATES:
+            self._in_flight.discard(task_id)
+        return snapshot
 
     async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
         """
@@ -95,34 +116,55 @@ class InMemoryTaskManager(TaskManager):
         """
         raise NotImplementedError("on_send_task() must be implemented in subclass")
 
+    def on_send_task_subscribe(
+        self, request: SendTaskStreamingRequest
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """
+        Streaming counterpart of `on_send_task`, also left to subclasses.
+
+        Raises:
+            NotImplementedError: if someone tries to use it directly
+        """
+        raise NotImplementedError(
+            "on_send_task_subscribe() must be implemented in subclass"
+        )
+
+    @staticmethod
+    def task_view(snapshot: TaskSnapshot, history_length: int | None = None) -> Task:
+        """
+        Build a response Task from a snapshot, holding only the last
+        `history_length` messages (all when None) without copying the rest.
+
+        Args:
+            snapshot: The stored task snapshot
+            history_length: Number of most recent messages to include, or None for all
+
+        Returns:
+            Task – a shallow view safe to serialize into a response
+        """
+        return snapshot.to_task(history_length)
+
     # Fetch a task by its ID
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         """
         Look up a task using its ID, and optionally return only recent messages.
 
+        Reads an immutable snapshot, so no lock is taken unless the task has
+        to be loaded from a persistent store.
+
         Args:
             request: A GetTaskRequest with an ID and optional history length
 
         Returns:
             GetTaskResponse – contains the task if found, or an error message
         """
-        async with self.lock:
-            query: TaskQueryParams = request.params
-            task = self.tasks.get(query.id)
-
-            if not task:
-                # If task not found, return a structured error
-                return GetTaskResponse(
-                    id=request.id, error={"message": "Task not found"}
-                )
-
-            # Optional: Trim the history to only show the last N messages
-            task_copy = task.model_copy()  # Make a copy so we don't affect the original
-            if query.historyLength is not None:
-                task_copy.history = task_copy.history[
-                    -query.historyLength :
-                ]  # Get last N messages
-            else:
-                task_copy.history = task_copy.history
-
-            return GetTaskResponse(id=request.id, result=task_copy)
+        query: TaskQueryParams = request.params
+        task = await self.store.fetch(query.id)
+
+        if not task:
+            # If task not found, return a structured error
+            return GetTaskResponse(id=request.id, error=TaskNotFoundError())
+
+        return GetTaskResponse(
+            id=request.id, result=self.task_view(task, query.historyLength)
+        )
@@ -0,0 +1,292 @@
+import asyncio
+import bisect
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from typing import Iterator, List
+
+from metrics import TASK_STORE_EVICTIONS, TASK_STORE_LOCK_WAIT_SECONDS
+from models.task import Message, Task, TaskSendParams, TaskState, TaskStatus
+
+
+@dataclass(frozen=True, slots=True)
+class TaskSnapshot:
+    """
+    Immutable view of a task at one point in time.
+
+    Messages live in an append-only log shared by every snapshot of the task;
+    a snapshot only sees the first `length` entries, so later appends never
+    change what an older snapshot returns.
+
+    Attributes:
+        id (str): Task ID
+        status (TaskStatus): Status at the time of the snapshot
+        log (list[Message]): Shared append-only message log of the task
+        length (int): Number of messages visible in this snapshot
+        size (int): Approximate bytes of message text in the visible history
+        expires_at (float | None): Monotonic deadline after which a finished task is dropped
+    """
+
+    id: str
+    status: TaskStatus
+    log: List[Message]
+    length: int
+    size: int = 0
+    expires_at: float | None = None
+
+    def history(self, limit: int | None = None) -> List[Message]:
+        """Return the last `limit` messages (all when None) in O(limit)."""
+        start = 0 if limit is None else max(self.length - limit, 0)
+        return self.log[start : self.length]
+
+    def to_task(self, history_length: int | None = None) -> Task:
+        """Build a Task for responses without re-validating the stored messages."""
+        return Task.model_construct(
+            id=self.id, status=self.status, history=self.history(history_length)
+        )
+
+
+TERMINAL_STATES = {TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELED}
+
+
+def message_size(message: Message | None) -> int:
+    """Approximate memory cost of a message: the UTF-8 size of its text parts."""
+    if message is None:
+        return 0
+    return sum(len(part.text.encode()) for part in message.parts)
+
+
+class _Shard:
+    __slots__ = ("lock", "tasks", "expiries")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        # Least recently used first
+        self.tasks: OrderedDict[str, TaskSnapshot] = OrderedDict()
+        # (expires_at, task_id) in expiry order
+        self.expiries: deque[tuple[float, str]] = deque()
+
+
+class ShardedTaskStore:
+    """
+    Task store split into independently locked shards.
+
+    - Writers only lock the shard that owns the task ID, so unrelated tasks
+      never wait on each other.
+    - Every write publishes a new TaskSnapshot; readers just look the snapshot
+      up and never take a lock.
+    - Optionally bounded: finished (completed, failed or canceled) tasks expire
+      after `finished_ttl`, and when the whole store exceeds `max_tasks` or
+      `max_history_bytes`, least recently used finished tasks are evicted,
+      those of the shard being written first, then those of the other shards.
+      Tasks still in flight are never evicted.
+
+    Args:
+        shards: Number of lock stripes
+        max_tasks: Maximum number of stored tasks, None for unbounded
+        max_history_bytes: Maximum total message text bytes, None for unbounded
+        finished_ttl: Seconds a finished task is kept, None to keep it until evicted
+    """
+
+    def __init__(
+        self,
+        shards: int = 64,
+        max_tasks: int | None = None,
+        max_history_bytes: int | None = None,
+        finished_ttl: float | None = None,
+    ) -> None:
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._max_tasks = max_tasks
+        self._max_history_bytes = max_history_bytes
+        # Store-wide totals, kept up to date by _store and _remove
+        self._task_count = 0
+        self._history_bytes = 0
+        self._finished_ttl = finished_ttl
+        # Evictions of this store by reason, also exported as task_store_evictions_total
+        self.evictions = {"max_tasks": 0, "max_history_bytes": 0, "ttl": 0}
+
+    def _shard(self, task_id: str) -> _Shard:
+        return self._shards[hash(task_id) % len(self._shards)]
+
+    def __len__(self) -> int:
+        return self._task_count
+
+    def __iter__(self) -> Iterator[TaskSnapshot]:
+        for shard in self._shards:
+            yield from list(shard.tasks.values())
+
+    @property
+    def history_bytes(self) -> int:
+        return self._history_bytes
+
+    def get(self, task_id: str) -> TaskSnapshot | None:
+        """Lock-free read of the latest snapshot of a task."""
+        shard = self._shard(task_id)
+        snapshot = shard.tasks.get(task_id)
+        if snapshot is None:
+            return None
+        if snapshot.expires_at is not None and snapshot.expires_at <= time.monotonic():
+            if self._evictable(snapshot):
+                self._remove(shard, task_id, "ttl")
+            return None
+        shard.tasks.move_to_end(task_id)
+        return snapshot
+
+    async def fetch(self, task_id: str) -> TaskSnapshot | None:
+        """Latest snapshot of a task, loading it into memory if a backend has it."""
+        snapshot = self.get(task_id)
+        if snapshot is not None:
+            return snapshot
+        shard = self._shard(task_id)
+        waited = time.perf_counter()
+        async with shard.lock:
+            TASK_STORE_LOCK_WAIT_SECONDS.observe(time.perf_counter() - waited)
+            return await self._current(shard, task_id)
+
+    async def _current(self, shard: _Shard, task_id: str) -> TaskSnapshot | None:
+        """Current snapshot of a task under its shard lock, loading it on a cache miss."""
+        current = shard.tasks.get(task_id)
+        if current is None:
+            current = await self._load(task_id)
+            if current is not None:
+                if current.expires_at is not None:
+                    bisect.insort(shard.expiries, (current.expires_at, task_id))
+                self._store(shard, None, current)
+        return current
+
+    async def _load(self, task_id: str) -> TaskSnapshot | None:
+        """Hook to read a task missing from memory; nothing to read in memory."""
+        return None
+
+    def _evictable(self, snapshot: TaskSnapshot) -> bool:
+        """Whether a task may be dropped from memory: only finished tasks are."""
+        return snapshot.status.state in TERMINAL_STATES
+
+    async def _persist(
+        self, previous: TaskSnapshot | None, snapshot: TaskSnapshot
+    ) -> None:
+        """Hook called under the shard lock after every write; no-op in memory."""
+        pass
+
+    async def upsert(self, params: TaskSendParams) -> TaskSnapshot:
+        """
+        Create a task in the "submitted" state, or append the incoming message
+        to an existing task's history.
+
+        A message to a finished task re-opens it as "submitted", so it is in
+        flight, and never evicted, until its next final state.
+        """
+        shard = self._shard(params.id)
+        waited = time.perf_counter()
+        async with shard.lock:
+            TASK_STORE_LOCK_WAIT_SECONDS.observe(time.perf_counter() - waited)
+            current = await self._current(shard, params.id)
+            if current is None:
+                snapshot = TaskSnapshot(
+                    id=params.id,
+                    status=TaskStatus(state=TaskState.SUBMITTED),
+                    log=[params.message],
+                    length=1,
+                    size=message_size(params.message),
+                )
+            else:
+                status = current.status
+                if status.state in TERMINAL_STATES:
+                    status = TaskStatus(state=TaskState.SUBMITTED)
+                snapshot = self._append(current, status, params.message)
+            self._store(shard, current, snapshot)
+            await self._persist(current, snapshot)
+            return snapshot
+
+    async def update(
+        self, task_id: str, state: TaskState, message: Message | None = None
+    ) -> TaskSnapshot:
+        """Set a new status on a task, optionally appending a message to its history."""
+        shard = self._shard(task_id)
+        waited = time.perf_counter()
+        async with shard.lock:
+            TASK_STORE_LOCK_WAIT_SECONDS.observe(time.perf_counter() - waited)
+            current = await self._current(shard, task_id)
+            if current is None:
+                raise KeyError(task_id)
+            snapshot = self._append(current, TaskStatus(state=state), message)
+            if self._finished_ttl is not None and state in TERMINAL_STATES:
+                snapshot = replace(
+                    snapshot, expires_at=time.monotonic() + self._finished_ttl
+                )
+                shard.expiries.append((snapshot.expires_at, task_id))
+            self._store(shard, current, snapshot)
+            await self._persist(current, snapshot)
+            return snapshot
+
+    @staticmethod
+    def _append(
+        current: TaskSnapshot, status: TaskStatus, message: Message | None
+    ) -> TaskSnapshot:
+        log = current.log
+        if message is not None:
+            if len(log) != current.length:
+                # The log was extended past this snapshot, fork it to keep both consistent
+                log = log[: current.length]
+            log.append(message)
+        return TaskSnapshot(
+            id=current.id,
+            status=status,
+            log=log,
+            length=len(log),
+            size=current.size + message_size(message),
+        )
+
+    def _store(
+        self, shard: _Shard, current: TaskSnapshot | None, snapshot: TaskSnapshot
+    ) -> None:
+        # Account against what is actually stored, which `current` may no longer be
+        previous = shard.tasks.get(snapshot.id)
+        if previous is None:
+            self._task_count += 1
+        self._history_bytes += snapshot.size - (previous.size if previous else 0)
+        shard.tasks[snapshot.id] = snapshot
+        shard.tasks.move_to_end(snapshot.id)
+        self._evict(shard)
+
+    def _remove(self, shard: _Shard, task_id: str, reason: str) -> None:
+        snapshot = shard.tasks.pop(task_id, None)
+        if snapshot is not None:
+            self._task_count -= 1
+            self._history_bytes -= snapshot.size
+            self.evictions[reason] += 1
+            TASK_STORE_EVICTIONS.inc(reason=reason)
+
+    def _over_budget(self) -> str | None:
+        if self._max_tasks and self._task_count > self._max_tasks:
+            return "max_tasks"
+        if self._max_history_bytes and self._history_bytes > self._max_history_bytes:
+            return "max_history_bytes"
+        return None
+
+    def _evict(self, shard: _Shard) -> None:
+        """Drop expired tasks, then least recently used finished tasks until within budget."""
+        now = time.monotonic()
+        while shard.expiries and shard.expiries[0][0] <= now:
+            expires_at, task_id = shard.expiries.popleft()
+            snapshot = shard.tasks.get(task_id)
+            # Skip entries superseded by a newer write to the same task
+            if (
+                snapshot is not None
+                and snapshot.expires_at == expires_at
+                and self._evictable(snapshot)
+            ):
+                self._remove(shard, task_id, "ttl")
+
+        reason = self._over_budget()
+        if reason is None:
+            return
+        # Eviction is synchronous, so other shards can be trimmed without their locks
+        start = self._shards.index(shard)
+        for victim in self._shards[start:] + self._shards[:start]:
+            for task_id, snapshot in list(victim.tasks.items()):
+                if self._evictable(snapshot):
+                    self._remove(victim, task_id, reason)
+                    reason = self._over_budget()
+                    if reason is None:
+                        return
@@ -0,0 +1,156 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from pydantic import BaseModel
+
+REDACTED = "[REDACTED]"
+
+# Values of JSON keys that look like secrets, e.g. "api_key": "..."
+_SECRET_KEYS = re.compile(
+    r'("[^"]*(?:key|token|secret|password|authorization)[^"]*"\s*:\s*)"(?:[^"\\]|\\.)*"',
+    re.IGNORECASE,
+)
+
+_secrets: set[str] = set()
+_secrets_pattern: re.Pattern | None = None
+_secrets_lock = threading.Lock()
+_listener: logging.handlers.QueueListener | None = None
+
+
+class PayloadSettings:
+    """
+    Payload logging settings, read from the environment:
+
+    - LOG_PAYLOAD_SAMPLE_RATE: fraction of payloads logged, 0 to 1 (default 0.1)
+    - LOG_PAYLOAD_MAX_BYTES: payloads are truncated to this many UTF-8 bytes (default 2048)
+    """
+
+    sample_rate = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))
+    max_bytes = int(os.getenv("LOG_PAYLOAD_MAX_BYTES", "2048"))
+
+
+def register_secrets(values: Iterable[str]) -> None:
+    """Redact these values, e.g. loaded credentials, from every log record."""
+    global _secrets_pattern
+    with _secrets_lock:
+        # Very short values would redact unrelated text
+        _secrets.update(value for value in values if value and len(value) >= 4)
+        if _secrets:
+            _secrets_pattern = re.compile(
+                "|".join(re.escape(value) for value in sorted(_secrets, key=len, reverse=True))
+            )
+
+
+def redact(text: str) -> str:
+    """Mask registered secrets and the values of secret-looking JSON keys."""
+    pattern = _secrets_pattern
+    if pattern is not None:
+        text = pattern.sub(REDACTED, text)
+    return _SECRET_KEYS.sub(rf'\1"{REDACTED}"', text)
+
+
+def log_payload(logger: logging.Logger, event: str, payload: Any, **fields) -> None:
+    """
+    Log a request or response payload for a sample of calls.
+
+    Only the sampling decision runs on the caller; serialization, truncation
+    and redaction happen when the record is formatted on the logging thread.
+
+    Args:
+        logger: Logger to emit the record on, at INFO level
+        event: Short description of the payload
+        payload: bytes, str, pydantic model or JSON-serializable value
+        **fields: Extra structured fields, e.g. the task id
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    if PayloadSettings.sample_rate < 1 and random.random() >= PayloadSettings.sample_rate:
+        return
+    logger.info(event, extra={"payload": payload, "fields": fields})
+
+
+def _payload_text(payload: Any) -> str:
+    if isinstance(payload, (bytes, bytearray)):
+        return payload.decode("utf-8", "replace")
+    if isinstance(payload, str):
+        return payload
+    if isinstance(payload, BaseModel):
+        return payload.model_dump_json(exclude_none=True)
+    return json.dumps(payload, default=str)
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats every record as one JSON line, with payloads truncated and secrets redacted."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(record.getMessage()),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if hasattr(record, "payload"):
+            # Redact before truncating, so a secret cut at the boundary still
+            # has the context the patterns need
+            text = redact(_payload_text(record.payload))
+            data = text.encode()
+            if len(data) > PayloadSettings.max_bytes:
+                entry["payload_size"] = len(data)
+                # Drop a multi-byte character split by the cut
+                text = data[: PayloadSettings.max_bytes].decode("utf-8", "ignore")
+                entry["payload_truncated"] = True
+            entry["payload"] = text
+        if record.exc_info:
+            entry["exc"] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() formats the record on the caller; leave all
+        # formatting to the listener thread and only resolve the message args
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(level: int | str = None) -> None:
+    """
+    Route every log record through an in-memory queue to a background thread
+    that formats it as one JSON line and writes it to stderr, so handlers
+    never block the event loop on I/O. Safe to call more than once.
+
+    Args:
+        level: Root log level, LOG_LEVEL or INFO by default
+    """
+    global _listener
+    if _listener is not None:
+        return
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    output = logging.StreamHandler()
+    output.setFormatter(StructuredFormatter())
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(records))
+    root.setLevel(level or os.getenv("LOG_LEVEL", "INFO"))
+    # uvicorn installs its own handlers; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
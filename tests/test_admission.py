@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from server.admission import AdmissionController, Overloaded
+
+
+class AdmissionControllerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_no_limit_admits_everything(self) -> None:
+        admission = AdmissionController()
+        for _ in range(100):
+            await admission.acquire()
+        self.assertEqual(admission.in_flight, 100)
+
+    async def test_full_queue_is_rejected_right_away(self) -> None:
+        admission = AdmissionController(max_in_flight=1, max_queue=0)
+        await admission.acquire()
+
+        with self.assertRaises(Overloaded) as raised:
+            await admission.acquire()
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+        self.assertEqual(admission.in_flight, 1)
+
+    async def test_waiter_times_out(self) -> None:
+        admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.01)
+        await admission.acquire()
+
+        with self.assertRaises(Overloaded):
+            await admission.acquire()
+        self.assertEqual(admission.queued, 0)
+        self.assertEqual(admission.in_flight, 1)
+
+    async def test_released_slot_goes_to_the_oldest_waiter(self) -> None:
+        admission = AdmissionController(max_in_flight=1, max_queue=2)
+        granted_at = await admission.acquire()
+        first = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        second = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        self.assertEqual(admission.queued, 2)
+
+        admission.release(granted_at)
+        await first
+        await asyncio.sleep(0)
+        self.assertFalse(second.done())
+        # The slot was handed over, not given back
+        self.assertEqual(admission.in_flight, 1)
+
+        admission.release(first.result())
+        await second
+        admission.release(second.result())
+        self.assertEqual(admission.in_flight, 0)
+        self.assertEqual(admission.queued, 0)
+
+    async def test_cancelled_waiter_does_not_keep_a_slot(self) -> None:
+        admission = AdmissionController(max_in_flight=1, max_queue=1)
+        granted_at = await admission.acquire()
+        waiting = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        admission.release(granted_at)
+
+        self.assertEqual(admission.in_flight, 0)
+        self.assertEqual(admission.queued, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+
+from agent.agent_connector import AgentBusyError, AgentConnector
+
+
+class StubClient:
+    """Stands in for A2AClient: fails while `failing` is set, else answers right away."""
+
+    def __init__(self) -> None:
+        self.failing = False
+        self.calls = 0
+
+    async def send_task(self, payload: dict) -> dict:
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("child agent is down")
+        return {"id": payload["id"]}
+
+    async def aclose(self) -> None:
+        pass
+
+
+class HalfOpenProbeTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.connector = AgentConnector(
+            "child",
+            "http://127.0.0.1:1/",
+            max_concurrency=1,
+            queue_timeout=0.05,
+            breaker_failures=1,
+            breaker_reset=0.05,
+        )
+        self.connector.client = self.client = StubClient()
+        self.client.failing = True
+        with self.assertRaises(ConnectionError):
+            await self.connector.send_task("hello", "session")
+        self.client.failing = False
+        await asyncio.sleep(0.06)
+        self.assertEqual(self.connector.status, "recovering")
+
+    async def test_probe_waiting_for_a_slot_times_out(self) -> None:
+        await self.connector._slots.acquire()
+        with self.assertRaises(AgentBusyError):
+            await self.connector.send_task("hello", "session")
+        self.connector._slots.release()
+
+        await self.connector.send_task("hello", "session")
+        self.assertEqual(self.connector.status, "available")
+
+    async def test_probe_waiting_for_a_slot_is_cancelled(self) -> None:
+        await self.connector._slots.acquire()
+        waiting = asyncio.create_task(self.connector.send_task("hello", "session"))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.connector._slots.release()
+
+        await self.connector.send_task("hello", "session")
+        self.assertEqual(self.connector.status, "available")
+        self.assertEqual(self.client.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
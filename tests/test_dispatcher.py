@@ -0,0 +1,133 @@
+import json
+import unittest
+import uuid
+
+import httpx
+
+from benchmarks.fakes import stub_child_server
+from server.dispatcher import HashRing, SessionDispatcher, merge_metrics
+from tests.test_server import send_request
+
+WORKER_METRICS = """# HELP a2a_tasks_in_flight Tasks currently being processed
+# TYPE a2a_tasks_in_flight gauge
+a2a_tasks_in_flight 2
+# HELP task_store_evictions_total Finished tasks dropped from memory
+# TYPE task_store_evictions_total counter
+task_store_evictions_total{reason="ttl"} 3
+"""
+
+
+class HashRingTest(unittest.TestCase):
+    def test_keys_spread_over_every_node(self) -> None:
+        ring = HashRing(["w0", "w1", "w2", "w3"])
+        counts = {}
+        for index in range(4000):
+            node = ring.node(f"session-{index}")
+            counts[node] = counts.get(node, 0) + 1
+
+        self.assertEqual(set(counts), {"w0", "w1", "w2", "w3"})
+        for count in counts.values():
+            self.assertGreater(count, 4000 / 4 * 0.6)
+
+    def test_adding_a_node_only_moves_keys_to_it(self) -> None:
+        before = HashRing(["w0", "w1", "w2"])
+        after = HashRing(["w0", "w1", "w2", "w3"])
+
+        for index in range(2000):
+            key = f"session-{index}"
+            if before.node(key) != after.node(key):
+                self.assertEqual(after.node(key), "w3")
+
+    def test_needs_a_node(self) -> None:
+        with self.assertRaises(ValueError):
+            HashRing([])
+
+
+class SessionDispatcherTest(unittest.IsolatedAsyncioTestCase):
+    """A dispatcher in front of three stub workers, each answering with its own name."""
+
+    async def asyncSetUp(self) -> None:
+        names = [f"w{index}" for index in range(3)]
+        self.workers = [f"http://{name}" for name in names]
+        mounts = {
+            f"http://{name}/": httpx.ASGITransport(app=stub_child_server(name, "test", 0, 0).app)
+            for name in names
+        }
+        self.dispatcher = SessionDispatcher(
+            "test", 0, self.workers, stub_child_server("dispatcher", "test", 0, 0).agent_card
+        )
+        self.dispatcher._client = httpx.AsyncClient(mounts=mounts)
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self.dispatcher.app), base_url="http://test"
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+        await self.dispatcher.aclose()
+
+    async def send(self, session_id: str, task_id: str) -> str:
+        request = send_request(task_id, task_id)
+        request["params"]["sessionId"] = session_id
+        result = (await self.client.post("/", json=request)).json()["result"]
+        return result["history"][-1]["parts"][0]["text"].split(":")[0]
+
+    async def test_a_session_stays_on_one_worker(self) -> None:
+        for index in range(10):
+            session_id = f"session-{index}"
+            workers = {await self.send(session_id, uuid.uuid4().hex) for _ in range(3)}
+            self.assertEqual(workers, {self.dispatcher._ring.node(session_id).removeprefix("http://")})
+
+    async def test_get_goes_to_the_worker_that_ran_the_task(self) -> None:
+        worker = await self.send("session", "task-1")
+        get = {"jsonrpc": "2.0", "id": "get", "method": "tasks/get", "params": {"id": "task-1"}}
+
+        result = (await self.client.post("/", json=get)).json()["result"]
+
+        self.assertEqual(result["history"][-1]["parts"][0]["text"], f"{worker}: hello")
+
+    async def test_untracked_task_is_looked_up_on_every_worker(self) -> None:
+        worker = await self.send("session", "task-1")
+        self.dispatcher._task_workers.clear()
+        get = {"jsonrpc": "2.0", "id": "get", "method": "tasks/get", "params": {"id": "task-1"}}
+
+        result = (await self.client.post("/", json=get)).json()["result"]
+
+        self.assertEqual(result["history"][-1]["parts"][0]["text"], f"{worker}: hello")
+        self.assertEqual(self.dispatcher._task_workers["task-1"].removeprefix("http://"), worker)
+
+    async def test_batch_is_split_per_worker_and_kept_in_order(self) -> None:
+        batch = []
+        for index in range(12):
+            request = send_request(index, f"task-{index}")
+            request["params"]["sessionId"] = f"session-{index}"
+            batch.append(request)
+
+        results = (await self.client.post("/", content=json.dumps(batch))).json()
+
+        self.assertEqual([result["id"] for result in results], list(range(12)))
+        for index, result in enumerate(results):
+            expected = self.dispatcher._ring.node(f"session-{index}").removeprefix("http://")
+            self.assertEqual(result["result"]["history"][-1]["parts"][0]["text"], f"{expected}: hello")
+
+
+class MergeMetricsTest(unittest.TestCase):
+    def test_samples_are_labelled_and_grouped_by_metric(self) -> None:
+        merged = merge_metrics([("0", WORKER_METRICS), ("1", WORKER_METRICS)])
+
+        self.assertEqual(
+            merged.splitlines(),
+            [
+                "# HELP a2a_tasks_in_flight Tasks currently being processed",
+                "# TYPE a2a_tasks_in_flight gauge",
+                'a2a_tasks_in_flight{worker="0"} 2',
+                'a2a_tasks_in_flight{worker="1"} 2',
+                "# HELP task_store_evictions_total Finished tasks dropped from memory",
+                "# TYPE task_store_evictions_total counter",
+                'task_store_evictions_total{worker="0",reason="ttl"} 3',
+                'task_store_evictions_total{worker="1",reason="ttl"} 3',
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
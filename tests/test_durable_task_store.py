@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from models.task import TaskState
+from server.durable_task_store import DurableTaskStore, SQLiteBackend
+from tests.test_task_store import complete, reply, send_params
+
+
+class DurableTaskStoreTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tasks.db")
+        self.stores = []
+
+    async def asyncTearDown(self) -> None:
+        for store in self.stores:
+            await store.close()
+        self.directory.cleanup()
+
+    def open_store(self, **options) -> DurableTaskStore:
+        store = DurableTaskStore(SQLiteBackend(self.path), **options)
+        store.RETRY_DELAY = 0.001
+        self.stores.append(store)
+        return store
+
+    def record_batches(self, store: DurableTaskStore, failures: int = 0) -> list[int]:
+        """Record the size of every committed batch, failing the first `failures` commits."""
+        sizes = []
+        write_batch = store._write_batch
+
+        def recording(batch) -> None:
+            if len(sizes) < failures:
+                sizes.append(0)
+                raise sqlite3.OperationalError("database is locked")
+            write_batch(batch)
+            sizes.append(len(batch))
+
+        store._write_batch = recording
+        return sizes
+
+
+class PersistenceTest(DurableTaskStoreTestCase):
+    async def test_tasks_are_loaded_back_from_the_database(self) -> None:
+        store = self.open_store()
+        await complete(store, "A", "first")
+        await store.upsert(send_params("A", "second"))
+        await store.close()
+
+        reopened = self.open_store()
+        snapshot = await reopened.fetch("A")
+
+        self.assertEqual(snapshot.status.state, TaskState.SUBMITTED)
+        self.assertEqual(
+            [message.parts[0].text for message in snapshot.history()],
+            ["first", "done", "second"],
+        )
+
+    async def test_concurrent_writes_are_group_committed(self) -> None:
+        store = self.open_store()
+        sizes = self.record_batches(store)
+
+        await asyncio.gather(*(store.upsert(send_params(f"task-{index}")) for index in range(50)))
+        await store.flush()
+
+        self.assertEqual(sum(sizes), 50)
+        self.assertLess(len(sizes), 50)
+
+    async def test_expired_tasks_are_not_loaded_back(self) -> None:
+        store = self.open_store(finished_ttl=0.05)
+        await complete(store, "finished")
+        await store.upsert(send_params("running"))
+        await store.close()
+        await asyncio.sleep(0.06)
+
+        reopened = self.open_store(finished_ttl=0.05)
+
+        self.assertIsNone(await reopened.fetch("finished"))
+        self.assertIsNotNone(await reopened.fetch("running"))
+
+
+class RetryTest(DurableTaskStoreTestCase):
+    async def test_failed_batch_is_retried_before_newer_writes(self) -> None:
+        store = self.open_store(sync_commit=True)
+        sizes = self.record_batches(store, failures=2)
+
+        await store.upsert(send_params("A"))
+        await store.update("A", TaskState.COMPLETED, reply())
+        await store.close()
+
+        self.assertEqual(sizes[:2], [0, 0])
+        reopened = self.open_store()
+        snapshot = await reopened.fetch("A")
+        self.assertEqual(snapshot.status.state, TaskState.COMPLETED)
+        self.assertEqual(snapshot.length, 2)
+
+    async def test_batch_is_dropped_after_the_retry_attempts(self) -> None:
+        store = self.open_store(sync_commit=True, retry_attempts=2)
+        self.record_batches(store, failures=2)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            await store.upsert(send_params("A"))
+
+        self.assertEqual(store._unpersisted, {})
+        await store.upsert(send_params("B"))
+
+
+class PinningTest(DurableTaskStoreTestCase):
+    async def test_unpersisted_tasks_stay_in_memory_until_committed(self) -> None:
+        store = self.open_store(max_tasks=1)
+        loop = asyncio.get_running_loop()
+        committing = asyncio.Event()
+        write_batch = store._write_batch
+
+        def blocked(batch) -> None:
+            asyncio.run_coroutine_threadsafe(committing.wait(), loop).result()
+            write_batch(batch)
+
+        store._write_batch = blocked
+        try:
+            for task_id in ("A", "B", "C"):
+                await complete(store, task_id)
+
+            # Finished but not written yet, so none of them may be evicted
+            self.assertEqual(len(store), 3)
+            self.assertEqual(store.evictions["max_tasks"], 0)
+        finally:
+            committing.set()
+        await store.flush()
+
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store._unpersisted, {})
+        for task_id in ("A", "B", "C"):
+            self.assertIsNotNone(await store.fetch(task_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import time
+import unittest
+
+from agent.router import RouteDecision
+from benchmarks.fakes import SleepyLlm, build_host_agent, stub_agent_card
+
+
+class FastPathTest(unittest.IsolatedAsyncioTestCase):
+    """A confident route to a child that cannot take the task falls back to the LLM."""
+
+    async def asyncSetUp(self) -> None:
+        self.host = build_host_agent(
+            SleepyLlm(latency=0, reply="from the model"),
+            [stub_agent_card("child", "http://127.0.0.1:1/")],
+        )
+        self.host._fast_path = True
+        self.host.router.route = lambda query: RouteDecision("child", 0.9, 0.0, True)
+        self.connector = self.host.agent_connectors["child"]
+        self.connector.queue_timeout = 0.01
+
+    async def asyncTearDown(self) -> None:
+        await self.host.close()
+
+    async def test_busy_child_falls_back_to_the_llm(self) -> None:
+        for _ in range(self.connector.max_concurrency):
+            await self.connector._slots.acquire()
+
+        answer = await self.host.invoke_async("hello", "session")
+
+        self.assertEqual(answer, "from the model")
+        self.assertEqual(self.host.route_counts["fallback"], 1)
+        self.assertEqual(self.host.route_counts["routed"], 0)
+
+    async def test_recovering_child_is_left_to_the_llm(self) -> None:
+        breaker = self.connector.breaker
+        breaker._opened_at = time.monotonic() - breaker.reset_timeout - 1
+        breaker._probing = True
+        self.assertEqual(self.connector.status, "recovering")
+
+        answer = await self.host.invoke_async("hello", "session")
+
+        self.assertEqual(answer, "from the model")
+        self.assertEqual(self.host.route_counts["declined"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import unittest
+
+import httpx
+from sse_starlette.sse import AppStatus
+
+from benchmarks.fakes import StubTaskManager, stub_agent_card
+from models.request import SendTaskStreamingRequest, SendTaskStreamingResponse
+from models.task import TaskState, TaskStatus, TaskStatusUpdateEvent
+from server.server import A2AServer
+
+
+def send_request(request_id, task_id: str, text: str = "hello") -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tasks/send",
+        "params": {
+            "id": task_id,
+            "message": {"role": "user", "parts": [{"type": "text", "text": text}]},
+        },
+    }
+
+
+class StreamingTaskManager(StubTaskManager):
+    """Streams one working update, then completes, or fails when the message says "fail"."""
+
+    async def on_send_task_subscribe(self, request: SendTaskStreamingRequest):
+        task_id = request.params.id
+        yield SendTaskStreamingResponse(
+            id=request.id,
+            result=TaskStatusUpdateEvent(id=task_id, status=TaskStatus(state=TaskState.WORKING)),
+        )
+        await asyncio.sleep(self.latency)
+        if request.params.message.parts[0].text == "fail":
+            raise RuntimeError("agent failed")
+        yield SendTaskStreamingResponse(
+            id=request.id,
+            result=TaskStatusUpdateEvent(
+                id=task_id, status=TaskStatus(state=TaskState.COMPLETED), final=True
+            ),
+        )
+
+
+class ServerTestCase(unittest.IsolatedAsyncioTestCase):
+    server_options: dict = {}
+
+    async def asyncSetUp(self) -> None:
+        # sse_starlette keeps one exit event per process, bound to the first loop
+        AppStatus.should_exit_event = None
+        self.server = A2AServer(
+            host="test",
+            port=0,
+            agent_card=stub_agent_card("child", "http://test/"),
+            task_manager=StreamingTaskManager("child", latency=0.01),
+            **self.server_options,
+        )
+        self.client = httpx.AsyncClient(
+            # A stream that fails aborts the response, like a dropped connection
+            transport=httpx.ASGITransport(app=self.server.app, raise_app_exceptions=False),
+            base_url="http://test",
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+
+class BatchTest(ServerTestCase):
+    async def test_responses_keep_request_order_and_ids(self) -> None:
+        batch = [send_request(index, f"task-{index}", f"message {index}") for index in range(5)]
+        batch.append({"jsonrpc": "2.0", "id": "get", "method": "tasks/get", "params": {"id": "task-0"}})
+
+        response = await self.client.post("/", content=json.dumps(batch))
+
+        results = response.json()
+        self.assertEqual([result["id"] for result in results], [0, 1, 2, 3, 4, "get"])
+        self.assertEqual(
+            results[3]["result"]["history"][-1]["parts"][0]["text"], "child: message 3"
+        )
+        self.assertEqual(results[5]["result"]["id"], "task-0")
+
+    async def test_a_failing_member_does_not_fail_the_batch(self) -> None:
+        batch = [
+            send_request(1, "task-1"),
+            {"jsonrpc": "2.0", "id": 2, "method": "tasks/unknown", "params": {}},
+            send_request(3, "task-3"),
+        ]
+
+        results = (await self.client.post("/", content=json.dumps(batch))).json()
+
+        self.assertIn("result", results[0])
+        self.assertEqual(results[1]["id"], 2)
+        self.assertEqual(results[1]["error"]["code"], -32603)
+        self.assertIn("result", results[2])
+
+    async def test_error_without_a_request_id_has_a_null_id(self) -> None:
+        batch = [42, {"jsonrpc": "2.0", "method": "tasks/send"}]
+
+        results = (await self.client.post("/", content=json.dumps(batch))).json()
+
+        for result in results:
+            self.assertIn("id", result)
+            self.assertIsNone(result["id"])
+            self.assertIn("error", result)
+
+    async def test_empty_batch_is_rejected(self) -> None:
+        response = await self.client.post("/", content=b"[]")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(response.json()["id"])
+
+
+class AdmissionTest(ServerTestCase):
+    server_options = {"max_in_flight": 1, "max_queue": 0}
+
+    async def stream(self, text: str) -> None:
+        request = {**send_request(1, "task-1", text), "method": "tasks/sendSubscribe"}
+        try:
+            async with self.client.stream("POST", "/", content=json.dumps(request)) as response:
+                async for _ in response.aiter_lines():
+                    pass
+        except httpx.HTTPError:
+            pass
+
+    async def test_send_releases_its_slot(self) -> None:
+        for index in range(3):
+            response = await self.client.post("/", json=send_request(index, f"task-{index}"))
+            self.assertIn("result", response.json())
+        self.assertEqual(self.server.admission.in_flight, 0)
+
+    async def test_request_beyond_the_limit_is_rejected_with_a_retry_hint(self) -> None:
+        first = asyncio.create_task(self.client.post("/", json=send_request(1, "task-1")))
+        while not self.server.admission.in_flight:
+            await asyncio.sleep(0.001)
+
+        response = await self.client.post("/", json=send_request(2, "task-2"))
+        await first
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["id"], 2)
+        self.assertIn("retry-after", response.headers)
+        self.assertEqual(self.server.admission.in_flight, 0)
+
+    async def test_stream_releases_its_slot_when_it_ends(self) -> None:
+        await self.stream("hello")
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.server.admission.in_flight, 0)
+
+    async def test_stream_releases_its_slot_when_it_fails(self) -> None:
+        for _ in range(2):
+            await self.stream("fail")
+            await asyncio.sleep(0.01)
+            self.assertEqual(self.server.admission.in_flight, 0)
+
+        response = await self.client.post("/", json=send_request(3, "task-3"))
+        self.assertIn("result", response.json())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+
+from models.task import Message, TaskSendParams, TaskState, TextPart
+from server.task_manager import InMemoryTaskManager
+from server.task_store import ShardedTaskStore
+
+
+def send_params(task_id: str, text: str = "hello") -> TaskSendParams:
+    return TaskSendParams(
+        id=task_id, message=Message(role="user", parts=[TextPart(text=text)])
+    )
+
+
+def reply(text: str = "done") -> Message:
+    return Message(role="agent", parts=[TextPart(text=text)])
+
+
+async def complete(store: ShardedTaskStore, task_id: str, text: str = "hello") -> None:
+    await store.upsert(send_params(task_id, text))
+    await store.update(task_id, TaskState.COMPLETED, reply())
+
+
+class EvictionTest(unittest.IsolatedAsyncioTestCase):
+    async def test_max_tasks_holds_across_shards(self) -> None:
+        store = ShardedTaskStore(shards=8, max_tasks=3)
+        for index in range(20):
+            await complete(store, f"task-{index}")
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.evictions["max_tasks"], 17)
+        self.assertIsNotNone(store.get("task-19"))
+
+    async def test_least_recently_read_task_is_evicted_first(self) -> None:
+        # Recency is tracked per shard, so use one to make the order global
+        store = ShardedTaskStore(shards=1, max_tasks=2)
+        await complete(store, "A")
+        await complete(store, "B")
+        store.get("A")
+        await complete(store, "C")
+
+        self.assertIsNotNone(store.get("A"))
+        self.assertIsNone(store.get("B"))
+
+    async def test_in_flight_tasks_are_never_evicted(self) -> None:
+        store = ShardedTaskStore(shards=4, max_tasks=1)
+        for index in range(3):
+            await store.upsert(send_params(f"task-{index}"))
+        await complete(store, "done")
+
+        self.assertEqual(len(store), 3)
+        self.assertIsNone(store.get("done"))
+        for index in range(3):
+            self.assertIsNotNone(store.get(f"task-{index}"))
+
+    async def test_max_history_bytes_counts_the_whole_store(self) -> None:
+        store = ShardedTaskStore(shards=8, max_history_bytes=100)
+        for index in range(10):
+            await complete(store, f"task-{index}", "x" * 20)
+
+        # Each task holds 20 bytes of request and 4 of reply
+        self.assertLessEqual(store.history_bytes, 100)
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.history_bytes, 4 * 24)
+        self.assertEqual(store.evictions["max_history_bytes"], 6)
+
+    async def test_finished_tasks_expire_after_the_ttl(self) -> None:
+        store = ShardedTaskStore(shards=1, finished_ttl=0.05)
+        await complete(store, "finished")
+        await store.upsert(send_params("running"))
+        self.assertIsNotNone(store.get("finished"))
+
+        await asyncio.sleep(0.06)
+
+        self.assertIsNone(store.get("finished"))
+        self.assertIsNotNone(store.get("running"))
+        self.assertEqual(store.evictions["ttl"], 1)
+        self.assertEqual(len(store), 1)
+
+    async def test_expired_tasks_are_dropped_on_the_next_write(self) -> None:
+        store = ShardedTaskStore(shards=1, finished_ttl=0.05)
+        await complete(store, "finished")
+        await asyncio.sleep(0.06)
+
+        await store.upsert(send_params("next"))
+
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.evictions["ttl"], 1)
+
+    async def test_reopened_task_does_not_expire(self) -> None:
+        store = ShardedTaskStore(shards=1, finished_ttl=0.05)
+        await complete(store, "A")
+        await store.upsert(send_params("A", "follow-up"))
+        await asyncio.sleep(0.06)
+
+        await store.upsert(send_params("B"))
+
+        self.assertIsNotNone(store.get("A"))
+        self.assertEqual(store.evictions["ttl"], 0)
+
+    async def test_reopened_task_is_not_evicted(self) -> None:
+        store = ShardedTaskStore(max_tasks=2)
+        await store.upsert(send_params("A"))
+        await store.update("A", TaskState.COMPLETED, reply())
+
+        reopened = await store.upsert(send_params("A", "follow-up"))
+        self.assertEqual(reopened.status.state, TaskState.SUBMITTED)
+        await store.upsert(send_params("B"))
+        await store.upsert(send_params("C"))
+
+        self.assertEqual(store.evictions["max_tasks"], 0)
+        completed = await store.update("A", TaskState.COMPLETED, reply())
+        self.assertEqual(completed.length, 4)
+
+    def test_task_manager_keeps_an_empty_store(self) -> None:
+        store = ShardedTaskStore(max_tasks=1)
+        self.assertIs(InMemoryTaskManager(store).store, store)
+
+
+if __name__ == "__main__":
+    unittest.main()
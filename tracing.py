@@ -0,0 +1,103 @@
+import logging
+import os
+import threading
+from typing import Sequence
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Spans are no-ops until configure_tracing installs an SDK provider
+tracer = trace.get_tracer("manager_agent")
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Appends every finished span as one JSON line to a local file, for offline runs.
+
+    Args:
+        path: File to append to
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self._lock, open(self.path, "a") as file:
+            file.write(lines)
+        return SpanExportResult.SUCCESS
+
+
+def _exporter(name: str) -> SpanExporter:
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "memory":
+        return InMemorySpanExporter()
+    if name.startswith("file:"):
+        return FileSpanExporter(name.removeprefix("file:"))
+    if name == "gcp":
+        from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+
+        return CloudTraceSpanExporter()
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise RuntimeError(
+                "The otlp trace exporter requires the 'opentelemetry-exporter-otlp-proto-http' package"
+            ) from e
+        return OTLPSpanExporter()
+    raise ValueError(f"Unknown trace exporter: {name}")
+
+
+def configure_tracing(exporter: str | SpanExporter | None = None) -> SpanExporter | None:
+    """
+    Install a tracer provider exporting to `exporter`, or to the TRACE_EXPORTER
+    environment variable when omitted:
+
+    - "none" (default): tracing stays disabled
+    - "console": print spans to stdout
+    - "memory": keep spans in memory, e.g. for benchmarks
+    - "file:<path>": append spans as JSON lines to a file
+    - "gcp": Google Cloud Trace
+    - "otlp": OTLP over HTTP, configured with the standard OTEL_EXPORTER_OTLP_* variables
+
+    The service name comes from OTEL_SERVICE_NAME (default "host_agent").
+
+    Returns:
+        The exporter in use, or None when tracing is disabled
+    """
+    exporter = exporter or os.getenv("TRACE_EXPORTER", "none")
+    if exporter == "none":
+        return None
+    if isinstance(exporter, str):
+        exporter = _exporter(exporter)
+
+    provider = TracerProvider(
+        resource=Resource.create(
+            {"service.name": os.getenv("OTEL_SERVICE_NAME", "host_agent")}
+        )
+    )
+    # In-memory spans should be visible as soon as they end; everything else is batched
+    processor = (
+        SimpleSpanProcessor(exporter)
+        if isinstance(exporter, InMemorySpanExporter)
+        else BatchSpanProcessor(exporter)
+    )
+    provider.add_span_processor(processor)
+    trace.set_tracer_provider(provider)
+    logger.info(f"Tracing enabled with {type(exporter).__name__}")
+    return exporter